@@ -0,0 +1,184 @@
+"""
+analisis.py
+Objeto de análisis perezoso: cada etapa se calcula al pedirla y comparte sus resultados intermedios
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from functools import cached_property
+import numpy as np
+import sympy as sp
+from core import x, simplificada, evaluar_paso_a_paso, evaluador_vectorizado, generar_muestra_np, generar_muestra_adaptativa
+from cache import parsear_funcion_cache, calcular_dominio_cache, calcular_recorrido_cache, intersecciones_cache
+from numerico import ResultadoAproximado, valor_exacto
+from clasificador import dominio_rapido
+from curva import Curva
+from config import NPOINTS, RANGO_EXTRA, PRESUPUESTO_ADAPTATIVO
+
+
+class AnalisisFuncion:
+    """
+    Análisis de una función f(x) construido sobre la expresión de parsear_funcion.
+    Dominio, recorrido, intersecciones, derivada, kernel numérico y muestras son propiedades
+    que se calculan la primera vez que se piden y quedan memorizadas; así cada consumidor
+    (interfaz, gráfica, lotes) paga solo por lo que usa.
+    Los resultados ya conocidos pueden pasarse al construirlo: AnalisisFuncion(f, dominio=d).
+    """
+    _ETAPAS = ('dominio', 'recorrido', 'intersecciones', 'raices', 'y0')
+
+    def __init__(self, f: Any, **conocidos: Any):
+        self.f = f
+        for nombre, valor in conocidos.items():
+            if nombre not in self._ETAPAS:
+                raise TypeError(f"Etapa desconocida: {nombre}")
+            self.__dict__[nombre] = valor
+        if 'raices' in conocidos and 'y0' in conocidos and 'intersecciones' not in conocidos:
+            self.__dict__['intersecciones'] = (conocidos['raices'], conocidos['y0'])
+        self._evaluaciones: Dict[Any, Dict[str, Any]] = {}
+        self._muestras: Dict[Tuple[int, bool], Tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def desde_texto(cls, funcion_txt: str) -> "AnalisisFuncion":
+        """Parsea la entrada del usuario (con caché) y crea el análisis."""
+        return cls(parsear_funcion_cache(funcion_txt))
+
+    @classmethod
+    def preliminar(cls, funcion_txt: str) -> "AnalisisFuncion":
+        """
+        Análisis para la vista previa: parseo y dominio solo por el camino rápido del
+        clasificador (si no aplica, todos los reales). No dispara etapas simbólicas costosas.
+        Ni el parseo ni el kernel se guardan en disco: la mayoría de las entradas a medio
+        escribir no vuelven.
+        """
+        f = parsear_funcion_cache(funcion_txt, persistir=False)
+        dominio = dominio_rapido(f, x)
+        analisis = cls(f, dominio=sp.S.Reals if dominio is None else dominio)
+        analisis.__dict__['kernel'] = evaluador_vectorizado(f, persistir=False)
+        return analisis
+
+    # === Etapas simbólicas ===
+
+    @cached_property
+    def simplificada(self) -> Any:
+        return simplificada(self.f)
+
+    @cached_property
+    def dominio(self) -> Any:
+        return calcular_dominio_cache(self.f)
+
+    @cached_property
+    def recorrido(self) -> Any:
+        return calcular_recorrido_cache(self.f, self.dominio)
+
+    @cached_property
+    def intersecciones(self) -> Tuple[Any, Any]:
+        return intersecciones_cache(self.f)
+
+    @cached_property
+    def raices(self) -> Any:
+        return self.intersecciones[0]
+
+    @cached_property
+    def y0(self) -> Any:
+        return self.intersecciones[1]
+
+    @cached_property
+    def derivada(self) -> Any:
+        return sp.diff(self.f, x)
+
+    def evaluar(self, valor_x: Any) -> Dict[str, Any]:
+        """Evaluación paso a paso en valor_x (memorizada por valor)."""
+        if valor_x not in self._evaluaciones:
+            self._evaluaciones[valor_x] = evaluar_paso_a_paso(self.f, valor_x)
+        return self._evaluaciones[valor_x]
+
+    # === Parte numérica ===
+
+    @cached_property
+    def kernel(self) -> Callable[[np.ndarray], np.ndarray]:
+        """Evaluador vectorizado de f (NaN donde f no es real y finita)."""
+        return evaluador_vectorizado(self.f)
+
+    def valor_en(self, valor_x: float) -> float:
+        return float(self.kernel(np.array([float(valor_x)]))[0])
+
+    def muestras(self, npoints: int = NPOINTS, adaptativo: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """Curva (xs, ys) sobre el dominio, uniforme o adaptativa; memorizada por parámetros."""
+        clave = (PRESUPUESTO_ADAPTATIVO if adaptativo else npoints, adaptativo)
+        if clave not in self._muestras:
+            dominio = valor_exacto(self.dominio)
+            if adaptativo:
+                xs, ys = generar_muestra_adaptativa(self.f, dominio, presupuesto=PRESUPUESTO_ADAPTATIVO, rango_extra=RANGO_EXTRA)
+            else:
+                xs = generar_muestra_np(dominio, npoints=npoints, rango_extra=RANGO_EXTRA)
+                ys = self.kernel(xs)
+            if not np.isfinite(ys).any():
+                xs = np.linspace(-10, 10, 201)
+                ys = self.kernel(xs)
+            self._muestras[clave] = (xs, ys)
+        return self._muestras[clave]
+
+    def curva(self, npoints: int = NPOINTS, adaptativo: bool = False) -> Curva:
+        """Las muestras como Curva (máscara de validez, tramos y exportación a .npy/.npz/CSV)."""
+        return Curva(*self.muestras(npoints, adaptativo))
+
+    def valores_en(self, puntos: List[str]) -> Dict[str, Any]:
+        """f en cada punto (texto) con SymPy: float si es real; si no, el texto del valor o del error."""
+        valores: Dict[str, Any] = {}
+        for p in puntos:
+            try:
+                v = sp.N(self.f.subs(x, sp.sympify(p)))
+                valores[p] = float(v) if v.is_real else str(v)
+            except Exception as e:
+                valores[p] = f"Error: {e}"
+        return valores
+
+    @cached_property
+    def puntos_raiz(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Raíces reales como arreglo de floats y f evaluada en ellas con el kernel."""
+        raices = valor_exacto(self.raices)
+        if not isinstance(raices, (list, tuple)):
+            return np.array([]), np.array([])
+        valores = []
+        for r in raices:
+            try:
+                z = complex(r) if isinstance(r, (int, float)) else complex(sp.N(r))
+            except (TypeError, ValueError):
+                continue
+            if abs(z.imag) <= 1e-12 * (1 + abs(z.real)):
+                valores.append(z.real)
+        rs = np.array(valores, dtype=float)
+        ys = self.kernel(rs)
+        return rs[np.isfinite(ys)], ys[np.isfinite(ys)]
+
+    @cached_property
+    def y0_numerico(self) -> Optional[float]:
+        y0 = valor_exacto(self.y0)
+        if isinstance(y0, str):
+            return None
+        try:
+            return float(sp.N(y0))
+        except (TypeError, ValueError):
+            return None
+
+    def punto_evaluado(self, valor_txt: str, eval_info: Optional[Dict[str, Any]] = None) -> Tuple[float, float]:
+        """
+        Coordenadas del punto evaluado. Reutiliza el valor numérico de la evaluación paso a
+        paso si ya existe; si no, usa el kernel.
+        """
+        valor_sym = sp.sympify(valor_txt)
+        x_val = float(sp.N(valor_sym))
+        try:
+            y_val = float((eval_info or {})['valor_numerico'])
+        except (KeyError, TypeError, ValueError):
+            y_val = self.valor_en(x_val)
+        return x_val, y_val
+
+
+def a_json(valor: Any) -> Any:
+    """Convierte un resultado del análisis a algo serializable en JSON (lotes y servidor)."""
+    if isinstance(valor, ResultadoAproximado):
+        return {"valor": a_json(valor.valor), "aproximado": True, "metodo": valor.metodo}
+    if isinstance(valor, (list, tuple)):
+        return [a_json(v) for v in valor]
+    if valor is None or isinstance(valor, (bool, int, float, str)):
+        return valor
+    return str(valor)
@@ -0,0 +1,278 @@
+"""
+bench.py
+Benchmarks de cada etapa de core.py y del graficado, con línea base en JSON y detección de regresiones
+
+Uso:
+    python bench.py --guardar bench_base.json
+    python bench.py --comparar bench_base.json --umbral 0.25
+"""
+from typing import Any, Callable, Dict, List, Optional
+import argparse
+import atexit
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import sympy as sp
+from sympy.core.cache import clear_cache
+import config
+# Las cachés en disco (kernels y análisis) van a un directorio temporal durante toda la corrida:
+# ni se leen resultados de corridas anteriores ni se borra la caché del usuario al limpiarlas
+config.CACHE_DIR = tempfile.mkdtemp(prefix="bench_analizador_")
+import cache
+import core
+import kernels
+import plot
+from config import NPOINTS, RANGO_EXTRA, PRESUPUESTO_ADAPTATIVO, OBJETIVO_ARRANQUE_S, OBJETIVO_VENTANA_S
+from utils import ejecutar_con_limite
+
+CORPUS: Dict[str, List[str]] = {
+    "polinomios": ["x^2 - 4", "2x^3 - x", "x^5 - 3x^4 + 2x^2 - 7", "(x+1)^6 - x^6"],
+    "racionales": ["1/(x-2)", "(x+1)/(x-1)", "x^3/(x^2-1)", "(x^2-4)/(x^2+x-6)"],
+    "trigonometricas": ["sin(x)", "sin(x)^2 + cos(x)", "tan(x)", "sin(20x)*cos(x)"],
+    "exp_log": ["exp(x) - 3", "log(x)", "x*exp(-x)", "log(x^2 + 1) - 1"],
+    "patologicas": ["sin(1/x)", "x^x", "exp(sin(x))/(1 + x^2)", "sqrt(x)*log(x) + 1/(x - 3)"],
+}
+
+ETAPAS = ["limpiar_input", "parsear_funcion", "calcular_dominio", "calcular_recorrido", "intersecciones",
+          "muestreo_lista", "muestreo_numpy", "muestreo_adaptativo", "graficar_funcion"]
+
+
+def _preparar(expr_txt: str, limite: float) -> Dict[str, Any]:
+    """Resultados intermedios que necesitan las etapas posteriores (fuera del cronómetro)."""
+    f = core.parsear_funcion(expr_txt)
+    try:
+        dominio = ejecutar_con_limite(core.calcular_dominio, limite, f)
+    except TimeoutError:
+        dominio = "tiempo agotado"
+    try:
+        raices, y0 = ejecutar_con_limite(core.intersecciones, limite, f)
+    except TimeoutError:
+        raices, y0 = [], "tiempo agotado"
+    return {"f": f, "dominio": dominio, "raices": raices, "y0": y0}
+
+
+def _graficar(f: Any, dominio: Any, raices: Any, y0: Any) -> None:
+    plot.graficar_funcion(f, dominio, raices, y0)
+    plt.close('all')
+
+
+def _etapas(expr_txt: str, datos: Dict[str, Any]) -> Dict[str, Callable[[], Any]]:
+    f, dominio = datos["f"], datos["dominio"]
+    return {
+        "limpiar_input": lambda: core.limpiar_input(expr_txt),
+        "parsear_funcion": lambda: core.parsear_funcion(expr_txt),
+        "calcular_dominio": lambda: core.calcular_dominio(f),
+        "calcular_recorrido": lambda: core.calcular_recorrido(f, dominio),
+        "intersecciones": lambda: core.intersecciones(f),
+        "muestreo_lista": lambda: core.evaluar_lista_segura(f, core.generar_muestra_x(dominio, NPOINTS, RANGO_EXTRA)),
+        "muestreo_numpy": lambda: core.evaluar_arreglo(f, core.generar_muestra_np(dominio, NPOINTS, RANGO_EXTRA)),
+        "muestreo_adaptativo": lambda: core.generar_muestra_adaptativa(f, dominio, PRESUPUESTO_ADAPTATIVO, RANGO_EXTRA),
+        "graficar_funcion": lambda: _graficar(f, dominio, datos["raices"], datos["y0"]),
+    }
+
+
+def _limpiar_caches() -> None:
+    """
+    Sin cachés calientes (SymPy, simplificada, kernels y análisis, en memoria y en disco),
+    cada repetición mide el trabajo completo sin importar qué corrió antes.
+    """
+    clear_cache()
+    core.simplificada.cache_clear()
+    kernels.limpiar_kernels()
+    cache.obtener_cache().limpiar()
+
+
+def medir(funcion: Callable[[], Any], repeticiones: int, limite: float) -> Dict[str, Any]:
+    """Mediana del tiempo de pared de varias repeticiones y memoria pico (tracemalloc) de una más."""
+    tiempos = []
+    for _ in range(repeticiones):
+        _limpiar_caches()
+        inicio = time.perf_counter()
+        try:
+            ejecutar_con_limite(funcion, limite)
+        except TimeoutError:
+            return {"tiempo_s": None, "memoria_pico_kb": None, "error": f"tiempo agotado ({limite} s)"}
+        except Exception as e:
+            return {"tiempo_s": None, "memoria_pico_kb": None, "error": str(e)}
+        tiempos.append(time.perf_counter() - inicio)
+    _limpiar_caches()
+    tracemalloc.start()
+    try:
+        ejecutar_con_limite(funcion, limite)
+        _, pico = tracemalloc.get_traced_memory()
+    except BaseException:
+        pico = 0
+    finally:
+        tracemalloc.stop()
+    return {"tiempo_s": round(statistics.median(tiempos), 6), "memoria_pico_kb": round(pico / 1024, 1), "error": None}
+
+
+_CODIGO_ARRANQUE = """
+import json, sys, time
+inicio = time.perf_counter()
+import main
+tiempo = time.perf_counter() - inicio
+pesados = [m for m in ("sympy", "matplotlib") if m in sys.modules]
+ventana = None
+try:
+    root = main.tk.Tk()
+    main.AnalizadorApp(root)
+    root.update()
+    ventana = time.perf_counter() - inicio
+    root.destroy()
+except main.tk.TclError:
+    pass
+print(json.dumps({"tiempo_s": tiempo, "ventana_s": ventana, "pesados": pesados}))
+"""
+
+
+def medir_arranque(repeticiones: int = 3) -> Dict[str, Any]:
+    """
+    En un intérprete nuevo: tiempo de importar main.py, módulos pesados cargados en ese
+    momento y, si hay pantalla, tiempo hasta el primer dibujado de la ventana (ventana_s;
+    None sin pantalla, y entonces no se verifica).
+    """
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    tiempos, ventanas, pesados = [], [], []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, "-c", _CODIGO_ARRANQUE], cwd=directorio,
+                                capture_output=True, text=True, check=True).stdout
+        datos = json.loads(salida.strip().splitlines()[-1])
+        tiempos.append(datos["tiempo_s"])
+        if datos["ventana_s"] is not None:
+            ventanas.append(datos["ventana_s"])
+        pesados = datos["pesados"]
+    return {"tiempo_s": round(statistics.median(tiempos), 6),
+            "ventana_s": round(statistics.median(ventanas), 6) if ventanas else None,
+            "objetivo_s": OBJETIVO_ARRANQUE_S, "objetivo_ventana_s": OBJETIVO_VENTANA_S, "pesados": pesados}
+
+
+def verificar_arranque(medida: Dict[str, Any]) -> List[str]:
+    """Problemas del arranque respecto de los objetivos OBJETIVO_ARRANQUE_S y OBJETIVO_VENTANA_S."""
+    problemas = []
+    if medida["tiempo_s"] > medida["objetivo_s"]:
+        problemas.append(f"arranque: {medida['tiempo_s']:.3f} s supera el objetivo de {medida['objetivo_s']:.3f} s")
+    if medida["ventana_s"] is not None and medida["ventana_s"] > medida["objetivo_ventana_s"]:
+        problemas.append(f"arranque: la ventana se dibuja a los {medida['ventana_s']:.3f} s, "
+                         f"supera el objetivo de {medida['objetivo_ventana_s']:.3f} s")
+    if medida["pesados"]:
+        problemas.append(f"arranque: importar main carga {', '.join(medida['pesados'])}")
+    return problemas
+
+
+def ejecutar(repeticiones: int = 3, limite: float = 10.0, filtro: Optional[str] = None,
+             etapas: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Corre el corpus completo y devuelve {"meta": ..., "resultados": {categoria: {expr: {etapa: medida}}}}."""
+    resultados: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for categoria, expresiones in CORPUS.items():
+        for expr_txt in expresiones:
+            if filtro and filtro not in expr_txt and filtro != categoria:
+                continue
+            datos = _preparar(expr_txt, limite)
+            medidas = {}
+            for etapa, funcion in _etapas(expr_txt, datos).items():
+                if etapas and etapa not in etapas:
+                    continue
+                medidas[etapa] = medir(funcion, repeticiones, limite)
+                print(f"{categoria:16s} {expr_txt:28s} {etapa:20s} {_formato(medidas[etapa])}", file=sys.stderr)
+            resultados.setdefault(categoria, {})[expr_txt] = medidas
+    meta = {
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "sympy": sp.__version__,
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "maquina": platform.platform(),
+        "repeticiones": repeticiones,
+    }
+    return {"meta": meta, "resultados": resultados}
+
+
+def _formato(medida: Dict[str, Any]) -> str:
+    if medida["error"]:
+        return medida["error"]
+    return f"{medida['tiempo_s'] * 1000:10.2f} ms {medida['memoria_pico_kb']:10.1f} KiB"
+
+
+def comparar(actual: Dict[str, Any], base: Dict[str, Any], umbral: float, minimo_s: float) -> List[str]:
+    """
+    Regresiones de actual respecto de base: etapas cuyo tiempo creció más que el umbral
+    relativo (ignorando las que en ambos casos duran menos de minimo_s) o que antes
+    terminaban y ahora fallan.
+    """
+    regresiones = []
+    for categoria, expresiones in actual["resultados"].items():
+        for expr_txt, medidas in expresiones.items():
+            previas = base.get("resultados", {}).get(categoria, {}).get(expr_txt, {})
+            for etapa, medida in medidas.items():
+                previa = previas.get(etapa)
+                if not previa or previa["tiempo_s"] is None:
+                    continue
+                if medida["tiempo_s"] is None:
+                    regresiones.append(f"{expr_txt} / {etapa}: antes {previa['tiempo_s']:.4f} s, ahora {medida['error']}")
+                    continue
+                if max(medida["tiempo_s"], previa["tiempo_s"]) < minimo_s:
+                    continue
+                if medida["tiempo_s"] > previa["tiempo_s"] * (1 + umbral):
+                    cambio = medida["tiempo_s"] / previa["tiempo_s"] - 1 if previa["tiempo_s"] else float("inf")
+                    regresiones.append(f"{expr_txt} / {etapa}: {previa['tiempo_s']:.4f} s -> {medida['tiempo_s']:.4f} s (+{cambio:.0%})")
+    return regresiones
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de las etapas del Analizador de Funciones.")
+    parser.add_argument("-r", "--repeticiones", type=int, default=3, help="Repeticiones por etapa (se usa la mediana).")
+    parser.add_argument("-l", "--limite", type=float, default=10.0, help="Tiempo máximo por etapa, en segundos.")
+    parser.add_argument("-f", "--filtro", default=None, help="Solo expresiones que contengan este texto (o esta categoría).")
+    parser.add_argument("-e", "--etapas", default="", help=f"Etapas separadas por comas ({', '.join(ETAPAS)}).")
+    parser.add_argument("-g", "--guardar", default=None, help="Guarda los resultados como JSON (nueva línea base).")
+    parser.add_argument("-c", "--comparar", default=None, help="JSON de línea base contra el cual comparar.")
+    parser.add_argument("-u", "--umbral", type=float, default=0.25, help="Aumento relativo de tiempo considerado regresión.")
+    parser.add_argument("--minimo-ms", type=float, default=1.0, help="Etapas más rápidas que esto no se comparan.")
+    parser.add_argument("-a", "--solo-arranque", action="store_true", help="Solo verifica el tiempo de arranque.")
+    args = parser.parse_args(argv)
+    atexit.register(shutil.rmtree, config.CACHE_DIR, True)
+    arranque = medir_arranque(args.repeticiones)
+    ventana = (f"{arranque['ventana_s'] * 1000:.1f} ms (objetivo {arranque['objetivo_ventana_s'] * 1000:.0f} ms)"
+               if arranque["ventana_s"] is not None else "sin pantalla")
+    print(f"arranque: import {arranque['tiempo_s'] * 1000:.1f} ms (objetivo {arranque['objetivo_s'] * 1000:.0f} ms), "
+          f"ventana dibujada: {ventana}", file=sys.stderr)
+    problemas = verificar_arranque(arranque)
+    if args.solo_arranque:
+        for p in problemas:
+            print(p)
+        return 1 if problemas else 0
+    etapas = [e.strip() for e in args.etapas.split(',') if e.strip()] or None
+    actual = ejecutar(args.repeticiones, args.limite, args.filtro, etapas)
+    actual["arranque"] = arranque
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as fh:
+            json.dump(actual, fh, indent=2, ensure_ascii=False)
+    for p in problemas:
+        print(p)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as fh:
+            base = json.load(fh)
+        regresiones = comparar(actual, base, args.umbral, args.minimo_ms / 1000)
+        if regresiones:
+            print(f"{len(regresiones)} regresión(es) sobre el umbral de {args.umbral:.0%}:")
+            for r in regresiones:
+                print("  " + r)
+            return 1
+        print("Sin regresiones.")
+    return 1 if problemas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+"""
+cache.py
+Caché de resultados del análisis (parseo, dominio, recorrido e intersecciones)
+"""
+from typing import Any, Callable, Optional
+from collections import OrderedDict
+import hashlib
+import os
+import pickle
+import threading
+import sympy as sp
+from core import limpiar_input, parsear_funcion
+from numerico import ResultadoAproximado, dominio_con_limite, recorrido_con_limite, intersecciones_con_limite
+from config import CACHE_MAX_ENTRADAS, CACHE_DISCO_ACTIVO, CACHE_DIR, CACHE_DISCO_MAX_BYTES
+
+_NO_ENCONTRADO = object()
+# Se incrementa cuando cambia la forma de los resultados (invalida lo guardado en disco)
+VERSION_CACHE = 4
+
+
+class CacheLRU:
+    """
+    Caché en memoria con política LRU y tamaño acotado.
+    """
+    def __init__(self, max_entradas: int = 512):
+        self.max_entradas = max_entradas
+        self._datos: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: Any, defecto: Any = _NO_ENCONTRADO) -> Any:
+        with self._lock:
+            if clave not in self._datos:
+                return defecto
+            self._datos.move_to_end(clave)
+            return self._datos[clave]
+
+    def guardar(self, clave: Any, valor: Any) -> None:
+        with self._lock:
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._datos.clear()
+
+    def __len__(self) -> int:
+        return len(self._datos)
+
+
+class CacheDisco:
+    """
+    Almacén persistente en disco: un archivo pickle por clave.
+    Cuando el tamaño total supera max_bytes se eliminan los archivos usados hace más tiempo.
+    El total se lleva en memoria (se mide una vez y se actualiza al guardar y borrar): el
+    directorio solo se recorre cuando hay que desalojar, y entonces se baja hasta el 90 %
+    de max_bytes para que el siguiente recorrido no llegue en el próximo guardado.
+    """
+    def __init__(self, directorio: str, max_bytes: int = 50 * 1024 * 1024):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self._total: Optional[int] = None
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, clave: str) -> str:
+        nombre = hashlib.sha256(clave.encode('utf-8')).hexdigest()
+        return os.path.join(self.directorio, nombre + ".pkl")
+
+    def obtener(self, clave: str) -> Any:
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'rb') as fh:
+                clave_guardada, valor = pickle.load(fh)
+            if clave_guardada != clave:
+                return _NO_ENCONTRADO
+            os.utime(ruta, None)
+            return valor
+        except Exception:
+            return _NO_ENCONTRADO
+
+    def guardar(self, clave: str, valor: Any) -> None:
+        ruta = self._ruta(clave)
+        tmp = f"{ruta}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, 'wb') as fh:
+                pickle.dump((clave, valor), fh, protocol=pickle.HIGHEST_PROTOCOL)
+            nuevo = os.path.getsize(tmp)
+            try:
+                anterior = os.path.getsize(ruta)
+            except OSError:
+                anterior = 0
+            os.replace(tmp, ruta)
+        except Exception:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+        if self._total is None:
+            self._total = sum(tam for _, tam, _ in self._entradas())
+        else:
+            self._total += nuevo - anterior
+        if self._total > self.max_bytes:
+            self._desalojar()
+
+    def _entradas(self) -> list:
+        """(mtime, tamaño, ruta) de cada archivo de la caché."""
+        entradas = []
+        try:
+            nombres = os.listdir(self.directorio)
+        except OSError:
+            return entradas
+        for nombre in nombres:
+            if not nombre.endswith(".pkl"):
+                continue
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                st = os.stat(ruta)
+            except OSError:
+                continue
+            entradas.append((st.st_mtime, st.st_size, ruta))
+        return entradas
+
+    def _desalojar(self) -> None:
+        # El recorrido también corrige el total (otros procesos comparten el directorio)
+        entradas = self._entradas()
+        total = sum(e[1] for e in entradas)
+        if total <= self.max_bytes:
+            self._total = total
+            return
+        for _, tam, ruta in sorted(entradas):
+            if total <= 0.9 * self.max_bytes:
+                break
+            try:
+                os.remove(ruta)
+                total -= tam
+            except OSError:
+                pass
+        self._total = total
+
+    def limpiar(self) -> None:
+        for _, _, ruta in self._entradas():
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+        self._total = 0
+
+
+class CacheAnalisis:
+    """
+    Caché de dos niveles (memoria LRU + disco opcional) para las etapas del análisis.
+    Las claves son la etapa más la forma canónica (srepr) de la expresión.
+    """
+    def __init__(self, max_entradas: int = CACHE_MAX_ENTRADAS, directorio: Optional[str] = None,
+                 max_bytes: int = CACHE_DISCO_MAX_BYTES):
+        self.memoria = CacheLRU(max_entradas)
+        self.disco: Optional[CacheDisco] = None
+        if directorio:
+            try:
+                self.disco = CacheDisco(directorio, max_bytes)
+            except OSError:
+                self.disco = None
+
+    def obtener_o_calcular(self, etapa: str, clave: str, calcular: Callable[[], Any],
+                           guardar_si: Callable[[Any], bool] = lambda valor: True, persistir: bool = True) -> Any:
+        """
+        Valor de la etapa desde memoria, disco o calculándolo. Solo se guarda lo que cumple
+        guardar_si (los respaldos numéricos no se guardan: la próxima vez se reintenta el exacto).
+        Con persistir=False lo calculado queda solo en memoria.
+        """
+        clave_completa = f"v{VERSION_CACHE}:{etapa}:{clave}"
+        valor = self.memoria.obtener(clave_completa)
+        if valor is not _NO_ENCONTRADO:
+            return valor
+        if self.disco is not None:
+            valor = self.disco.obtener(clave_completa)
+            if valor is not _NO_ENCONTRADO:
+                self.memoria.guardar(clave_completa, valor)
+                return valor
+        valor = calcular()
+        if not guardar_si(valor):
+            return valor
+        self.memoria.guardar(clave_completa, valor)
+        if persistir and self.disco is not None:
+            self.disco.guardar(clave_completa, valor)
+        return valor
+
+    def limpiar(self) -> None:
+        self.memoria.limpiar()
+        if self.disco is not None:
+            self.disco.limpiar()
+
+
+_cache_global: Optional[CacheAnalisis] = None
+
+
+def obtener_cache() -> CacheAnalisis:
+    """Devuelve la caché compartida por la aplicación (se crea en el primer uso)."""
+    global _cache_global
+    if _cache_global is None:
+        _cache_global = CacheAnalisis(directorio=CACHE_DIR if CACHE_DISCO_ACTIVO else None)
+    return _cache_global
+
+
+def clave_expresion(f: Any) -> str:
+    """Forma canónica de una expresión sympy para usar como clave."""
+    return sp.srepr(f)
+
+
+def parsear_funcion_cache(funcion_str: str, persistir: bool = True) -> Any:
+    """parsear_funcion con caché; la clave es la entrada ya limpiada."""
+    if not funcion_str or funcion_str.strip() == "":
+        raise ValueError("No ingresaste ninguna función.")
+    return obtener_cache().obtener_o_calcular("parseo", limpiar_input(funcion_str),
+                                              lambda: parsear_funcion(funcion_str), persistir=persistir)
+
+
+def es_exacto(valor: Any) -> bool:
+    """False si valor (o alguna parte de una tupla) es un ResultadoAproximado."""
+    if isinstance(valor, tuple):
+        return all(es_exacto(v) for v in valor)
+    return not isinstance(valor, ResultadoAproximado)
+
+
+def calcular_dominio_cache(f: Any) -> Any:
+    return obtener_cache().obtener_o_calcular("dominio", clave_expresion(f), lambda: dominio_con_limite(f), es_exacto)
+
+
+def calcular_recorrido_cache(f: Any, dominio: Any) -> Any:
+    clave = clave_expresion(f) + "|" + (sp.srepr(dominio) if isinstance(dominio, sp.Basic) else str(dominio))
+    return obtener_cache().obtener_o_calcular("recorrido", clave, lambda: recorrido_con_limite(f, dominio), es_exacto)
+
+
+def intersecciones_cache(f: Any) -> Any:
+    return obtener_cache().obtener_o_calcular("intersecciones", clave_expresion(f),
+                                              lambda: intersecciones_con_limite(f), es_exacto)
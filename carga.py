@@ -0,0 +1,140 @@
+"""
+carga.py
+Prueba de carga del servicio local (servidor.py): solicitudes por segundo y latencias p50/p90/p99
+"""
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import argparse
+import http.client
+import itertools
+import json
+import sys
+import threading
+import time
+import numpy as np
+from config import SERVIDOR_HOST, SERVIDOR_PUERTO
+
+FUNCIONES_CARGA = ["x^2 - 4", "1/(x-2)", "(x+1)/(x-1)", "sin(x)", "exp(-x^2)", "sqrt(4 - x^2)",
+                   "log(x^2 - 1)", "x^3 - 3x + 1", "sin(x)/x", "2x^3 - x"]
+ENDPOINTS_CARGA = ["parseo", "dominio", "recorrido", "raices", "evaluar", "curva"]
+
+
+def solicitudes(endpoints: List[str], funciones: List[str], distintas: bool) -> Any:
+    """
+    Genera (endpoint, cuerpo) en ronda. Con distintas=True cada solicitud lleva una función
+    nueva (f + i), así se mide el cálculo y no la caché de respuestas.
+    """
+    for i in itertools.count():
+        funcion = funciones[(i // len(endpoints)) % len(funciones)]
+        endpoint = endpoints[i % len(endpoints)]
+        texto = f"{funcion} + {i}" if distintas else funcion
+        cuerpo: Dict[str, Any] = {"funcion": texto}
+        if endpoint == "evaluar":
+            cuerpo["x"] = ["0", "1", "pi/2"]
+        elif endpoint == "curva":
+            cuerpo["puntos"] = 500
+        yield endpoint, cuerpo
+
+
+def ejecutar_carga(host: str, puerto: int, total: int, concurrencia: int, endpoints: List[str],
+                   funciones: List[str], distintas: bool = False) -> Dict[str, Any]:
+    """
+    Envía total solicitudes desde concurrencia hilos, cada uno con su conexión persistente.
+    Devuelve las latencias (s), los códigos de estado y la duración total.
+    """
+    generador = solicitudes(endpoints, funciones, distintas)
+    lock = threading.Lock()
+    latencias: List[float] = []
+    codigos: Dict[int, int] = {}
+    restantes = [total]
+
+    def siguiente() -> Optional[Tuple[str, Dict[str, Any]]]:
+        with lock:
+            if restantes[0] <= 0:
+                return None
+            restantes[0] -= 1
+            return next(generador)
+
+    def cliente() -> None:
+        conexion = http.client.HTTPConnection(host, puerto, timeout=120)
+        while True:
+            item = siguiente()
+            if item is None:
+                break
+            endpoint, cuerpo = item
+            datos = json.dumps(cuerpo).encode("utf-8")
+            inicio = time.perf_counter()
+            try:
+                conexion.request("POST", f"/{endpoint}", body=datos, headers={"Content-Type": "application/json"})
+                respuesta = conexion.getresponse()
+                respuesta.read()
+                codigo = respuesta.status
+            except (OSError, http.client.HTTPException):
+                conexion.close()
+                conexion = http.client.HTTPConnection(host, puerto, timeout=120)
+                codigo = 0
+            demora = time.perf_counter() - inicio
+            with lock:
+                latencias.append(demora)
+                codigos[codigo] = codigos.get(codigo, 0) + 1
+        conexion.close()
+
+    hilos = [threading.Thread(target=cliente, daemon=True) for _ in range(concurrencia)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return {"latencias": np.array(latencias), "codigos": codigos, "duracion_s": time.perf_counter() - inicio}
+
+
+def resumen(resultado: Dict[str, Any]) -> str:
+    latencias_ms = resultado["latencias"] * 1000
+    n = latencias_ms.size
+    lineas = [f"solicitudes: {n} en {resultado['duracion_s']:.2f} s -> {n / resultado['duracion_s']:.1f} req/s",
+              "códigos: " + ", ".join(f"{c or 'sin respuesta'}: {k}" for c, k in sorted(resultado["codigos"].items()))]
+    if n:
+        p50, p90, p99 = np.percentile(latencias_ms, [50, 90, 99])
+        lineas.append(f"latencia (ms): p50 {p50:.2f}  p90 {p90:.2f}  p99 {p99:.2f}  máx {latencias_ms.max():.2f}")
+    return "\n".join(lineas)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga del servicio local del analizador.")
+    parser.add_argument("-u", "--url", default=f"http://{SERVIDOR_HOST}:{SERVIDOR_PUERTO}", help="URL del servicio.")
+    parser.add_argument("-n", "--solicitudes", type=int, default=2000, help="Cantidad total de solicitudes.")
+    parser.add_argument("-c", "--concurrencia", type=int, default=8, help="Clientes simultáneos.")
+    parser.add_argument("-e", "--endpoints", default=",".join(ENDPOINTS_CARGA),
+                        help="Endpoints a usar, separados por comas.")
+    parser.add_argument("-d", "--distintas", action="store_true",
+                        help="Una función distinta por solicitud (mide el cálculo, no la caché).")
+    parser.add_argument("--iniciar", action="store_true",
+                        help="Levanta el servicio en este mismo proceso (en un puerto libre) antes de medir.")
+    parser.add_argument("-j", "--trabajadores", type=int, default=None, help="Procesos del servicio con --iniciar.")
+    args = parser.parse_args(argv)
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    servidor = None
+    if args.iniciar:
+        from servidor import ServicioAnalisis, crear_servidor
+        servidor = crear_servidor(SERVIDOR_HOST, 0, ServicioAnalisis(args.trabajadores))
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        host, puerto = servidor.server_address[:2]
+    else:
+        partes = urlsplit(args.url)
+        host, puerto = partes.hostname or SERVIDOR_HOST, partes.port or SERVIDOR_PUERTO
+    try:
+        resultado = ejecutar_carga(host, puerto, args.solicitudes, args.concurrencia, endpoints,
+                                   FUNCIONES_CARGA, args.distintas)
+    finally:
+        if servidor is not None:
+            servidor.shutdown()
+            servidor.server_close()
+            servidor.servicio.cerrar()
+    print(resumen(resultado))
+    if servidor is not None:
+        print("servicio: " + json.dumps(servidor.servicio.estado()))
+    return 0 if resultado["codigos"].get(0, 0) < args.solicitudes else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
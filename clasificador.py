@@ -0,0 +1,197 @@
+"""
+clasificador.py
+Clasificación de expresiones y caminos rápidos para dominio y recorrido (polinomios, racionales y composiciones elementales)
+"""
+from typing import Any, List, Optional, Tuple
+import numpy as np
+import sympy as sp
+
+# Funciones definidas en todos los reales (no agregan condiciones al dominio)
+_FUNCIONES_TOTALES = (sp.exp, sp.sin, sp.cos, sp.atan, sp.sinh, sp.cosh, sp.tanh, sp.asinh, sp.Abs)
+
+
+def clasificar(f: Any, x: Any) -> str:
+    """
+    Devuelve la clase de f: "constante", "polinomio", "racional", "elemental" (composición
+    de funciones elementales con argumentos racionales) o "general".
+    """
+    if not f.has(x):
+        return "constante"
+    if f.free_symbols != {x}:
+        return "general"
+    if f.is_polynomial(x):
+        return "polinomio"
+    if f.is_rational_function(x):
+        return "racional"
+    return "elemental" if _condiciones_dominio(f, x) is not None else "general"
+
+
+def _condiciones_dominio(f: Any, x: Any) -> Optional[List[Tuple[Any, str]]]:
+    """
+    Condiciones (u, relación) con u racional en x que definen el dominio de f, con relación
+    en {"!=", ">", ">="}. None si alguna subexpresión no tiene un camino rápido conocido.
+    """
+    condiciones: List[Tuple[Any, str]] = []
+    for sub in sp.preorder_traversal(f):
+        if sub.is_Atom or not sub.has(x):
+            continue
+        if sub.is_Add or sub.is_Mul:
+            continue
+        if sub.is_Pow:
+            base, exponente = sub.args
+            if not base.has(x):
+                if base.is_positive:
+                    continue
+                return None
+            if exponente.has(x) or not exponente.is_Rational:
+                return None
+            if exponente.is_negative:
+                condiciones.append((base, "!="))
+            if not exponente.is_Integer and exponente.q % 2 == 0:
+                condiciones.append((base, ">" if exponente.is_negative else ">="))
+            continue
+        if isinstance(sub, sp.log) and len(sub.args) == 1:
+            condiciones.append((sub.args[0], ">"))
+            continue
+        if isinstance(sub, (sp.asin, sp.acos)):
+            condiciones.append((1 - sub.args[0], ">="))
+            condiciones.append((1 + sub.args[0], ">="))
+            continue
+        if isinstance(sub, _FUNCIONES_TOTALES):
+            continue
+        return None
+    for u, _ in condiciones:
+        if not u.is_rational_function(x):
+            return None
+    return condiciones
+
+
+def _valor(r: Any) -> float:
+    """Valor numérico para ordenar extremos exactos (±oo incluidos)."""
+    return float(sp.N(r, 30))
+
+
+def _raices_reales(poly: Any) -> List[Any]:
+    """Raíces reales exactas y distintas de un Poly, ordenadas (vacío si es constante)."""
+    if poly.degree() <= 0:
+        return []
+    return sorted(set(poly.real_roots()), key=_valor)
+
+
+def _punto_entre(a: Any, b: Any) -> sp.Rational:
+    """Un racional entre a y b (cualquiera de los dos puede ser infinito)."""
+    if a is sp.S.NegativeInfinity and b is sp.S.Infinity:
+        return sp.Integer(0)
+    if a is sp.S.NegativeInfinity:
+        return sp.Integer(int(np.floor(_valor(b)))) - 1
+    if b is sp.S.Infinity:
+        return sp.Integer(int(np.ceil(_valor(a)))) + 1
+    return sp.Rational(str(sp.N((a + b) / 2, 30)))
+
+
+# Los conjuntos intermedios son listas ordenadas de tramos (a, b, a_cerrado, b_cerrado): se
+# intersecan sin pasar por la simplificación de conjuntos de SymPy, que es lo más lento
+def _tramos_racionales(u: Any, x: Any, relacion: str) -> List[Tuple[Any, Any, bool, bool]]:
+    """
+    Tramos de {x real : u(x) relacion 0} para u racional, sin cancelar factores comunes: los
+    ceros del denominador quedan siempre excluidos. El signo entre cortes consecutivos se
+    decide evaluando en un racional intermedio (aritmética exacta).
+    """
+    num, den = (sp.Poly(p, x) for p in sp.fraction(sp.together(u)))
+    ceros, polos = _raices_reales(num), _raices_reales(den)
+    cortes = sorted(set(ceros + polos), key=_valor)
+    bordes = [sp.S.NegativeInfinity] + cortes + [sp.S.Infinity]
+    if relacion == "!=":
+        return [(a, b, False, False) for a, b in zip(bordes[:-1], bordes[1:])]
+    tramos = []
+    for a, b in zip(bordes[:-1], bordes[1:]):
+        t = _punto_entre(a, b)
+        if num.eval(t) * den.eval(t) > 0:
+            tramos.append((a, b, False, False))
+    if relacion == ">=":
+        tramos += [(c, c, True, True) for c in ceros if c not in polos]
+    return _unir(tramos)
+
+
+def _unir(tramos: List[Tuple[Any, Any, bool, bool]]) -> List[Tuple[Any, Any, bool, bool]]:
+    """Ordena los tramos y junta los que se tocan en un extremo cerrado."""
+    tramos = sorted(tramos, key=lambda t: (_valor(t[0]), _valor(t[1])))
+    unidos: List[Tuple[Any, Any, bool, bool]] = []
+    for a, b, ca, cb in tramos:
+        if unidos and unidos[-1][1] == a and (unidos[-1][3] or ca):
+            unidos[-1] = (unidos[-1][0], b, unidos[-1][2], cb or a == b)
+            continue
+        unidos.append((a, b, ca, cb))
+    return unidos
+
+
+def _intersecar(p: List[Tuple[Any, Any, bool, bool]], q: List[Tuple[Any, Any, bool, bool]]) -> List[Tuple[Any, Any, bool, bool]]:
+    """Intersección de dos listas de tramos."""
+    resultado = []
+    for a1, b1, ca1, cb1 in p:
+        for a2, b2, ca2, cb2 in q:
+            va1, va2, vb1, vb2 = _valor(a1), _valor(a2), _valor(b1), _valor(b2)
+            a, ca = (a1, ca1) if va1 > va2 else (a2, ca2) if va2 > va1 else (a1, ca1 and ca2)
+            b, cb = (b1, cb1) if vb1 < vb2 else (b2, cb2) if vb2 < vb1 else (b1, cb1 and cb2)
+            va, vb = _valor(a), _valor(b)
+            if va < vb or (va == vb and ca and cb):
+                resultado.append((a, b, ca, cb))
+    return resultado
+
+
+def _como_conjunto(tramos: List[Tuple[Any, Any, bool, bool]]) -> Any:
+    """Conjunto de SymPy con los tramos (ya disjuntos y ordenados)."""
+    if len(tramos) == 1 and tramos[0][:2] == (sp.S.NegativeInfinity, sp.S.Infinity):
+        return sp.S.Reals
+    partes = [sp.FiniteSet(a) if a == b else sp.Interval(a, b, not ca, not cb) for a, b, ca, cb in tramos]
+    if not partes:
+        return sp.S.EmptySet
+    return partes[0] if len(partes) == 1 else sp.Union(*partes, evaluate=False)
+
+
+def dominio_rapido(f: Any, x: Any) -> Optional[Any]:
+    """
+    Dominio de f por un camino rápido según su clase, o None si hay que usar continuous_domain.
+    Polinomios: todos los reales; racionales: los reales menos las raíces reales del
+    denominador; composiciones elementales: intersección de las condiciones de cada parte.
+    """
+    try:
+        clase = clasificar(f, x)
+        if clase in ("constante", "polinomio"):
+            return sp.S.Reals
+        if clase == "racional":
+            return _como_conjunto(_tramos_racionales(sp.fraction(sp.together(f))[1], x, "!="))
+        if clase == "elemental":
+            tramos = [(sp.S.NegativeInfinity, sp.S.Infinity, False, False)]
+            for u, relacion in _condiciones_dominio(f, x):
+                tramos = _intersecar(tramos, _tramos_racionales(u, x, relacion))
+            return _como_conjunto(tramos)
+    except (sp.PolynomialError, sp.polys.polyerrors.PolificationFailed, NotImplementedError, TypeError):
+        pass
+    return None
+
+
+def recorrido_rapido(f: Any, x: Any, dominio: Any) -> Optional[Any]:
+    """
+    Recorrido de un polinomio sobre todos los reales a partir de sus puntos críticos
+    (raíces reales de la derivada con Poly); None para cualquier otro caso.
+    """
+    if dominio != sp.S.Reals:
+        return None
+    try:
+        clase = clasificar(f, x)
+        if clase == "constante":
+            return sp.FiniteSet(f)
+        if clase != "polinomio":
+            return None
+        p = sp.Poly(f, x)
+        if not all(c.is_real for c in p.all_coeffs()):
+            return None
+        if p.degree() % 2 == 1:
+            return sp.S.Reals
+        valores = [sp.radsimp(sp.expand(p.as_expr().subs(x, c))) for c in _raices_reales(p.diff(x))]
+        if p.LC() > 0:
+            return sp.Interval(min(valores, key=_valor), sp.S.Infinity)
+        return sp.Interval(sp.S.NegativeInfinity, max(valores, key=_valor))
+    except (sp.PolynomialError, sp.polys.polyerrors.PolificationFailed, NotImplementedError, TypeError):
+        return None
@@ -0,0 +1,164 @@
+"""
+comparacion.py
+Comparación de varias funciones (f, g, f-g, derivadas...) evaluadas juntas sobre una misma malla
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from functools import cached_property
+import itertools
+import re
+import numpy as np
+import sympy as sp
+from sympy.parsing.sympy_parser import parse_expr
+from core import x, TRANSFORMACIONES, limpiar_input, evaluador_vectorizado
+from kernels import compilar_kernel, enmascarar_complejos
+from numerico import raices_numericas
+from utils import ejecutar_con_limite
+from config import COMPARACION_RANGO, NPOINTS, LIMITE_RAICES_S, SALTO_RELATIVO_POLO
+
+NOMBRES_AUTOMATICOS = "fghpqrsuvw"
+_DEFINICION = re.compile(r"^\s*([A-Za-z]\w*)\s*(?:\(\s*x\s*\))?\s*=(.*)$")
+# Los nombres se buscan con lookbehind y no con \b: así también valen tras un coeficiente (2f, 2f')
+_ANTES_DE_NOMBRE = r"(?<![A-Za-z_.])"
+_PRIMAS = re.compile(_ANTES_DE_NOMBRE + r"([A-Za-z]\w*)('+)")
+
+
+def parsear_funciones(lineas: List[str]) -> List[Tuple[str, Any]]:
+    """
+    Interpreta una función por línea. Cada línea puede ser "nombre = expresión" o solo la
+    expresión (se nombra f, g, h, ... en orden). Las expresiones pueden usar las funciones
+    anteriores por nombre, con o sin (x), y sus derivadas con primas: f-g, 2f + g(x), f', g''.
+    """
+    funciones: List[Tuple[str, Any]] = []
+    definidas: Dict[str, Any] = {}
+    libres = (n for n in NOMBRES_AUTOMATICOS)
+    for linea in lineas:
+        texto = texto_original = limpiar_input(linea)
+        if not texto:
+            continue
+        m = _DEFINICION.match(texto)
+        nombre = None
+        if m and m.group(1) != 'x':
+            nombre, texto = m.group(1), m.group(2).strip()
+        elif not any(re.search(rf"{_ANTES_DE_NOMBRE}{n}\b", texto) for n in definidas):
+            # Expresión nueva sin nombre: recibe el siguiente nombre libre
+            nombre = next((n for n in libres if n not in definidas), None)
+        if not texto:
+            raise ValueError(f"Falta la expresión de {nombre}.")
+        for n in definidas:
+            texto = re.sub(rf"{_ANTES_DE_NOMBRE}{n}('*)\s*\(\s*x\s*\)", rf"{n}\1", texto)
+        texto = _PRIMAS.sub(lambda p: f"diff({p.group(1)}, x, {len(p.group(2))})"
+                            if p.group(1) in definidas else p.group(0), texto)
+        try:
+            f = parse_expr(texto, local_dict={'x': x, 'diff': sp.diff, **definidas}, transformations=TRANSFORMACIONES)
+        except Exception as e:
+            raise ValueError(f"Sympy no pudo interpretar la función: {linea.strip()}\nDetalle: {e}")
+        desconocidos = {str(s) for s in getattr(f, 'free_symbols', set())} - {'x'}
+        if desconocidos:
+            raise ValueError(f"Nombre desconocido en '{linea.strip()}': {', '.join(sorted(desconocidos))}")
+        f = sp.sympify(f)
+        if nombre is not None:
+            definidas[nombre] = f
+        funciones.append((nombre or texto_original, f))
+    if not funciones:
+        raise ValueError("No ingresaste ninguna función.")
+    return funciones
+
+
+def cortar_saltos(ys: np.ndarray, salto_relativo: float = SALTO_RELATIVO_POLO) -> np.ndarray:
+    """
+    Pone NaN en los saltos de cada fila (cambio de signo con una diferencia mayor que
+    salto_relativo veces la escala típica de la fila) para no unir ramas a través de un polo.
+    """
+    ys = ys.copy()
+    for fila in ys:
+        finitos = fila[np.isfinite(fila)]
+        if finitos.size < 3:
+            continue
+        bajo, alto = np.percentile(finitos, [2, 98])
+        escala = max(alto - bajo, 1e-12)
+        a, b = fila[:-1], fila[1:]
+        with np.errstate(invalid='ignore'):
+            salto = (np.sign(a) != np.sign(b)) & (np.abs(b - a) > salto_relativo * escala)
+        i = np.flatnonzero(salto)
+        mayor = np.where(np.abs(a[i]) > np.abs(b[i]), i, i + 1)
+        fila[mayor] = np.nan
+    return ys
+
+
+class ComparacionFunciones:
+    """
+    Varias funciones de x evaluadas con un único kernel: lambdify con cse sobre la tupla de
+    expresiones, así f, g y f-g comparten el cálculo de f y g. Las muestras son un arreglo
+    apilado de forma (k, n), una fila por función.
+    """
+    def __init__(self, funciones: List[Tuple[str, Any]]):
+        self.nombres = [n for n, _ in funciones]
+        self.expresiones = [f for _, f in funciones]
+
+    @classmethod
+    def desde_texto(cls, texto: str) -> "ComparacionFunciones":
+        return cls(parsear_funciones(texto.replace(';', '\n').splitlines()))
+
+    def __len__(self) -> int:
+        return len(self.expresiones)
+
+    @cached_property
+    def kernel(self) -> Callable[[np.ndarray], np.ndarray]:
+        """Evaluador apilado: xs de forma (n,) -> ys de forma (k, n), NaN donde no es real y finita."""
+        try:
+            fx = compilar_kernel(sp.Tuple(*self.expresiones), x, "numpy")
+        except Exception:
+            fx = None
+        por_fila = None
+
+        def evaluar(xs: np.ndarray) -> np.ndarray:
+            nonlocal por_fila
+            xs = np.asarray(xs, dtype=float)
+            try:
+                if fx is None:
+                    raise TypeError("kernel apilado no disponible")
+                with np.errstate(all='ignore'):
+                    filas = [np.broadcast_to(np.asarray(v), xs.shape) for v in fx(xs)]
+                ys = enmascarar_complejos(np.stack(filas)).astype(float)
+            except Exception:
+                # Alguna función no existe en NumPy: se evalúa cada fila con su propio respaldo
+                if por_fila is None:
+                    por_fila = [evaluador_vectorizado(f) for f in self.expresiones]
+                ys = np.stack([e(xs) for e in por_fila])
+            ys[~np.isfinite(ys)] = np.nan
+            return ys
+        return evaluar
+
+    def muestras(self, a: float = COMPARACION_RANGO[0], b: float = COMPARACION_RANGO[1],
+                 npoints: int = NPOINTS) -> Tuple[np.ndarray, np.ndarray]:
+        """Malla común xs (n,) y valores apilados (k, n) con los saltos en polos cortados."""
+        xs = np.linspace(a, b, npoints)
+        return xs, cortar_saltos(self.kernel(xs))
+
+    def intersecciones(self, a: float = COMPARACION_RANGO[0], b: float = COMPARACION_RANGO[1],
+                       limite: Optional[float] = LIMITE_RAICES_S) -> List[Dict[str, Any]]:
+        """
+        Puntos de corte entre cada par de funciones en [a, b], como raíces numéricas de la
+        diferencia. Devuelve [{"par": (nombre_i, nombre_j), "puntos": [(x, y), ...]}]; si un
+        par excede el tiempo límite, "puntos" es None.
+        """
+        resultado = []
+        xs = np.linspace(a, b, 257)
+        ys_malla = self.kernel(xs)
+        for i, j in itertools.combinations(range(len(self)), 2):
+            par = (self.nombres[i], self.nombres[j])
+            # Iguales en toda la malla: se toman como la misma función (p. ej. f y f-g con g=0)
+            if np.allclose(ys_malla[i], ys_malla[j], rtol=1e-12, atol=1e-12, equal_nan=True):
+                resultado.append({"par": par, "puntos": [], "identicas": True})
+                continue
+            try:
+                raices = ejecutar_con_limite(raices_numericas, limite, self.expresiones[i] - self.expresiones[j], a, b)
+            except TimeoutError:
+                resultado.append({"par": par, "puntos": None, "identicas": False})
+                continue
+            rs = np.array(sorted(raices), dtype=float)
+            ys = self.kernel(rs)[[i, j]] if rs.size else np.empty((2, 0))
+            validos = np.isfinite(ys).all(axis=0)
+            puntos = [(float(r), float(y)) for r, y in zip(rs[validos], ys[0, validos])]
+            resultado.append({"par": par, "puntos": puntos, "identicas": False})
+        return resultado
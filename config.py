@@ -2,11 +2,15 @@
 config.py
 Configuraciones y constantes globales para el Analizador de Funciones
 """
+import os
 
 # Configuración de la gráfica
 FIGURE_SIZE = (8, 5)
-NPOINTS = 300
+NPOINTS = 2000
 RANGO_EXTRA = 8
+MUESTREO_ADAPTATIVO = False
+PRESUPUESTO_ADAPTATIVO = 1500
+MAX_RAICES_LEYENDA = 6
 
 # Colores y estilos
 COLOR_RAIZ = 'blue'
@@ -18,3 +22,69 @@ TITULO_GRAFICA = "Gráfica de la función"
 XLABEL = "x"
 YLABEL = "f(x)"
 LEGENDA_FONT_SIZE = 'small'
+
+# Caché de resultados del análisis
+CACHE_MAX_ENTRADAS = 512
+CACHE_DISCO_ACTIVO = True
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "analizador_funciones")
+CACHE_DISCO_MAX_BYTES = 50 * 1024 * 1024
+KERNELS_MAX_MEMORIA = 256
+
+# Proceso trabajador del análisis
+INTERVALO_SONDEO_MS = 50
+
+# Arranque: módulos que la interfaz importa en segundo plano y tiempo objetivo
+# para importar main.py (antes de crear la ventana) y hasta el primer dibujado de la ventana
+MODULOS_PRECARGA = ("sympy", "numpy", "matplotlib.figure", "matplotlib.backends.backend_tkagg", "analisis", "plot", "comparacion", "tabla")
+OBJETIVO_ARRANQUE_S = 0.5
+OBJETIVO_VENTANA_S = 1.0
+
+# Análisis en vivo: vista previa numérica tras una pausa breve al escribir (en un hilo
+# aparte) y análisis simbólico completo cuando la entrada queda estable
+MODO_VIVO = True
+ESPERA_VISTA_PREVIA_MS = 250
+ESPERA_ANALISIS_MS = 1000
+
+# Tiempos límite por etapa (segundos) y respaldo numérico
+LIMITE_DOMINIO_S = 5
+LIMITE_RECORRIDO_S = 5
+LIMITE_RAICES_S = 5
+RANGO_NUMERICO = 50
+NPUNTOS_NUMERICO = 20001
+UMBRAL_SINGULARIDAD = 1e8
+GRADO_MAX_RAICES_EXACTAS = 20
+
+# Análisis por lotes (lote.py)
+LOTE_TIMEOUT_S = 30
+LOTE_PENDIENTES_POR_TRABAJADOR = 4
+
+# Modo comparación (comparacion.py)
+COMPARACION_RANGO = (-10.0, 10.0)
+SALTO_RELATIVO_POLO = 0.5
+COLORES_COMPARACION = ('tab:blue', 'tab:orange', 'tab:green', 'tab:purple', 'tab:brown', 'tab:pink', 'tab:olive', 'tab:cyan')
+
+# Tabla de valores (tabla.py)
+TABLA_PRECISION = 30
+TABLA_UMBRAL_CONDICION = 1e8
+TABLA_MAX_PRECISA = 20000
+TABLA_MAX_PUNTOS = 10 ** 6
+TABLA_FILAS_VISIBLES = 2000
+
+# Curvas muestreadas y exportación (curva.py): puntos por bloque al muestrear y escribir
+CURVA_BLOQUE = 2 ** 16
+
+# Servicio local (servidor.py) y prueba de carga (carga.py)
+SERVIDOR_HOST = "127.0.0.1"
+SERVIDOR_PUERTO = 8765
+SERVIDOR_TIMEOUT_S = 10
+SERVIDOR_MAX_PUNTOS = 100000
+SERVIDOR_CACHE_RESPUESTAS = 1024
+
+# Remuestreo según la vista (zoom y desplazamiento)
+PUNTOS_POR_TESELA = 512
+TESELAS_POR_VISTA = 4
+TESELAS_MAX = 256
+
+# Perfilado por etapa (perfil.py)
+PERFIL_HISTORIAL = 20
+PERFIL_LOG_JSON = os.environ.get("ANALIZADOR_PERFIL_LOG")
@@ -2,66 +2,131 @@
 core.py
 Funciones matemáticas principales para el Analizador de Funciones
 """
-from typing import Any, Tuple, Dict, Union
+from typing import Any, Callable, Tuple, Dict, Union
+from functools import lru_cache
+from array import array
 import sympy as sp
+from sympy.parsing.sympy_parser import (parse_expr, standard_transformations, implicit_multiplication,
+                                        implicit_application, function_exponentiation, convert_xor)
+from tokenize import NAME, NUMBER, OP
+import numpy as np
 import math
+from perfil import etapa
+from kernels import kernel_vectorizado, compilar_kernel
+from clasificador import dominio_rapido, recorrido_rapido
 x = sp.Symbol('x')
 
+def _partir_nombre(nombre: str, conocidos: Dict[str, Any]) -> Union[list, None]:
+    """
+    Tokens de un nombre que empieza con x pegada a otros factores: 'xx' -> x*x, 'x2' -> x*2,
+    'xsin' -> x*sin (la función queda para el paréntesis que sigue). None si no se puede partir así.
+    """
+    partes = []
+    resto = nombre
+    while resto:
+        if resto[0] == 'x':
+            partes.append((NAME, 'x'))
+            resto = resto[1:]
+        elif resto[0].isdigit():
+            digitos = len(resto) - len(resto.lstrip('0123456789'))
+            partes.append((NUMBER, resto[:digitos]))
+            resto = resto[digitos:]
+        elif resto in conocidos:
+            partes.append((NAME, resto))
+            resto = ""
+        else:
+            return None
+    tokens = []
+    for parte in partes:
+        if tokens:
+            tokens.append((OP, '*'))
+        tokens.append(parte)
+    return tokens
+
+def _separar_x(tokens: list, local_dict: Dict[str, Any], global_dict: Dict[str, Any]) -> list:
+    """Transformación de parse_expr: separa la x de lo que la sigue sin operador ('x2', 'xsin(x)')."""
+    resultado = []
+    for tipo, valor in tokens:
+        if tipo == NAME and len(valor) > 1 and valor[0] == 'x' and valor not in local_dict and valor not in global_dict:
+            partes = _partir_nombre(valor, {**global_dict, **local_dict})
+            if partes is not None:
+                resultado.extend(partes)
+                continue
+        resultado.append((tipo, valor))
+    return resultado
+
+TRANSFORMACIONES = (_separar_x,) + standard_transformations + (
+    convert_xor,
+    implicit_multiplication,
+    implicit_application,
+    function_exponentiation,
+)
+
+@etapa("limpiar_input")
 def limpiar_input(raw: str) -> str:
     """
-    Limpia la entrada del usuario para sympy.
-    Reemplaza '^' por '**', elimina espacios y agrega '*' donde falta.
+    Normaliza la entrada del usuario en una sola pasada (espacios repetidos y extremos).
+    La multiplicación implícita ('2x', '2sin(x)', '(x+1)(x-1)') y '^' los resuelven
+    las transformaciones de parse_expr en parsear_funcion.
     """
-    s = raw.strip()
-    s = s.replace('^', '**')
-    s = s.replace(' ', '')
-    out = ""
-    for i, ch in enumerate(s):
-        out += ch
-        if i+1 < len(s):
-            a, b = ch, s[i+1]
-            if (a.isdigit() or a == ')') and (b == 'x' or b == '('):
-                out += '*'
-            if a == 'x' and (b.isdigit() or b == 'x' or b == '('):
-                out += '*'
-    out = out.replace('**', '^TEMP^').replace('* *', '*').replace('^TEMP^', '**')
-    return out
+    return " ".join(raw.split())
 
-def parsear_funcion(funcion_str: str) -> Any:
+@lru_cache(maxsize=256)
+def simplificada(f: Any) -> Any:
+    """sp.simplify de f, calculado solo cuando una etapa lo pide y memorizado."""
+    return sp.simplify(f)
+
+@etapa("parseo")
+def parsear_funcion(funcion_str: str, simplificar: bool = False) -> Any:
     """
-    Convierte el string limpiado a expresión sympy.
+    Convierte el string a expresión sympy con el tokenizador de parse_expr.
+    La simplificación es opcional (ver simplificada), porque sp.simplify es lo más caro del parseo.
     """
     if not funcion_str or funcion_str.strip() == "":
         raise ValueError("No ingresaste ninguna función.")
     s = limpiar_input(funcion_str)
     try:
-        expr = sp.sympify(s)
-        return sp.simplify(expr)
+        expr = parse_expr(s, local_dict={'x': x}, transformations=TRANSFORMACIONES)
     except Exception as e:
         raise ValueError(f"Sympy no pudo interpretar la función: {e}")
+    desconocidos = {str(s) for s in getattr(expr, 'free_symbols', set())} - {'x'}
+    if desconocidos:
+        raise ValueError(f"Solo se admite la variable x (nombre desconocido: {', '.join(sorted(desconocidos))}).")
+    return simplificada(expr) if simplificar else expr
 
+@etapa("dominio")
 def calcular_dominio(f: Any) -> Union[Any, str]:
     """
     Calcula el dominio simbólico de la función.
+    Polinomios, racionales y composiciones elementales usan un camino rápido (clasificador.py).
     """
     try:
+        dom = dominio_rapido(f, x)
+        if dom is not None:
+            return dom
         dom = sp.calculus.util.continuous_domain(f, x, sp.S.Reals)
         return dom
     except Exception as e:
         return f"No se pudo determinar simbólicamente ({e})"
 
+@etapa("recorrido")
 def calcular_recorrido(f: Any, dominio: Any) -> Union[Any, str]:
     """
     Calcula el recorrido simbólico de la función.
+    Los polinomios sobre todos los reales se resuelven por sus puntos críticos.
     """
     try:
         if isinstance(dominio, str):
             raise Exception("Dominio simbólico no disponible")
+        rango = recorrido_rapido(f, x, dominio)
+        if rango is not None:
+            return rango
         rango = sp.calculus.util.function_range(f, x, dominio)
         return rango
     except Exception as e:
         return f"No se pudo calcular simbólicamente ({e})"
 
+@etapa("intersecciones")
 def intersecciones(f: Any) -> Tuple[Any, Any]:
     """
     Calcula raíces (eje X) y f(0) (eje Y).
@@ -76,12 +141,13 @@ def intersecciones(f: Any) -> Tuple[Any, Any]:
         y0 = "No se pudo calcular f(0)"
     return raices, y0
 
+@etapa("evaluacion")
 def evaluar_paso_a_paso(f: Any, valor_x: Any) -> Dict[str, Any]:
     """
     Muestra el paso a paso de la evaluación de la función en un punto.
     """
     pasos: Dict[str, Any] = {}
-    pasos['expresion_original'] = sp.simplify(f)
+    pasos['expresion_original'] = simplificada(f)
     try:
         pasos['sustitucion'] = f.subs(x, valor_x)
         pasos['simplificada'] = sp.simplify(pasos['sustitucion'])
@@ -96,9 +162,11 @@ def evaluar_paso_a_paso(f: Any, valor_x: Any) -> Dict[str, Any]:
         pasos['valor_numerico'] = pasos['sustitucion']
     return pasos
 
-def generar_muestra_x(dominio_sym: Any, npoints: int = 500, rango_extra: int = 5) -> list:
+@etapa("muestreo")
+def generar_muestra_x(dominio_sym: Any, npoints: int = 500, rango_extra: int = 5) -> array:
     """
-    Genera una lista de puntos x para graficar evitando discontinuidades.
+    Genera los puntos x para graficar evitando discontinuidades.
+    Se devuelven como array('d') (8 bytes por punto, no un float de Python por elemento).
     """
     xs = []
     try:
@@ -139,13 +207,16 @@ def generar_muestra_x(dominio_sym: Any, npoints: int = 500, rango_extra: int = 5
             xs = [i * 0.1 for i in range(-50, 51)]
     except Exception:
         xs = [i * 0.1 for i in range(-50, 51)]
-    xs_unique = sorted(list({round(v, 12) for v in xs}))
-    return xs_unique
+    return array('d', sorted({round(v, 12) for v in xs}))
 
-def evaluar_lista_segura(f, xs):
-    fx = sp.lambdify(x, f, "math")
-    xs_valid = []
-    ys_valid = []
+@etapa("evaluacion_lista")
+def evaluar_lista_segura(f, xs) -> Tuple[array, array]:
+    """
+    Evalúa f punto a punto con el kernel escalar y descarta los puntos donde no es real y finita.
+    """
+    fx = compilar_kernel(f, x, "math")
+    xs_valid = array('d')
+    ys_valid = array('d')
     for xi in xs:
         try:
             yi = fx(xi)
@@ -160,3 +231,243 @@ def evaluar_lista_segura(f, xs):
         except Exception:
             continue
     return xs_valid, ys_valid
+
+def _puntos_en(conjunto: Any, a: float, b: float) -> list:
+    """Puntos reales de conjunto dentro de [a, b] (p. ej. los polos de tan(x) dados como ImageSet)."""
+    try:
+        dentro = conjunto.intersect(sp.Interval(a, b))
+        if not isinstance(dentro, sp.FiniteSet):
+            return []
+        return sorted(float(p) for p in dentro if p.is_real)
+    except Exception:
+        return []
+
+def intervalos_reales(conjunto: Any, inf: float, sup: float) -> Union[list, None]:
+    """
+    Intervalos (a, b) en float de un conjunto Interval, Union o Complement: los extremos
+    infinitos se reemplazan por inf y sup, y los puntos excluidos de un Complement parten
+    los intervalos. None si el conjunto es de otro tipo.
+    """
+    if isinstance(conjunto, sp.Interval):
+        try:
+            a_f = inf if conjunto.start is sp.S.NegativeInfinity else float(conjunto.start)
+        except Exception:
+            a_f = inf
+        try:
+            b_f = sup if conjunto.end is sp.S.Infinity else float(conjunto.end)
+        except Exception:
+            b_f = sup
+        return [(a_f, b_f)] if a_f <= b_f else []
+    if isinstance(conjunto, sp.Union):
+        partes = [intervalos_reales(arg, inf, sup) for arg in conjunto.args]
+        return sorted(tramo for parte in partes if parte for tramo in parte)
+    if isinstance(conjunto, sp.Complement):
+        base, excluido = conjunto.args
+        tramos = intervalos_reales(base, inf, sup)
+        if tramos is None:
+            return None
+        partidos = []
+        for a, b in tramos:
+            for p in _puntos_en(excluido, a, b):
+                if a < p < b:
+                    partidos.append((a, p))
+                    a = p
+            partidos.append((a, b))
+        return partidos
+    return None
+
+def _intervalos_dominio(dominio_sym: Any, rango_extra: float) -> list:
+    """
+    Devuelve los intervalos (a, b) en float del dominio, recortando infinitos a ±rango_extra.
+    """
+    return intervalos_reales(dominio_sym, -rango_extra, rango_extra) or [(-rango_extra, rango_extra)]
+
+@etapa("muestreo")
+def generar_muestra_np(dominio_sym: Any, npoints: int = 2000, rango_extra: float = 5) -> np.ndarray:
+    """
+    Versión vectorizada de generar_muestra_x: un linspace por intervalo del dominio.
+    Entre intervalos se inserta NaN para que la gráfica no una los tramos.
+    """
+    limites = _intervalos_dominio(dominio_sym, rango_extra)
+    total = sum(b - a for a, b in limites) or 1.0
+    tramos = []
+    for a, b in limites:
+        if a == b:
+            tramos.append(np.array([a]))
+            continue
+        n = max(2, int(round(npoints * (b - a) / total)))
+        tramos.append(np.linspace(a, b, n))
+        tramos.append(np.array([np.nan]))
+    xs = np.concatenate(tramos)
+    return xs[:-1] if xs.size > 1 and np.isnan(xs[-1]) else xs
+
+@etapa("kernel")
+def evaluador_vectorizado(f: Any, persistir: bool = True) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Construye (una sola vez) un evaluador de f sobre arreglos con el kernel NumPy de kernels.py
+    (con cse y cacheado en memoria y, si persistir=True, en disco).
+    Los valores complejos, infinitos o NaN quedan como NaN (la gráfica los omite).
+    Si numpy no soporta alguna función de la expresión se recurre a evaluar_lista_segura.
+    """
+    try:
+        fx = kernel_vectorizado(f, x, persistir=persistir)
+    except Exception:
+        fx = None
+
+    def evaluar(xs: np.ndarray) -> np.ndarray:
+        xs = np.asarray(xs, dtype=float)
+        try:
+            if fx is None:
+                raise TypeError("kernel numpy no disponible")
+            ys = fx(xs)
+        except Exception:
+            validos = ~np.isnan(xs)
+            xs_ok, ys_ok = evaluar_lista_segura(f, xs[validos].tolist())
+            ys = np.full(xs.shape, np.nan)
+            pos = np.flatnonzero(validos)[np.isin(xs[validos], xs_ok)]
+            ys[pos] = ys_ok
+        ys[~np.isfinite(ys)] = np.nan
+        return ys
+    return evaluar
+
+def evaluar_arreglo(f: Any, xs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Evalúa f sobre todo el arreglo xs de una vez. Devuelve (xs, ys) con NaN donde f no es real y finita.
+    """
+    xs = np.asarray(xs, dtype=float)
+    return xs, evaluador_vectorizado(f)(xs)
+
+def _discontinuidades(evaluar: Callable[[np.ndarray], np.ndarray], a: np.ndarray, b: np.ndarray,
+                      umbral: float, hacia_maximo: bool = False,
+                      iteraciones: int = 24) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decide qué segmentos [a_i, b_i] contienen un salto o un polo: se biseca cada uno quedándose
+    con la mitad de mayor variación (saltos, polos con cambio de signo) o, con hacia_maximo,
+    la de mayor |y| (polos de orden par, como tan(x)^2). En una función continua la variación
+    del segmento tiende a 0 al achicarlo; si a ancho ~(b - a)/2**iteraciones sigue sobre
+    umbral y no bajó de una milésima de la inicial (o creció, como cerca de un polo), hay una
+    discontinuidad.
+    Devuelve la posición estimada de cada una y la máscara de segmentos que la tienen.
+    Cuesta 3 + 2 * iteraciones evaluaciones por segmento.
+    """
+    a, b = a.copy(), b.copy()
+    ya, yb = evaluar(a), evaluar(b)
+    m = 0.5 * (a + b)
+    ym = evaluar(m)
+    variacion = inicial = None
+    for _ in range(iteraciones):
+        q1, q3 = 0.5 * (a + m), 0.5 * (m + b)
+        y1, y3 = evaluar(q1), evaluar(q3)
+        var_izq = np.nan_to_num(np.abs(y1 - ya) + np.abs(ym - y1), nan=np.inf)
+        var_der = np.nan_to_num(np.abs(y3 - ym) + np.abs(yb - y3), nan=np.inf)
+        if hacia_maximo:
+            izq = np.nan_to_num(np.abs(y1), nan=np.inf) >= np.nan_to_num(np.abs(y3), nan=np.inf)
+        else:
+            izq = var_izq >= var_der
+        variacion = np.where(izq, var_izq, var_der)
+        if inicial is None:
+            inicial = np.maximum(var_izq, var_der)
+        a, ya, b, yb, m, ym = (np.where(izq, a, m), np.where(izq, ya, ym), np.where(izq, m, b),
+                               np.where(izq, ym, yb), np.where(izq, q1, q3), np.where(izq, y1, y3))
+    return m, ~(variacion <= umbral) & ~(variacion <= 1e-3 * inicial)
+
+def _refinar_tramo(evaluar: Callable[[np.ndarray], np.ndarray], a: float, b: float, presupuesto: int,
+                   tol: float, tol_salto: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Muestreo adaptativo de [a, b]: parte de una malla gruesa y biseca recursivamente (por
+    rondas) los segmentos cuyo punto medio se aleja de la interpolación lineal o cambia de
+    validez, priorizando los de mayor error, hasta agotar el presupuesto de evaluaciones.
+    Los segmentos con un salto grande se examinan con _discontinuidades: si contienen un polo
+    o un salto, la línea se corta ahí y se agregan puntos que se acercan a él desde cada lado.
+    Todas las evaluaciones (bisección de discontinuidades y acercamientos incluidos) se
+    descuentan del presupuesto; si no alcanza, se examinan primero los saltos más grandes.
+    """
+    n0 = int(min(max(33, presupuesto // 4), presupuesto))
+    xs = np.linspace(a, b, n0)
+    ys = evaluar(xs)
+    finitos = ys[np.isfinite(ys)]
+    escala = float(np.subtract(*np.percentile(finitos, [99, 1]))) if finitos.size >= 2 else 0.0
+    escala = escala or 1.0
+    ancho_min = (b - a) * 1e-9
+    acercamiento = 2.0 ** -np.arange(2, 12)
+    iteraciones = 16
+    # Una pasada de _discontinuidades más los acercamientos a ambos lados de un corte
+    pasada = 3 + 2 * iteraciones
+    costo_candidato = pasada + 2 * acercamiento.size
+    xs_total, ys_total, cortes = [xs], [ys], []
+    izq, der, y_izq, y_der = xs[:-1], xs[1:], ys[:-1], ys[1:]
+    prioridad = np.full(izq.shape, np.inf)
+    restante = presupuesto - n0
+    while restante > 0 and izq.size:
+        if izq.size > restante:
+            elegidos = np.argsort(-prioridad, kind='stable')[:restante]
+            izq, der, y_izq, y_der = izq[elegidos], der[elegidos], y_izq[elegidos], y_der[elegidos]
+        medio = 0.5 * (izq + der)
+        y_medio = evaluar(medio)
+        restante -= medio.size
+        xs_total.append(medio)
+        ys_total.append(y_medio)
+        ok_i, ok_m, ok_d = np.isfinite(y_izq), np.isfinite(y_medio), np.isfinite(y_der)
+        error = np.abs(y_medio - 0.5 * (y_izq + y_der))
+        error = np.where((ok_i != ok_m) | (ok_m != ok_d), np.inf, np.where(ok_i & ok_m & ok_d, error, 0.0))
+        supera = error > tol * escala
+        # Candidatos a polo o salto: se deciden al ancho actual, sin esperar a llegar a ancho_min
+        salto = np.maximum(np.abs(y_der - y_izq), error)
+        candidato = np.flatnonzero(supera & ok_i & ok_d & (salto > tol_salto * escala))
+        candidato = candidato[np.argsort(-salto[candidato], kind='stable')[:max(restante, 0) // costo_candidato]]
+        if candidato.size:
+            posicion, corte = _discontinuidades(evaluar, izq[candidato], der[candidato], tol_salto * escala,
+                                                iteraciones=iteraciones)
+            restante -= pasada * candidato.size
+            # Los que no muestran salto ni polo con cambio de signo se buscan como polos de orden par
+            # (sin gastar los acercamientos ya reservados para los cortes encontrados)
+            reservado = 2 * acercamiento.size * int(corte.sum())
+            resto = np.flatnonzero(~corte)[:max(restante - reservado, 0) // costo_candidato]
+            if resto.size:
+                pico, polo_par = _discontinuidades(evaluar, izq[candidato[resto]], der[candidato[resto]],
+                                                   tol_salto * escala, True, iteraciones)
+                restante -= pasada * resto.size
+                posicion[resto], corte[resto] = pico, polo_par
+            if corte.any():
+                cortados = candidato[corte]
+                posicion = posicion[corte]
+                ancho = (der[cortados] - izq[cortados])[:, None] * acercamiento
+                cerca = np.concatenate([(posicion[:, None] - ancho).ravel(), (posicion[:, None] + ancho).ravel()])
+                xs_total.append(cerca)
+                ys_total.append(evaluar(cerca))
+                restante -= cerca.size
+                cortes.append(posicion)
+                supera[cortados] = False
+        r = supera & ((der - izq) > ancho_min)
+        izq, der, y_izq, y_der, prioridad = (
+            np.concatenate([izq[r], medio[r]]), np.concatenate([medio[r], der[r]]),
+            np.concatenate([y_izq[r], y_medio[r]]), np.concatenate([y_medio[r], y_der[r]]),
+            np.concatenate([error[r], error[r]]),
+        )
+    cortes_x = np.concatenate(cortes) if cortes else np.array([])
+    xs = np.concatenate(xs_total + [cortes_x])
+    ys = np.concatenate(ys_total + [np.full(cortes_x.shape, np.nan)])
+    orden = np.argsort(xs, kind='stable')
+    return xs[orden], ys[orden]
+
+@etapa("muestreo_adaptativo")
+def generar_muestra_adaptativa(f: Any, dominio_sym: Any, presupuesto: int = 1500, rango_extra: float = 5,
+                               tol: float = 1e-3, tol_salto: float = 0.05) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Muestrea f refinando cerca de polos, saltos y zonas de alta curvatura.
+    Devuelve (xs, ys) con NaN entre intervalos del dominio y en las discontinuidades detectadas.
+    """
+    evaluar = evaluador_vectorizado(f)
+    limites = _intervalos_dominio(dominio_sym, rango_extra)
+    total = sum(b - a for a, b in limites) or 1.0
+    xs_tramos, ys_tramos = [], []
+    for a, b in limites:
+        if a == b:
+            xs_t = np.array([a])
+            ys_t = evaluar(xs_t)
+        else:
+            xs_t, ys_t = _refinar_tramo(evaluar, a, b, max(17, int(presupuesto * (b - a) / total)),
+                                        tol, tol_salto)
+        xs_tramos += [xs_t, np.array([np.nan])]
+        ys_tramos += [ys_t, np.array([np.nan])]
+    return np.concatenate(xs_tramos)[:-1], np.concatenate(ys_tramos)[:-1]
@@ -0,0 +1,250 @@
+"""
+curva.py
+Curvas muestreadas en arreglos float64 compactos (x, y, máscara de validez y tramos) y su
+exportación a .npy/.npz (legibles con memory mapping) y CSV por bloques
+"""
+from typing import Any, Iterable, Iterator, List, Optional, TextIO, Tuple
+from functools import cached_property
+import argparse
+import os
+import sys
+import zipfile
+import numpy as np
+from core import evaluador_vectorizado, _intervalos_dominio
+from config import NPOINTS, RANGO_EXTRA, CURVA_BLOQUE
+
+# Registro de un punto en los .npy: 17 bytes (una lista de floats de Python usa ~4 veces más)
+DTYPE_CURVA = np.dtype([('x', '<f8'), ('y', '<f8'), ('valido', '?')])
+
+Bloque = Tuple[np.ndarray, np.ndarray]
+
+
+class Curva:
+    """
+    Curva muestreada: x e y como arreglos float64, la máscara de puntos válidos (f real y
+    finita) y los tramos continuos entre discontinuidades. Los tramos se deducen de la
+    máscara: todo corte (polo, borde del dominio, salto detectado) es un punto inválido, como
+    el NaN que insertan generar_muestra_np y generar_muestra_adaptativa.
+    Los arreglos pueden ser memmaps de un archivo (ver Curva.cargar): nada se copia a memoria.
+    """
+    def __init__(self, xs: Any, ys: Any, validos: Optional[Any] = None):
+        self.x = np.asarray(xs, dtype=np.float64)
+        self.y = np.asarray(ys, dtype=np.float64)
+        if self.x.shape != self.y.shape or self.x.ndim != 1:
+            raise ValueError("x e y deben ser arreglos de una dimensión del mismo largo.")
+        if validos is None:
+            validos = np.isfinite(self.x) & np.isfinite(self.y)
+        self.validos = np.asarray(validos, dtype=bool)
+
+    def __len__(self) -> int:
+        return self.x.size
+
+    @property
+    def nbytes(self) -> int:
+        return self.x.nbytes + self.y.nbytes + self.validos.nbytes
+
+    @cached_property
+    def tramos(self) -> np.ndarray:
+        """Índices [inicio, fin) de cada tramo continuo de puntos válidos, forma (k, 2)."""
+        borde = np.diff(np.concatenate(([False], self.validos, [False])).astype(np.int8))
+        return np.column_stack([np.flatnonzero(borde == 1), np.flatnonzero(borde == -1)])
+
+    def segmentos(self) -> Iterator[Bloque]:
+        """(xs, ys) de cada tramo continuo, como vistas sin copia."""
+        for inicio, fin in self.tramos:
+            yield self.x[inicio:fin], self.y[inicio:fin]
+
+    def bloques(self, tamano: int = CURVA_BLOQUE) -> Iterator[Bloque]:
+        for inicio in range(0, len(self), tamano):
+            yield self.x[inicio:inicio + tamano], self.y[inicio:inicio + tamano]
+
+    # === Exportación ===
+
+    def guardar_npy(self, ruta: str, tamano: int = CURVA_BLOQUE) -> None:
+        """Un único .npy estructurado (x, y, valido), escrito por bloques."""
+        guardar_bloques_npy(self.bloques(tamano), ruta, len(self))
+
+    def guardar_npz(self, ruta: str) -> None:
+        """Un .npz sin comprimir con x, y y valido (Curva.cargar lo abre con memory mapping)."""
+        np.savez(ruta, x=self.x, y=self.y, valido=self.validos)
+
+    def escribir_csv(self, destino: TextIO, tamano: int = CURVA_BLOQUE) -> int:
+        return escribir_bloques_csv(self.bloques(tamano), destino)
+
+    @classmethod
+    def cargar(cls, ruta: str, mmap: bool = True) -> "Curva":
+        """
+        Lee una curva guardada en .npy o .npz. Con mmap=True los datos quedan en el archivo y se
+        leen a medida que se usan, así una curva de millones de puntos no ocupa RAM al abrirla.
+        """
+        if ruta.endswith(".npz"):
+            campos = _abrir_npz(ruta) if mmap else dict(np.load(ruta))
+            return cls(campos["x"], campos["y"], campos["valido"])
+        datos = np.load(ruta, mmap_mode='r' if mmap else None)
+        return cls(datos['x'], datos['y'], datos['valido'])
+
+
+def _abrir_npz(ruta: str) -> dict:
+    """
+    Abre cada arreglo de un .npz sin comprimir como memmap (np.load ignora mmap_mode en .npz):
+    se ubica el .npy de cada miembro dentro del zip y se mapea desde ahí.
+    """
+    campos = {}
+    with zipfile.ZipFile(ruta) as zf, open(ruta, 'rb') as fh:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{info.filename} está comprimido: no se puede mapear en memoria.")
+            # Cabecera local del zip: 30 bytes fijos, luego nombre y campo extra
+            fh.seek(info.header_offset + 26)
+            largo_nombre, largo_extra = np.frombuffer(fh.read(4), dtype='<u2')
+            fh.seek(info.header_offset + 30 + int(largo_nombre) + int(largo_extra))
+            version = np.lib.format.read_magic(fh)
+            leer = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+            forma, orden_fortran, dtype = leer(fh)
+            campos[info.filename[:-4]] = np.memmap(ruta, dtype=dtype, mode='r', shape=forma,
+                                                  order='F' if orden_fortran else 'C', offset=fh.tell())
+    return campos
+
+
+def guardar_bloques_npy(bloques: Iterable[Bloque], ruta: str, total: int) -> None:
+    """Escribe total puntos a un .npy estructurado mapeado en memoria, un bloque a la vez."""
+    salida = np.lib.format.open_memmap(ruta, mode='w+', dtype=DTYPE_CURVA, shape=(total,))
+    inicio = 0
+    for xs, ys in bloques:
+        fin = inicio + xs.size
+        salida['x'][inicio:fin] = xs
+        salida['y'][inicio:fin] = ys
+        salida['valido'][inicio:fin] = np.isfinite(xs) & np.isfinite(ys)
+        inicio = fin
+    if inicio != total:
+        raise ValueError(f"Se esperaban {total} puntos y llegaron {inicio}.")
+    salida.flush()
+    del salida
+
+
+def guardar_bloques_npz(bloques: Iterable[Bloque], ruta: str, total: int, tamano: int = CURVA_BLOQUE) -> None:
+    """
+    Escribe total puntos a un .npz sin comprimir con x, y y valido (el formato de
+    Curva.guardar_npz). Los bloques se vuelcan primero a un .npy temporal mapeado en memoria y
+    de ahí se copia cada campo a su miembro del zip, un bloque a la vez.
+    """
+    temporal = ruta + ".tmp.npy"
+    try:
+        guardar_bloques_npy(bloques, temporal, total)
+        datos = np.load(temporal, mmap_mode='r')
+        with zipfile.ZipFile(ruta, 'w', zipfile.ZIP_STORED, allowZip64=True) as zf:
+            for campo in ('x', 'y', 'valido'):
+                cabecera = {'descr': np.lib.format.dtype_to_descr(DTYPE_CURVA[campo]),
+                            'fortran_order': False, 'shape': (total,)}
+                with zf.open(campo + ".npy", 'w', force_zip64=True) as miembro:
+                    np.lib.format.write_array_header_1_0(miembro, cabecera)
+                    for inicio in range(0, total, tamano):
+                        miembro.write(np.ascontiguousarray(datos[campo][inicio:inicio + tamano]).tobytes())
+        del datos
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+
+def escribir_bloques_csv(bloques: Iterable[Bloque], destino: TextIO) -> int:
+    """Escribe las columnas x,y (nan donde f no es real y finita) y devuelve la cantidad de filas."""
+    destino.write("x,y\n")
+    filas = 0
+    for xs, ys in bloques:
+        # Un solo formateo por bloque: mucho más rápido que np.savetxt, que formatea fila por fila
+        destino.write("%.17g,%.17g\n" * xs.size % tuple(np.column_stack([xs, ys]).ravel().tolist()))
+        filas += xs.size
+    return filas
+
+
+# === Muestreo por bloques ===
+
+def _puntos_por_intervalo(dominio_sym: Any, npoints: int, rango_extra: float) -> List[Tuple[float, float, int]]:
+    """Los mismos intervalos y cantidades de puntos que generar_muestra_np."""
+    limites = _intervalos_dominio(dominio_sym, rango_extra)
+    total = sum(b - a for a, b in limites) or 1.0
+    return [(a, b, 1 if a == b else max(2, int(round(npoints * (b - a) / total)))) for a, b in limites]
+
+
+def total_puntos(dominio_sym: Any, npoints: int = NPOINTS, rango_extra: float = RANGO_EXTRA) -> int:
+    """Largo de la muestra de muestrear_por_bloques, incluidos los NaN entre intervalos."""
+    intervalos = _puntos_por_intervalo(dominio_sym, npoints, rango_extra)
+    return sum(n for _, _, n in intervalos) + len(intervalos) - 1
+
+
+def muestrear_por_bloques(f: Any, dominio_sym: Any, npoints: int = NPOINTS, rango_extra: float = RANGO_EXTRA,
+                          tamano: int = CURVA_BLOQUE) -> Iterator[Bloque]:
+    """
+    La muestra uniforme de generar_muestra_np evaluada con el kernel, entregada en bloques de
+    a lo sumo tamano puntos: la memoria usada no depende de npoints.
+    """
+    evaluar = evaluador_vectorizado(f)
+    separador = np.array([np.nan])
+    for k, (a, b, n) in enumerate(_puntos_por_intervalo(dominio_sym, npoints, rango_extra)):
+        if k:
+            yield separador, separador
+        for inicio in range(0, n, tamano):
+            indices = np.arange(inicio, min(inicio + tamano, n))
+            xs = a + (b - a) * (indices / (n - 1)) if n > 1 else np.array([a])
+            if indices[-1] == n - 1:
+                xs[-1] = b
+            yield xs, evaluar(xs)
+
+
+def muestrear_curva(f: Any, dominio_sym: Any, npoints: int = NPOINTS, rango_extra: float = RANGO_EXTRA) -> Curva:
+    """Curva completa en memoria (16 bytes por punto más la máscara)."""
+    xs = np.empty(total_puntos(dominio_sym, npoints, rango_extra))
+    ys = np.empty_like(xs)
+    inicio = 0
+    for xb, yb in muestrear_por_bloques(f, dominio_sym, npoints, rango_extra):
+        xs[inicio:inicio + xb.size], ys[inicio:inicio + xb.size] = xb, yb
+        inicio += xb.size
+    return Curva(xs, ys)
+
+
+def exportar_muestreo(f: Any, dominio_sym: Any, ruta: str, npoints: int = NPOINTS,
+                      rango_extra: float = RANGO_EXTRA, tamano: int = CURVA_BLOQUE) -> int:
+    """
+    Muestrea f y escribe el resultado a .npy (mapeado en memoria), .npz o .csv, bloque a bloque,
+    sin armar la curva completa en RAM. Devuelve la cantidad de puntos escritos.
+    """
+    bloques = muestrear_por_bloques(f, dominio_sym, npoints, rango_extra, tamano)
+    if ruta.endswith(".npy"):
+        total = total_puntos(dominio_sym, npoints, rango_extra)
+        guardar_bloques_npy(bloques, ruta, total)
+        return total
+    if ruta.endswith(".csv") or ruta == "-":
+        if ruta == "-":
+            return escribir_bloques_csv(bloques, sys.stdout)
+        with open(ruta, "w", encoding="utf-8", newline="") as fh:
+            return escribir_bloques_csv(bloques, fh)
+    if ruta.endswith(".npz"):
+        total = total_puntos(dominio_sym, npoints, rango_extra)
+        guardar_bloques_npz(bloques, ruta, total, tamano)
+        return total
+    raise ValueError(f"Formato no soportado: {ruta} (usa .npy, .npz o .csv)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    from analisis import AnalisisFuncion
+    from numerico import valor_exacto
+    parser = argparse.ArgumentParser(description="Muestrea una función sobre su dominio y exporta la curva.")
+    parser.add_argument("funcion", help="Función de x (ej: 'sin(x)/x').")
+    parser.add_argument("-o", "--salida", default="-", help="Archivo .npy, .npz o .csv ('-' para CSV por stdout).")
+    parser.add_argument("-n", "--puntos", type=int, default=NPOINTS, help="Cantidad de puntos.")
+    parser.add_argument("-r", "--rango", type=float, default=RANGO_EXTRA,
+                        help="Recorte de los extremos infinitos del dominio a ±rango.")
+    args = parser.parse_args(argv)
+    try:
+        analisis = AnalisisFuncion.desde_texto(args.funcion)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    total = exportar_muestreo(analisis.f, valor_exacto(analisis.dominio), args.salida, args.puntos, args.rango)
+    if args.salida != "-":
+        print(f"{total} puntos escritos en {args.salida}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+kernels.py
+Fábrica de kernels numéricos: código generado con eliminación de subexpresiones comunes (cse),
+cacheado en memoria y en disco por expresión
+"""
+from typing import Any, Callable, Dict, Optional
+import builtins
+import inspect
+import os
+import numpy as np
+import sympy as sp
+from sympy.utilities.lambdify import MODULES
+from config import KERNELS_MAX_MEMORIA, CACHE_DISCO_ACTIVO, CACHE_DIR, CACHE_DISCO_MAX_BYTES
+
+# Se incrementa si cambia la forma del código guardado en disco
+VERSION_KERNEL = 1
+_MODULOS = ("numpy", "math", "mpmath")
+
+_memoria: Optional[Any] = None
+_disco: Optional[Any] = None
+_disco_iniciado = False
+_espacios: Dict[str, Dict[str, Any]] = {}
+
+
+def _caches() -> Any:
+    """Crea las cachés en el primer uso (cache.py importa core, que a su vez importa este módulo)."""
+    global _memoria, _disco, _disco_iniciado
+    from cache import CacheLRU, CacheDisco
+    if _memoria is None:
+        _memoria = CacheLRU(KERNELS_MAX_MEMORIA)
+    if not _disco_iniciado:
+        _disco_iniciado = True
+        if CACHE_DISCO_ACTIVO:
+            try:
+                _disco = CacheDisco(os.path.join(CACHE_DIR, "kernels"), CACHE_DISCO_MAX_BYTES)
+            except OSError:
+                _disco = None
+    return _memoria, _disco
+
+
+def _espacio_nombres(modulo: str) -> Dict[str, Any]:
+    """El mismo espacio de nombres que arma lambdify para ese módulo (se arma una sola vez)."""
+    if modulo in _espacios:
+        return dict(_espacios[modulo])
+    defecto, traducciones, importaciones = MODULES[modulo][1], MODULES[modulo][2], MODULES[modulo][3]
+    ns: Dict[str, Any] = {}
+    for linea in importaciones:
+        exec(linea, ns)
+    ns.update(defecto)
+    for nombre_sympy, nombre_modulo in traducciones.items():
+        if nombre_modulo in ns:
+            ns[nombre_sympy] = ns[nombre_modulo]
+    ns.update({'builtins': builtins, 'range': range})
+    _espacios[modulo] = ns
+    return dict(ns)
+
+
+def _desde_codigo(codigo: str, modulo: str) -> Callable:
+    ns = _espacio_nombres(modulo)
+    exec(compile(codigo, f"<kernel-{modulo}>", "exec"), ns)
+    return ns["_lambdifygenerated"]
+
+
+def generar_codigo(f: Any, variable: Any, modulo: str = "numpy") -> str:
+    """
+    Código Python de un evaluador de f: las subexpresiones repetidas (p. ej. sin(x) en
+    sin(x)**2 + sin(x)*cos(x)) se calculan una sola vez.
+    """
+    return inspect.getsource(sp.lambdify(variable, f, modulo, cse=True))
+
+
+def compilar_kernel(f: Any, variable: Any, modulo: str = "numpy", persistir: bool = True) -> Callable:
+    """
+    Evaluador de f(variable) para el módulo dado ("numpy" vectorizado, "math" escalar o "mpmath").
+    Se busca primero en memoria, luego el código generado en disco; solo si no está se
+    genera con cse (y se guarda en disco si persistir=True). No captura errores de
+    evaluación: eso queda a cargo de quien lo usa.
+    """
+    if modulo not in _MODULOS:
+        raise ValueError(f"Módulo no soportado: {modulo}")
+    memoria, disco = _caches()
+    clave = (modulo, variable, f)
+    funcion = memoria.obtener(clave, None)
+    if funcion is not None:
+        return funcion
+    clave_disco = f"kernel-v{VERSION_KERNEL}:sympy-{sp.__version__}:{modulo}:{sp.srepr(variable)}:{sp.srepr(f)}"
+    codigo = disco.obtener(clave_disco) if disco is not None else None
+    if isinstance(codigo, str):
+        funcion = _desde_codigo(codigo, modulo)
+    else:
+        codigo = generar_codigo(f, variable, modulo)
+        funcion = _desde_codigo(codigo, modulo)
+        if disco is not None and persistir:
+            disco.guardar(clave_disco, codigo)
+    memoria.guardar(clave, funcion)
+    return funcion
+
+
+def enmascarar_complejos(ys: np.ndarray, tol: float = 1e-12) -> np.ndarray:
+    """Parte real de ys, con NaN donde la parte imaginaria no es despreciable."""
+    if np.iscomplexobj(ys):
+        return np.where(np.abs(ys.imag) > tol, np.nan, ys.real)
+    return ys
+
+
+def kernel_vectorizado(f: Any, variable: Any, enmascarar: bool = True,
+                       persistir: bool = True) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Kernel NumPy de f sobre arreglos (mismo tamaño que la entrada). Con enmascarar=True
+    los resultados complejos quedan como NaN y los reales como float.
+    """
+    fx = compilar_kernel(f, variable, "numpy", persistir)
+
+    def evaluar(xs: np.ndarray) -> np.ndarray:
+        xs = np.asarray(xs, dtype=float)
+        with np.errstate(all='ignore'):
+            ys = np.asarray(fx(xs))
+        if ys.shape != xs.shape:
+            ys = np.broadcast_to(ys, xs.shape)
+        return enmascarar_complejos(ys).astype(float) if enmascarar else ys
+    return evaluar
+
+
+def limpiar_kernels() -> None:
+    """Vacía la caché de kernels en memoria y en disco."""
+    memoria, disco = _caches()
+    memoria.limpiar()
+    if disco is not None:
+        disco.limpiar()
@@ -0,0 +1,113 @@
+"""
+lote.py
+Análisis por lotes sin interfaz gráfica: lee funciones (una por línea) y escribe un JSON por línea
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from analisis import AnalisisFuncion, a_json
+from utils import ejecutar_con_limite
+from config import LOTE_TIMEOUT_S, LOTE_PENDIENTES_POR_TRABAJADOR
+
+
+def _analizar(funcion_txt: str, puntos: List[str]) -> Dict[str, Any]:
+    analisis = AnalisisFuncion.desde_texto(funcion_txt)
+    resultado = {
+        "funcion": str(analisis.f),
+        "dominio": a_json(analisis.dominio),
+        "recorrido": a_json(analisis.recorrido),
+        "raices": a_json(analisis.raices),
+        "y0": a_json(analisis.y0),
+    }
+    if puntos:
+        resultado["evaluaciones"] = analisis.valores_en(puntos)
+    return resultado
+
+
+def analizar_item(indice: int, funcion_txt: str, puntos: List[str], timeout: Optional[float]) -> Dict[str, Any]:
+    """
+    Analiza una función dentro de un proceso del pool. Nunca lanza: los errores y el
+    tiempo agotado quedan registrados en el campo "error".
+    """
+    inicio = time.perf_counter()
+    registro: Dict[str, Any] = {"indice": indice, "entrada": funcion_txt}
+    try:
+        registro.update(ejecutar_con_limite(_analizar, timeout, funcion_txt, puntos))
+        registro["error"] = None
+    except TimeoutError:
+        registro["error"] = f"Tiempo agotado ({timeout} s)"
+    except Exception as e:
+        registro["error"] = str(e)
+    registro["tiempo_s"] = round(time.perf_counter() - inicio, 6)
+    return registro
+
+
+def leer_funciones(entrada: TextIO) -> Iterator[Tuple[int, str]]:
+    """Entrega (índice, función) por cada línea no vacía; '#' inicia un comentario."""
+    indice = 0
+    for linea in entrada:
+        texto = linea.split('#', 1)[0].strip()
+        if texto:
+            yield indice, texto
+            indice += 1
+
+
+def procesar_lote(items: Iterable[Tuple[int, str]], salida: TextIO, puntos: Optional[List[str]] = None,
+                  trabajadores: Optional[int] = None, timeout: Optional[float] = LOTE_TIMEOUT_S) -> int:
+    """
+    Reparte los items en un pool de procesos y escribe cada resultado apenas está listo.
+    Solo se mantienen LOTE_PENDIENTES_POR_TRABAJADOR tareas por proceso en vuelo, así la memoria
+    no depende del tamaño de la entrada. Devuelve la cantidad de resultados escritos.
+    """
+    trabajadores = trabajadores or os.cpu_count() or 1
+    max_pendientes = trabajadores * LOTE_PENDIENTES_POR_TRABAJADOR
+    escritos = 0
+    iterador = iter(items)
+    with ProcessPoolExecutor(max_workers=trabajadores) as pool:
+        pendientes = set()
+        agotado = False
+        while pendientes or not agotado:
+            while not agotado and len(pendientes) < max_pendientes:
+                try:
+                    indice, funcion_txt = next(iterador)
+                except StopIteration:
+                    agotado = True
+                    break
+                pendientes.add(pool.submit(analizar_item, indice, funcion_txt, puntos or [], timeout))
+            if not pendientes:
+                break
+            listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                salida.write(json.dumps(futuro.result(), ensure_ascii=False) + "\n")
+                escritos += 1
+            salida.flush()
+    return escritos
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analiza funciones por lotes y escribe un resultado JSON por línea.")
+    parser.add_argument("entrada", nargs="?", default="-", help="Archivo con una función por línea ('-' para stdin).")
+    parser.add_argument("-o", "--salida", default="-", help="Archivo JSONL de salida ('-' para stdout).")
+    parser.add_argument("-p", "--puntos", default="", help="Valores de x a evaluar, separados por comas (ej: 0,1,pi/2).")
+    parser.add_argument("-j", "--trabajadores", type=int, default=None, help="Procesos a usar (por defecto, todos los núcleos).")
+    parser.add_argument("-t", "--timeout", type=float, default=LOTE_TIMEOUT_S, help="Tiempo máximo por función, en segundos.")
+    args = parser.parse_args(argv)
+    puntos = [p.strip() for p in args.puntos.split(',') if p.strip()]
+    entrada = sys.stdin if args.entrada == "-" else open(args.entrada, encoding="utf-8")
+    salida = sys.stdout if args.salida == "-" else open(args.salida, "w", encoding="utf-8")
+    try:
+        procesar_lote(leer_funciones(entrada), salida, puntos, args.trabajadores, args.timeout)
+    finally:
+        if entrada is not sys.stdin:
+            entrada.close()
+        if salida is not sys.stdout:
+            salida.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,411 @@
+"""
+numerico.py
+Métodos numéricos de respaldo para cuando las etapas simbólicas exceden su tiempo límite
+"""
+from typing import Any, Callable, List, Optional, Tuple
+import mpmath
+import numpy as np
+import sympy as sp
+from kernels import compilar_kernel, kernel_vectorizado
+from core import x, calcular_dominio, calcular_recorrido, intersecciones, evaluador_vectorizado
+from config import (LIMITE_DOMINIO_S, LIMITE_RECORRIDO_S, LIMITE_RAICES_S,
+                    RANGO_NUMERICO, NPUNTOS_NUMERICO, UMBRAL_SINGULARIDAD, GRADO_MAX_RAICES_EXACTAS)
+from utils import ejecutar_con_limite
+
+
+class ResultadoAproximado:
+    """
+    Resultado obtenido numéricamente. Se muestra con el prefijo '≈' y el método usado
+    para que nunca se confunda con un resultado simbólico exacto.
+    """
+    def __init__(self, valor: Any, metodo: str):
+        self.valor = valor
+        self.metodo = metodo
+
+    def __str__(self) -> str:
+        return f"≈ {self.valor} (aproximado: {self.metodo})"
+
+    __repr__ = __str__
+
+
+def valor_exacto(resultado: Any) -> Any:
+    """Devuelve el valor subyacente, sea un ResultadoAproximado o un resultado simbólico."""
+    return resultado.valor if isinstance(resultado, ResultadoAproximado) else resultado
+
+
+def _evaluador(f: Any) -> Callable[[float], float]:
+    """Evaluador escalar de f que devuelve NaN donde f no es real y finita."""
+    fx = compilar_kernel(f, x, "numpy")
+    def g(v: float) -> float:
+        try:
+            with np.errstate(all='ignore'):
+                y = complex(fx(np.float64(v)))
+        except Exception:
+            return float('nan')
+        if abs(y.imag) > 1e-12 or not np.isfinite(y.real):
+            return float('nan')
+        return y.real
+    return g
+
+
+def _biseccion_vectorizada(evaluar: Callable[[np.ndarray], np.ndarray], a: np.ndarray, b: np.ndarray,
+                           ya: np.ndarray, iteraciones: int = 60) -> np.ndarray:
+    """
+    Bisección simultánea sobre todos los intervalos [a_i, b_i] (cada uno con cambio de signo):
+    una sola evaluación vectorizada por iteración.
+    """
+    a, b, ya = np.array(a, dtype=float), np.array(b, dtype=float), np.array(ya, dtype=float)
+    for _ in range(iteraciones):
+        m = 0.5 * (a + b)
+        ym = evaluar(m)
+        mismo = np.isnan(ym) | (np.sign(ym) == np.sign(ya))
+        a = np.where(mismo, m, a)
+        ya = np.where(mismo & ~np.isnan(ym), ym, ya)
+        b = np.where(mismo, b, m)
+    return 0.5 * (a + b)
+
+
+def _cambios_de_signo(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """Índices i tales que ys[i] e ys[i+1] son válidos, no nulos y de signo opuesto."""
+    return np.flatnonzero(np.sign(ys[:-1]) * np.sign(ys[1:]) < 0)
+
+
+def _ceros_exactos(ys: np.ndarray) -> np.ndarray:
+    """
+    Índices donde ys vale 0 exactamente, con algún vecino válido y ningún vecino nulo
+    (así se descartan los tramos donde f se anula por underflow).
+    """
+    izq = np.concatenate([[np.nan], ys[:-1]])
+    der = np.concatenate([ys[1:], [np.nan]])
+    return np.flatnonzero((ys == 0) & (izq != 0) & (der != 0) & (np.isfinite(izq) | np.isfinite(der)))
+
+
+def _frontera(g: Callable[[float], float], valido: float, invalido: float, iteraciones: int = 60) -> float:
+    """Bisección sobre la validez de g: localiza el borde entre un punto válido y uno inválido."""
+    for _ in range(iteraciones):
+        m = 0.5 * (valido + invalido)
+        if m in (valido, invalido):
+            break
+        if np.isnan(g(m)):
+            invalido = m
+        else:
+            valido = m
+    return valido
+
+
+def _tendencia(g: Callable[[float], float], puntos: List[float]) -> Tuple[List[float], Optional[int]]:
+    """
+    Evalúa g en una sucesión de puntos que se acerca a un borde (o a ±infinito).
+    Devuelve los valores finitos y +1/-1 si la sucesión diverge hacia ±infinito: solo cuando
+    es monótona y sus incrementos no se achican (o termina desbordando en ese sentido).
+    0 si parece acotada; None si oscila con amplitud creciente (no se puede acotar).
+    """
+    valores = [g(p) for p in puntos]
+    finitos = [v for v in valores if np.isfinite(v)]
+    if len(valores) < 4 or any(np.isnan(v) for v in valores):
+        return finitos, 0
+    d = np.diff(finitos)
+    if len(finitos) < len(valores):
+        signo = int(np.sign(valores[-1]))
+        monotona = np.all(np.sign(d) == signo) and np.all(np.sign(valores[len(finitos):]) == signo)
+        return finitos, signo if monotona else 0
+    if not (np.all(d > 0) or np.all(d < 0)):
+        amplitud = np.abs(finitos)
+        return finitos, None if amplitud[-2:].max() > 10 * amplitud[:2].max() else 0
+    if np.all(np.abs(d[1:]) >= 0.99 * np.abs(d[:-1])):
+        return finitos, int(np.sign(d[-1]))
+    return finitos, 0
+
+
+def _desborde(fm: Any, v: float) -> float:
+    """
+    Reevalúa con mpmath un punto donde el kernel dio ±inf: si el valor existe (solo excede el
+    rango de float, como exp(x^2) en x = 30) devuelve ±inf; si f no está definida ahí, NaN.
+    """
+    if fm is None:
+        return float('nan')
+    try:
+        y = fm(mpmath.mpf(v))
+        if abs(mpmath.im(y)) > 1e-12 * max(1, abs(y)) or not mpmath.isfinite(y):
+            return float('nan')
+        return float('inf') if mpmath.re(y) > 0 else float('-inf')
+    except Exception:
+        return float('nan')
+
+
+def _evaluador_extendido(f: Any) -> Callable[[np.ndarray], np.ndarray]:
+    """
+    Evaluador vectorizado que distingue indefinición de desborde: NaN donde f no es real
+    (o no está definida) y ±inf donde f existe pero su valor no cabe en un float.
+    """
+    try:
+        rapido = kernel_vectorizado(f, x)
+    except Exception:
+        rapido = evaluador_vectorizado(f)
+    try:
+        fm = compilar_kernel(f, x, "mpmath")
+    except Exception:
+        fm = None
+
+    def evaluar(xs: np.ndarray) -> np.ndarray:
+        xs = np.asarray(xs, dtype=float)
+        try:
+            ys = np.array(rapido(xs), dtype=float)
+        except Exception:
+            ys = evaluador_vectorizado(f)(xs)
+        for i in np.flatnonzero(np.isinf(ys)):
+            ys[i] = _desborde(fm, xs[i])
+        return ys
+    return evaluar
+
+
+def polos_aproximados(f: Any, a: float = -RANGO_NUMERICO, b: float = RANGO_NUMERICO,
+                      n: int = NPUNTOS_NUMERICO) -> Tuple[np.ndarray, np.ndarray, List[float]]:
+    """
+    Muestrea f en [a, b] y localiza polos que la malla no toca: cambios de signo donde
+    |f| crece sin límite. Devuelve (xs, ys, polos).
+    """
+    evaluar = evaluador_vectorizado(f)
+    xs = np.linspace(a, b, n)
+    ys = evaluar(xs)
+    i = _cambios_de_signo(xs, ys)
+    c = _biseccion_vectorizada(evaluar, xs[i], xs[i + 1], ys[i])
+    gc = np.abs(evaluar(c))
+    polo = np.isnan(gc) | (gc > UMBRAL_SINGULARIDAD) | (gc > 10 * np.maximum(np.abs(ys[i]), np.abs(ys[i + 1])))
+    return xs, ys, [float(v) for v in c[polo]]
+
+
+def _tramos_validos(f: Any) -> Tuple[List[Tuple[float, bool, float, bool]], Callable[[float], float],
+                                      np.ndarray, np.ndarray]:
+    """
+    Tramos donde f está definida como (a, a_cerrado, b, b_cerrado); ±inf marca los bordes de
+    la malla. Los bordes internos se refinan por bisección. El desborde (valores que no caben
+    en un float) no corta el dominio, y los puntos aislados de la malla (como los enteros
+    negativos de x^x) no forman tramos. Devuelve también el evaluador escalar y la malla evaluada.
+    """
+    xs, _, polos = polos_aproximados(f)
+    evaluar = _evaluador_extendido(f)
+    ys = evaluar(xs)
+    g = lambda v: float(evaluar(np.array([v]))[0])
+    validos = ~np.isnan(ys)
+    tramos = []
+    i, n = 0, len(xs)
+    while i < n:
+        if not validos[i]:
+            i += 1
+            continue
+        j = i
+        while j + 1 < n and validos[j + 1]:
+            j += 1
+        if j == i:
+            i += 1
+            continue
+        if i == 0:
+            a, a_cerrado = -np.inf, False
+        else:
+            a = _frontera(g, xs[i], xs[i - 1])
+            a_cerrado = not np.isnan(g(round(a, 9) + 0.0))
+        if j == n - 1:
+            b, b_cerrado = np.inf, False
+        else:
+            b = _frontera(g, xs[j], xs[j + 1])
+            b_cerrado = not np.isnan(g(round(b, 9) + 0.0))
+        cortes = [p for p in polos if xs[i] <= p <= xs[j]]
+        for p in cortes:
+            tramos.append((a, a_cerrado, p, False))
+            a, a_cerrado = p, False
+        tramos.append((a, a_cerrado, b, b_cerrado))
+        i = j + 1
+    return tramos, g, xs, ys
+
+
+def _a_sympy(v: float) -> Any:
+    if v == np.inf:
+        return sp.S.Infinity
+    if v == -np.inf:
+        return sp.S.NegativeInfinity
+    return sp.Float(round(float(v), 6))
+
+
+def dominio_aproximado(f: Any) -> Any:
+    """
+    Aproxima el dominio sondeando f en una malla: los tramos donde f es real forman
+    intervalos y los polos detectados se excluyen.
+    """
+    tramos, _, _, _ = _tramos_validos(f)
+    intervalos = [sp.Interval(_a_sympy(a), _a_sympy(b), not a_c, not b_c) for a, a_c, b, b_c in tramos]
+    return sp.Union(*intervalos) if intervalos else sp.S.EmptySet
+
+
+def _raices_polinomio(p: sp.Poly, a: float, b: float) -> List[float]:
+    """
+    Raíces reales de un polinomio en [a, b]: Poly.real_roots si el grado es bajo y los
+    coeficientes racionales; si no, autovalores de la matriz compañera (np.roots) pulidos con Newton.
+    """
+    if p.degree() <= 0:
+        return []
+    if p.degree() <= GRADO_MAX_RAICES_EXACTAS and (p.domain.is_ZZ or p.domain.is_QQ):
+        raices = np.array([float(r) for r in p.real_roots()])
+    else:
+        coefs = np.array([complex(sp.N(c)) for c in p.all_coeffs()])
+        if not np.any(coefs.imag):
+            coefs = coefs.real
+        candidatas = np.roots(coefs)
+        raices = candidatas[np.abs(candidatas.imag) <= 1e-7 * (1 + np.abs(candidatas.real))].real
+        derivada = np.polyder(coefs)
+        for _ in range(3):
+            with np.errstate(all='ignore'):
+                paso = np.polyval(coefs, raices) / np.polyval(derivada, raices)
+            raices = np.where(np.isfinite(paso), raices - np.real(paso), raices)
+    raices = raices[(raices >= a) & (raices <= b)]
+    return sorted({round(float(r), 12) for r in raices})
+
+
+def _raices_malla(f: Any, a: float, b: float, n: int) -> List[float]:
+    """
+    Raíces por cambio de signo en una malla, refinadas con bisección vectorizada. Se descartan
+    los cambios de signo donde |f| no se achica respecto de la malla (polos y saltos). Las
+    raíces dobles (sin cambio de signo) se buscan como ceros de f' en los mínimos locales de
+    |f| y solo se aceptan si f se anula ahí (no basta con que |f| sea chica: cosh(x) no tiene raíces).
+    """
+    evaluar = evaluador_vectorizado(f)
+    xs = np.linspace(a, b, n)
+    ys = evaluar(xs)
+    raices = [xs[_ceros_exactos(ys)]]
+    i = _cambios_de_signo(xs, ys)
+    r = _biseccion_vectorizada(evaluar, xs[i], xs[i + 1], ys[i])
+    # Tolerancia relativa al tamaño local de f (los extremos de cada intervalo), no a su escala global
+    local = np.maximum(np.abs(ys[i]), np.abs(ys[i + 1]))
+    raices.append(r[np.abs(evaluar(r)) <= 1e-6 * local])
+    # Mínimos locales de |f| sin cambio de signo: candidatos a raíces de multiplicidad par
+    ay = np.abs(ys)
+    k = np.flatnonzero((ay[1:-1] < ay[:-2]) & (ay[1:-1] < ay[2:])) + 1
+    k = k[np.sign(ys[k - 1]) == np.sign(ys[k + 1])]
+    if k.size:
+        try:
+            derivada = evaluador_vectorizado(sp.diff(f, x))
+            dy_izq, dy_der = derivada(xs[k - 1]), derivada(xs[k + 1])
+            cambia = np.sign(dy_izq) * np.sign(dy_der) < 0
+            r = _biseccion_vectorizada(derivada, xs[k - 1][cambia], xs[k + 1][cambia], dy_izq[cambia])
+            local = np.maximum(ay[k - 1], ay[k + 1])[cambia]
+            raices.append(r[np.abs(evaluar(r)) <= np.minimum(1e-10, 1e-8 * local)])
+        except Exception:
+            pass
+    todas = np.concatenate(raices)
+    return sorted({round(float(v), 10) + 0.0 for v in todas})
+
+
+def raices_numericas(f: Any, a: float = -RANGO_NUMERICO, b: float = RANGO_NUMERICO,
+                     n: int = NPUNTOS_NUMERICO) -> List[float]:
+    """
+    Raíces reales de f en [a, b] como floats. Polinomios y funciones racionales se resuelven
+    por sus polinomios (Poly.real_roots / matriz compañera); el resto, con una malla vectorizada
+    y bisección.
+    """
+    try:
+        if f.is_polynomial(x):
+            return _raices_polinomio(sp.Poly(f, x), a, b)
+        if f.is_rational_function(x):
+            num, den = sp.fraction(sp.cancel(f))
+            polos = _raices_polinomio(sp.Poly(den, x), a, b)
+            return [r for r in _raices_polinomio(sp.Poly(num, x), a, b) if all(abs(r - p) > 1e-9 for p in polos)]
+    except (sp.PolynomialError, sp.polys.polyerrors.PolificationFailed, TypeError, ValueError):
+        pass
+    return _raices_malla(f, a, b, n)
+
+
+def recorrido_aproximado(f: Any) -> Any:
+    """
+    Estima el recorrido tramo a tramo con los valores en la malla, en los puntos críticos
+    (ceros de f') y en sucesiones que se acercan a cada borde. Un extremo se toma como no
+    acotado si f desborda o si alguna sucesión diverge; si no, se recorta a los valores
+    muestreados. Si ningún tramo da valores finitos, el recorrido queda sin determinar.
+    """
+    tramos, g, xs, ys = _tramos_validos(f)
+    if not tramos:
+        return sp.S.EmptySet
+    try:
+        criticos = raices_numericas(sp.diff(f, x))
+    except Exception:
+        criticos = []
+    partes = []
+    for a, _, b, _ in tramos:
+        dentro = (xs >= a) & (xs <= b) & ~np.isnan(ys)
+        valores = list(ys[dentro]) + [g(c) for c in criticos if a <= c <= b]
+        sube, baja = bool(np.any(ys[dentro] == np.inf)), bool(np.any(ys[dentro] == -np.inf))
+        for borde, sentido in ((a, 1), (b, -1)):
+            if np.isinf(borde):
+                puntos = [-sentido * RANGO_NUMERICO * 10 ** k for k in range(1, 5)]
+            else:
+                puntos = [borde + sentido * 10.0 ** -k for k in (3, 6, 9, 12)]
+            probados, diverge = _tendencia(g, puntos)
+            if diverge is None:
+                return "No determinado numéricamente (f oscila sin acotarse hacia un borde del dominio)"
+            valores += probados
+            sube |= diverge > 0
+            baja |= diverge < 0
+        finitos = np.array([v for v in valores if np.isfinite(v)])
+        if not finitos.size:
+            continue
+        inf = sp.S.NegativeInfinity if baja else sp.Float(float(finitos.min()), 7)
+        sup = sp.S.Infinity if sube else sp.Float(float(finitos.max()), 7)
+        partes.append(sp.Interval(inf, sup))
+    if not partes:
+        return "No determinado numéricamente (f no toma valores finitos en la malla)"
+    return sp.Union(*partes)
+
+
+def dominio_con_limite(f: Any) -> Any:
+    """calcular_dominio con tiempo límite; al excederlo se usa dominio_aproximado."""
+    try:
+        return ejecutar_con_limite(calcular_dominio, LIMITE_DOMINIO_S, f)
+    except TimeoutError:
+        return ResultadoAproximado(dominio_aproximado(f), "sondeo de singularidades en una malla")
+
+
+def recorrido_con_limite(f: Any, dominio: Any) -> Any:
+    """
+    calcular_recorrido con tiempo límite; al excederlo se usa recorrido_aproximado.
+    Sobre un dominio aproximado el recorrido también lo es, aunque se calcule simbólicamente.
+    """
+    try:
+        recorrido = ejecutar_con_limite(calcular_recorrido, LIMITE_RECORRIDO_S, f, valor_exacto(dominio))
+    except TimeoutError:
+        return ResultadoAproximado(recorrido_aproximado(f), "muestreo y puntos críticos de f'")
+    if isinstance(dominio, ResultadoAproximado) and not isinstance(recorrido, str):
+        return ResultadoAproximado(recorrido, f"simbólico sobre el dominio aproximado ({dominio.metodo})")
+    return recorrido
+
+
+def _solucion_completa(raices: Any, numericas: List[float]) -> bool:
+    """True si cada raíz numérica coincide con alguna raíz real de la solución simbólica."""
+    if not isinstance(raices, list):
+        return False
+    reales = []
+    for r in raices:
+        try:
+            if r.is_real:
+                reales.append(float(r))
+        except Exception:
+            return False
+    return all(any(abs(v - r) <= 1e-6 * max(1.0, abs(v)) for r in reales) for v in numericas)
+
+
+def intersecciones_con_limite(f: Any) -> Tuple[Any, Any]:
+    """
+    intersecciones con tiempo límite. Si sp.solve se excede o su respuesta es incompleta
+    (ConditionSet, raíces que la malla encuentra y solve no), se entregan las raíces numéricas.
+    """
+    rango = f"[-{RANGO_NUMERICO}, {RANGO_NUMERICO}]"
+    try:
+        raices, y0 = ejecutar_con_limite(intersecciones, LIMITE_RAICES_S, f)
+    except TimeoutError:
+        raices = ResultadoAproximado(raices_numericas(f), f"malla + bisección en {rango}")
+        y0 = float(evaluador_vectorizado(f)(np.array([0.0]))[0])
+        return raices, ("No se pudo calcular f(0)" if np.isnan(y0) else ResultadoAproximado(y0 + 0.0, "evaluación en punto flotante"))
+    if f.is_rational_function(x) and isinstance(raices, list):
+        return raices, y0
+    numericas = raices_numericas(f)
+    if _solucion_completa(raices, numericas):
+        return raices, y0
+    return ResultadoAproximado(numericas, f"malla + bisección en {rango}; sp.solve dio {raices}"), y0
@@ -0,0 +1,173 @@
+"""
+perfil.py
+Instrumentación por etapa: tiempo de pared, cantidad de llamadas y aciertos de la caché de SymPy
+"""
+from typing import Any, Callable, Deque, Dict, List, Optional
+from collections import deque
+from contextlib import contextmanager
+import cProfile
+import functools
+import json
+import threading
+import time
+from config import PERFIL_HISTORIAL, PERFIL_LOG_JSON
+
+
+def aciertos_cache_sympy() -> int:
+    """Total de aciertos acumulados por las funciones cacheadas de SymPy (@cacheit)."""
+    # Importado aquí para que perfil no cargue SymPy al arrancar la interfaz
+    from sympy.core.cache import CACHE
+    total = 0
+    for funcion in CACHE:
+        try:
+            total += funcion.cache_info().hits
+        except AttributeError:
+            pass
+    return total
+
+
+class RegistroPerfil:
+    """
+    Mediciones de un análisis: por cada etapa, tiempo acumulado, llamadas y aciertos de la
+    caché de SymPy. Los tiempos de etapas anidadas se incluyen en la etapa que las llama.
+    """
+    def __init__(self, etiqueta: str):
+        self.etiqueta = etiqueta
+        self.fecha = time.strftime("%Y-%m-%d %H:%M:%S")
+        self.total_s = 0.0
+        self.etapas: Dict[str, Dict[str, Any]] = {}
+
+    def registrar(self, etapa: str, tiempo_s: float, aciertos: int) -> None:
+        datos = self.etapas.setdefault(etapa, {"tiempo_s": 0.0, "llamadas": 0, "aciertos_cache": 0})
+        datos["tiempo_s"] += tiempo_s
+        datos["llamadas"] += 1
+        datos["aciertos_cache"] += aciertos
+
+    def combinar(self, otro: "RegistroPerfil") -> None:
+        """Suma las etapas de otro registro (p. ej. el graficado medido en otro proceso)."""
+        for etapa, datos in otro.etapas.items():
+            propio = self.etapas.setdefault(etapa, {"tiempo_s": 0.0, "llamadas": 0, "aciertos_cache": 0})
+            for campo in propio:
+                propio[campo] += datos[campo]
+        self.total_s += otro.total_s
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {"etiqueta": self.etiqueta, "fecha": self.fecha, "total_s": round(self.total_s, 6),
+                "etapas": {e: dict(d, tiempo_s=round(d["tiempo_s"], 6)) for e, d in self.etapas.items()}}
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Any]) -> "RegistroPerfil":
+        registro = cls(datos["etiqueta"])
+        registro.fecha = datos["fecha"]
+        registro.total_s = datos["total_s"]
+        registro.etapas = {e: dict(d) for e, d in datos["etapas"].items()}
+        return registro
+
+
+class BufferCircular:
+    """Destino en memoria con los últimos n registros."""
+    def __init__(self, n: int = PERFIL_HISTORIAL):
+        self._registros: Deque[RegistroPerfil] = deque(maxlen=n)
+        self._lock = threading.Lock()
+
+    def __call__(self, registro: RegistroPerfil) -> None:
+        with self._lock:
+            self._registros.append(registro)
+
+    def ultimos(self) -> List[RegistroPerfil]:
+        with self._lock:
+            return list(self._registros)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._registros.clear()
+
+
+class LogJSON:
+    """Destino que agrega cada registro como una línea JSON al final de un archivo."""
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+
+    def __call__(self, registro: RegistroPerfil) -> None:
+        linea = json.dumps(registro.como_dict(), ensure_ascii=False)
+        with self._lock:
+            try:
+                with open(self.ruta, "a", encoding="utf-8") as fh:
+                    fh.write(linea + "\n")
+            except OSError:
+                pass
+
+
+historial = BufferCircular()
+_destinos: List[Callable[[RegistroPerfil], None]] = [historial]
+if PERFIL_LOG_JSON:
+    _destinos.append(LogJSON(PERFIL_LOG_JSON))
+
+# Registro en curso; sin análisis activo las etapas instrumentadas no miden nada
+_activo: Optional[RegistroPerfil] = None
+
+
+def agregar_destino(destino: Callable[[RegistroPerfil], None]) -> None:
+    _destinos.append(destino)
+
+
+def quitar_destino(destino: Callable[[RegistroPerfil], None]) -> None:
+    if destino in _destinos:
+        _destinos.remove(destino)
+
+
+def etapa(nombre: str) -> Callable[[Callable], Callable]:
+    """
+    Decorador que mide una etapa dentro del análisis activo.
+    Fuera de un analisis_perfilado solo agrega una comparación por llamada.
+    """
+    def decorador(funcion: Callable) -> Callable:
+        @functools.wraps(funcion)
+        def envoltura(*args: Any, **kwargs: Any) -> Any:
+            registro = _activo
+            if registro is None:
+                return funcion(*args, **kwargs)
+            aciertos = aciertos_cache_sympy()
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                registro.registrar(nombre, time.perf_counter() - inicio, aciertos_cache_sympy() - aciertos)
+        return envoltura
+    return decorador
+
+
+@contextmanager
+def analisis_perfilado(etiqueta: str, cprofile: Optional[str] = None, publicar: bool = True):
+    """
+    Activa la medición para un análisis. Al salir el registro se entrega a los destinos
+    (historial en memoria y, si está configurado, el log JSON). Con cprofile se guarda además
+    un volcado de cProfile (legible con pstats o snakeviz) en esa ruta.
+    """
+    global _activo
+    anterior = _activo
+    registro = RegistroPerfil(etiqueta)
+    _activo = registro
+    perfilador = cProfile.Profile() if cprofile else None
+    inicio = time.perf_counter()
+    if perfilador is not None:
+        perfilador.enable()
+    try:
+        yield registro
+    finally:
+        if perfilador is not None:
+            perfilador.disable()
+            try:
+                perfilador.dump_stats(cprofile)
+            except OSError:
+                pass
+        registro.total_s = time.perf_counter() - inicio
+        _activo = anterior
+        if publicar:
+            publicar_registro(registro)
+
+
+def publicar_registro(registro: RegistroPerfil) -> None:
+    for destino in list(_destinos):
+        destino(registro)
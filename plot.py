@@ -4,64 +4,315 @@ plot.py
 Funciones para graficar la función y sus elementos destacados
 """
 from typing import Any, Optional
+import re
 import matplotlib.pyplot as plt
 import sympy as sp
-from core import x, generar_muestra_x, evaluar_lista_segura
-from config import FIGURE_SIZE, NPOINTS, RANGO_EXTRA, COLOR_RAIZ, COLOR_Y0, COLOR_PUNTO_EVAL, TITULO_GRAFICA, XLABEL, YLABEL, LEGENDA_FONT_SIZE
+import numpy as np
+from analisis import AnalisisFuncion
+from numerico import valor_exacto
+from vista import CacheTeselas, decimar_min_max
+from config import FIGURE_SIZE, NPOINTS, MUESTREO_ADAPTATIVO, MAX_RAICES_LEYENDA, COLOR_RAIZ, COLOR_Y0, COLOR_PUNTO_EVAL, TITULO_GRAFICA, XLABEL, YLABEL, LEGENDA_FONT_SIZE
+from config import COMPARACION_RANGO, COLORES_COMPARACION
 from utils import formatear_numero
+from perfil import etapa
 
+@etapa("graficar_funcion")
 def graficar_funcion(
     f: Any,
     dominio: Any,
     raices: Any,
     y0: Any,
     valor_txt: Optional[str] = None,
-    eval_info: Optional[dict] = None
+    eval_info: Optional[dict] = None,
+    npoints: int = NPOINTS,
+    adaptativo: bool = MUESTREO_ADAPTATIVO
 ) -> None:
     """
     Genera la gráfica de la función, mostrando dominio, recorrido, intersecciones y punto evaluado.
+    El muestreo es vectorizado, por lo que npoints puede llegar a 10^5-10^6 sin problema.
+    Con adaptativo=True se usa generar_muestra_adaptativa con un presupuesto de PRESUPUESTO_ADAPTATIVO puntos.
     """
-    xs_samples = generar_muestra_x(dominio, npoints=NPOINTS, rango_extra=RANGO_EXTRA)
-    xs_plot, ys_plot = evaluar_lista_segura(f, xs_samples)
-    if not xs_plot:
-        xs_fallback = [i * 0.1 for i in range(-100, 101)]
-        xs_plot, ys_plot = evaluar_lista_segura(f, xs_fallback)
-    plt.figure(figsize=FIGURE_SIZE)
-    plt.plot(xs_plot, ys_plot, label=f"f(x) = {sp.srepr(f) if len(str(f))>40 else f}", linewidth=2)
-    plt.axhline(0, linewidth=1, color='black')
-    plt.axvline(0, linewidth=1, color='black')
-    plt.grid(True)
-    plt.title(TITULO_GRAFICA)
-    plt.xlabel(XLABEL)
-    plt.ylabel(YLABEL)
-    # Intersecciones con eje X
-    try:
-        if isinstance(raices, (list, tuple)):
-            for r in raices:
-                try:
-                    r_eval = float(sp.N(r))
-                    y_at_r = float(sp.N(f.subs(x, r)))
-                    plt.scatter(r_eval, y_at_r, marker='o', s=50, color=COLOR_RAIZ, label=f"Raíz ≈ {formatear_numero(r_eval)}")
-                except Exception:
-                    continue
-    except Exception:
-        pass
-    # Intersección con eje Y
-    try:
-        if not isinstance(y0, str):
-            y0f = float(sp.N(y0))
-            plt.scatter(0.0, y0f, marker='s', s=50, color=COLOR_Y0, label=f"f(0)={formatear_numero(y0f)}")
-    except Exception:
-        pass
-    # Punto evaluado
-    if eval_info is not None and valor_txt is not None:
+    analisis = AnalisisFuncion(f, dominio=dominio, raices=raices, y0=y0)
+    graficar_analisis(analisis, valor_txt, eval_info, npoints, adaptativo)
+
+def graficar_analisis(
+    analisis: AnalisisFuncion,
+    valor_txt: Optional[str] = None,
+    eval_info: Optional[dict] = None,
+    npoints: int = NPOINTS,
+    adaptativo: bool = MUESTREO_ADAPTATIVO
+) -> None:
+    """
+    Igual que graficar_funcion, pero a partir de un AnalisisFuncion: reutiliza sus muestras,
+    raíces y kernel ya calculados en lugar de volver a sustituir en la expresión.
+    """
+    figura = plt.figure(figsize=FIGURE_SIZE)
+    lienzo = LienzoGrafica(figura)
+    lienzo.actualizar(analisis, valor_txt, eval_info, npoints, adaptativo)
+    plt.show()
+
+
+class LienzoGrafica:
+    """
+    Gráfica persistente sobre una Figure de Matplotlib (por ejemplo, embebida con FigureCanvasTkAgg).
+    Los artistas se crean una sola vez y cada análisis solo actualiza sus datos; el punto
+    evaluado es un artista animado que se redibuja con blitting.
+    """
+    def __init__(self, figura: Any):
+        self.figura = figura
+        self.ax = figura.add_subplot(111)
+        self.ax.axhline(0, linewidth=1, color='black')
+        self.ax.axvline(0, linewidth=1, color='black')
+        self.ax.grid(True)
+        self.ax.set_title(TITULO_GRAFICA)
+        self.ax.set_xlabel(XLABEL)
+        self.ax.set_ylabel(YLABEL)
+        self.linea, = self.ax.plot([], [], linewidth=2, label="f(x)")
+        self.marcas_raiz = self.ax.scatter([], [], marker='o', s=50, color=COLOR_RAIZ, label="Raíces")
+        self.marca_y0 = self.ax.scatter([], [], marker='s', s=50, color=COLOR_Y0, label="f(0)")
+        self.marca_punto = self.ax.scatter([], [], color=COLOR_PUNTO_EVAL, s=70, label="Punto evaluado", animated=True)
+        self.analisis: Optional[AnalisisFuncion] = None
+        self.teselas: Optional[CacheTeselas] = None
+        self._fondo = None
+        self._cid_dibujo = figura.canvas.mpl_connect('draw_event', self._al_dibujar)
+        self.ax.callbacks.connect('xlim_changed', self._al_cambiar_vista)
+
+    def _al_cambiar_vista(self, ax: Any) -> None:
+        """
+        Al hacer zoom o desplazar, vuelve a muestrear solo el rango visible a resolución de
+        pantalla (con teselas cacheadas) y diezma a min/max por columna de píxeles.
+        """
+        if self.teselas is None:
+            return
+        x0, x1 = ax.get_xlim()
+        ancho_px = max(int(ax.bbox.width), 100)
+        xs, ys = self.teselas.visible(x0, x1)
+        if xs.size:
+            self.linea.set_data(*decimar_min_max(xs, ys, x0, x1, ancho_px))
+            self.figura.canvas.draw_idle()
+
+    def _al_dibujar(self, event: Any) -> None:
+        """
+        Guarda el fondo (sin el punto ni la leyenda, que son animados) para poder mover el
+        punto con blitting, y luego dibuja ambos encima.
+        """
+        canvas = self.figura.canvas
+        if getattr(canvas, 'supports_blit', False):
+            self._fondo = canvas.copy_from_bbox(self.ax.bbox)
+        self._dibujar_animados()
+
+    def _dibujar_animados(self) -> None:
+        self.ax.draw_artist(self.marca_punto)
+        if self.ax.get_legend() is not None:
+            self.ax.draw_artist(self.ax.get_legend())
+
+    def _actualizar_leyenda(self) -> None:
+        """La leyenda es animada: incluye la etiqueta del punto evaluado, que cambia al moverlo."""
+        visibles = [a for a in (self.linea, self.marcas_raiz, self.marca_y0, self.marca_punto)
+                    if len(a.get_xdata() if a is self.linea else a.get_offsets())]
+        if visibles:
+            self.ax.legend(handles=visibles, loc='best', fontsize=LEGENDA_FONT_SIZE).set_animated(True)
+        elif self.ax.get_legend() is not None:
+            self.ax.get_legend().remove()
+
+    @etapa("graficado")
+    def actualizar(
+        self,
+        analisis: AnalisisFuncion,
+        valor_txt: Optional[str] = None,
+        eval_info: Optional[dict] = None,
+        npoints: int = NPOINTS,
+        adaptativo: bool = MUESTREO_ADAPTATIVO
+    ) -> None:
+        """Actualiza curva, raíces, f(0) y punto evaluado en el mismo lienzo."""
+        self.analisis = analisis
+        self.teselas = None
+        f = analisis.f
+        xs_plot, ys_plot = analisis.muestras(npoints, adaptativo)
+        self.linea.set_data(xs_plot, ys_plot)
+        self.linea.set_label(f"f(x) = {sp.srepr(f) if len(str(f))>40 else f}")
+        # Intersecciones con eje X (evaluadas todas juntas con el kernel numérico)
+        rs, ys_r = analisis.puntos_raiz
+        if np.isfinite(xs_plot).any():
+            visibles = (rs >= np.nanmin(xs_plot)) & (rs <= np.nanmax(xs_plot))
+            rs, ys_r = rs[visibles], ys_r[visibles]
+        self.marcas_raiz.set_offsets(np.column_stack([rs, ys_r]) if rs.size else np.empty((0, 2)))
+        if rs.size > MAX_RAICES_LEYENDA:
+            self.marcas_raiz.set_label(f"Raíces ({rs.size})")
+        else:
+            self.marcas_raiz.set_label("Raíz ≈ " + ", ".join(formatear_numero(r) for r in rs))
+        # Intersección con eje Y
+        y0f = analisis.y0_numerico
+        self.marca_y0.set_offsets([[0.0, y0f]] if y0f is not None else np.empty((0, 2)))
+        self.marca_y0.set_label(f"f(0)={formatear_numero(y0f)}" if y0f is not None else "f(0)")
+        # Punto evaluado
+        punto = None
+        if eval_info is not None and valor_txt:
+            try:
+                punto = analisis.punto_evaluado(valor_txt, eval_info)
+            except Exception:
+                punto = None
+        self._poner_punto(punto)
+        self._encuadrar(analisis)
+
+    @etapa("vista_previa")
+    def vista_previa(self, analisis: AnalisisFuncion, valor_txt: Optional[str] = None, npoints: int = NPOINTS) -> None:
+        """
+        Curva de f usando solo el kernel numérico, mientras el análisis simbólico no llega:
+        sin raíces exactas, f(0) y el punto evaluado se calculan con el kernel.
+        """
+        self.analisis = analisis
+        self.teselas = None
+        xs_plot, ys_plot = analisis.muestras(npoints)
+        self.linea.set_data(xs_plot, ys_plot)
+        self.linea.set_label(f"f(x) = {analisis.f} (vista previa)")
+        self.marcas_raiz.set_offsets(np.empty((0, 2)))
+        self.marcas_raiz.set_label("Raíces")
+        y0f = analisis.valor_en(0.0)
+        self.marca_y0.set_offsets([[0.0, y0f]] if np.isfinite(y0f) else np.empty((0, 2)))
+        self.marca_y0.set_label(f"f(0)={formatear_numero(y0f)}" if np.isfinite(y0f) else "f(0)")
         try:
-            valor_sym = sp.sympify(valor_txt)
-            y_val = float(sp.N(f.subs(x, valor_sym)))
-            x_val = float(sp.N(valor_sym))
-            plt.scatter(x_val, y_val, color=COLOR_PUNTO_EVAL, s=70, label=f"Punto evaluado ({formatear_numero(x_val)},{formatear_numero(y_val)})")
+            punto = analisis.punto_evaluado(valor_txt) if valor_txt else None
         except Exception:
-            pass
-    plt.legend(loc='best', fontsize=LEGENDA_FONT_SIZE)
-    plt.tight_layout()
+            punto = None
+        self._poner_punto(punto)
+        # Los márgenes no cambian mientras se escribe: tight_layout (que mide el texto) se omite
+        self._encuadrar(analisis, ajustar_margenes=False)
+
+    def _encuadrar(self, analisis: AnalisisFuncion, ajustar_margenes: bool = True) -> None:
+        """Ajusta los ejes a la curva, prepara las teselas y redibuja."""
+        self.ax.relim()
+        self.ax.autoscale_view()
+        # Desde aquí cada cambio de vista remuestrea la curva a resolución de pantalla
+        self.teselas = CacheTeselas(analisis.kernel, valor_exacto(analisis.dominio))
+        self._actualizar_leyenda()
+        if ajustar_margenes:
+            self.figura.tight_layout()
+        self.figura.canvas.draw_idle()
+
+    def _poner_punto(self, punto: Optional[Any]) -> None:
+        if punto is None:
+            self.marca_punto.set_offsets(np.empty((0, 2)))
+            self.marca_punto.set_label("Punto evaluado")
+        else:
+            x_val, y_val = punto
+            self.marca_punto.set_offsets([[x_val, y_val]])
+            self.marca_punto.set_label(f"Punto evaluado ({formatear_numero(x_val)},{formatear_numero(y_val)})")
+
+    def mover_punto(self, valor_txt: str, eval_info: Optional[dict] = None) -> None:
+        """
+        Cambia solo el punto evaluado y su etiqueta en la leyenda. Con blitting se restaura el
+        fondo guardado y se redibujan únicamente el marcador y la leyenda, sin volver a dibujar la curva.
+        """
+        if self.analisis is None:
+            return
+        try:
+            punto = self.analisis.punto_evaluado(valor_txt, eval_info) if valor_txt else None
+        except Exception:
+            punto = None
+        self._poner_punto(punto)
+        self._actualizar_leyenda()
+        canvas = self.figura.canvas
+        if self._fondo is None:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self._fondo)
+        self._dibujar_animados()
+        canvas.blit(self.ax.bbox)
+
+    def limpiar(self) -> None:
+        """Vacía la gráfica manteniendo los artistas para el próximo análisis."""
+        self.analisis = None
+        self.teselas = None
+        self.linea.set_data([], [])
+        for marca in (self.marcas_raiz, self.marca_y0, self.marca_punto):
+            marca.set_offsets(np.empty((0, 2)))
+        self._actualizar_leyenda()
+        self.figura.canvas.draw_idle()
+
+
+def graficar_comparacion(comparacion: Any, a: float = COMPARACION_RANGO[0], b: float = COMPARACION_RANGO[1]) -> None:
+    """Superpone las funciones de una ComparacionFunciones y marca sus intersecciones."""
+    figura = plt.figure(figsize=FIGURE_SIZE)
+    lienzo = LienzoComparacion(figura)
+    lienzo.actualizar(comparacion, a, b)
     plt.show()
+
+
+class LienzoComparacion:
+    """
+    Gráfica de varias funciones superpuestas. Todas las curvas salen de una sola evaluación
+    apilada (comparacion.kernel) y al hacer zoom se vuelve a evaluar solo el rango visible.
+    """
+    def __init__(self, figura: Any):
+        self.figura = figura
+        self.ax = figura.add_subplot(111)
+        self.ax.axhline(0, linewidth=1, color='black')
+        self.ax.axvline(0, linewidth=1, color='black')
+        self.ax.grid(True)
+        self.ax.set_xlabel(XLABEL)
+        self.ax.set_ylabel(YLABEL)
+        self.lineas: list = []
+        self.marcas_cruce = self.ax.scatter([], [], marker='o', s=40, color='black', zorder=3, label="Intersecciones")
+        self.comparacion: Optional[Any] = None
+        self.ax.callbacks.connect('xlim_changed', self._al_cambiar_vista)
+
+    def _linea(self, i: int) -> Any:
+        while len(self.lineas) <= i:
+            color = COLORES_COMPARACION[len(self.lineas) % len(COLORES_COMPARACION)]
+            self.lineas.append(self.ax.plot([], [], linewidth=2, color=color)[0])
+        return self.lineas[i]
+
+    def _dibujar_curvas(self, xs: np.ndarray, ys: np.ndarray) -> None:
+        for i, fila in enumerate(ys):
+            self._linea(i).set_data(xs, fila)
+
+    def _al_cambiar_vista(self, ax: Any) -> None:
+        if self.comparacion is None:
+            return
+        x0, x1 = ax.get_xlim()
+        xs, ys = self.comparacion.muestras(x0, x1, 2 * max(int(ax.bbox.width), 100))
+        self._dibujar_curvas(xs, ys)
+        self.figura.canvas.draw_idle()
+
+    def actualizar(self, comparacion: Any, a: float = COMPARACION_RANGO[0], b: float = COMPARACION_RANGO[1],
+                   cruces: Optional[list] = None) -> list:
+        """
+        Dibuja las funciones de comparacion en [a, b] y marca los cruces entre pares
+        (se calculan si no se pasan). Devuelve la lista de cruces.
+        """
+        self.comparacion = None
+        for linea in self.lineas:
+            linea.set_data([], [])
+            linea.set_label('_nolegend_')
+        xs, ys = comparacion.muestras(a, b)
+        self._dibujar_curvas(xs, ys)
+        for i, nombre in enumerate(comparacion.nombres):
+            expr = comparacion.expresiones[i]
+            self.lineas[i].set_label(f"{nombre}(x) = {expr}" if re.fullmatch(r"[A-Za-z]\w*'*", nombre) else f"{nombre} = {expr}")
+        if cruces is None:
+            cruces = comparacion.intersecciones(a, b)
+        puntos = [p for c in cruces for p in (c["puntos"] or [])]
+        self.marcas_cruce.set_offsets(np.array(puntos) if puntos else np.empty((0, 2)))
+        self.ax.set_title("Comparación de funciones")
+        self.ax.set_xlim(a, b)
+        finitos = ys[np.isfinite(ys)]
+        if finitos.size:
+            bajo, alto = np.percentile(finitos, [1, 99])
+            margen = 0.1 * max(alto - bajo, 1e-9)
+            self.ax.set_ylim(bajo - margen, alto + margen)
+        handles = self.lineas[:len(comparacion)] + ([self.marcas_cruce] if puntos else [])
+        self.ax.legend(handles=handles, loc='best', fontsize=LEGENDA_FONT_SIZE)
+        self.comparacion = comparacion
+        self.figura.tight_layout()
+        self.figura.canvas.draw_idle()
+        return cruces
+
+    def limpiar(self) -> None:
+        self.comparacion = None
+        for linea in self.lineas:
+            linea.set_data([], [])
+        self.marcas_cruce.set_offsets(np.empty((0, 2)))
+        if self.ax.get_legend() is not None:
+            self.ax.get_legend().remove()
+        self.figura.canvas.draw_idle()
@@ -0,0 +1,298 @@
+"""
+servidor.py
+Servicio local JSON sobre HTTP: parseo, dominio, recorrido, raíces, evaluación y curvas, calculados
+en un pool de procesos con tiempo límite, combinación de solicitudes idénticas y caché compartida
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import argparse
+import json
+import os
+import sys
+import threading
+import numpy as np
+import sympy as sp
+from core import x
+from analisis import AnalisisFuncion, a_json
+from cache import CacheLRU
+from clasificador import clasificar
+from curva import muestrear_curva
+from numerico import valor_exacto
+from utils import ejecutar_con_limite
+from config import NPOINTS, RANGO_EXTRA, SERVIDOR_HOST, SERVIDOR_PUERTO, SERVIDOR_TIMEOUT_S
+from config import SERVIDOR_MAX_PUNTOS, SERVIDOR_CACHE_RESPUESTAS
+
+# Tiempo extra que el servidor espera al trabajador por encima del límite de la solicitud
+# (el trabajador corta el cálculo con SIGALRM; esto cubre lo que no se puede interrumpir)
+MARGEN_ESPERA_S = 2.0
+
+
+# === Endpoints (se ejecutan en los procesos del pool) ===
+
+def _analisis(datos: Dict[str, Any]) -> AnalisisFuncion:
+    funcion_txt = datos.get("funcion")
+    if not isinstance(funcion_txt, str) or not funcion_txt.strip():
+        raise ValueError("Falta el campo 'funcion'.")
+    return AnalisisFuncion.desde_texto(funcion_txt)
+
+
+def _parseo(datos: Dict[str, Any]) -> Dict[str, Any]:
+    analisis = _analisis(datos)
+    return {"funcion": str(analisis.f), "srepr": sp.srepr(analisis.f), "clase": clasificar(analisis.f, x)}
+
+
+def _dominio(datos: Dict[str, Any]) -> Dict[str, Any]:
+    analisis = _analisis(datos)
+    return {"funcion": str(analisis.f), "dominio": a_json(analisis.dominio)}
+
+
+def _recorrido(datos: Dict[str, Any]) -> Dict[str, Any]:
+    analisis = _analisis(datos)
+    return {"funcion": str(analisis.f), "dominio": a_json(analisis.dominio), "recorrido": a_json(analisis.recorrido)}
+
+
+def _raices(datos: Dict[str, Any]) -> Dict[str, Any]:
+    analisis = _analisis(datos)
+    return {"funcion": str(analisis.f), "raices": a_json(analisis.raices), "y0": a_json(analisis.y0)}
+
+
+def _evaluar(datos: Dict[str, Any]) -> Dict[str, Any]:
+    analisis = _analisis(datos)
+    puntos = datos.get("x")
+    if puntos is None:
+        raise ValueError("Falta el campo 'x'.")
+    puntos = [str(p) for p in (puntos if isinstance(puntos, list) else [puntos])]
+    return {"funcion": str(analisis.f), "valores": analisis.valores_en(puntos)}
+
+
+def _curva(datos: Dict[str, Any]) -> Dict[str, Any]:
+    analisis = _analisis(datos)
+    try:
+        npoints = int(datos.get("puntos", NPOINTS))
+        rango = float(datos.get("rango", RANGO_EXTRA))
+    except (TypeError, ValueError):
+        raise ValueError("'puntos' y 'rango' deben ser numéricos.")
+    if not 2 <= npoints <= SERVIDOR_MAX_PUNTOS:
+        raise ValueError(f"'puntos' debe estar entre 2 y {SERVIDOR_MAX_PUNTOS}.")
+    curva = muestrear_curva(analisis.f, valor_exacto(analisis.dominio), npoints, rango)
+    # JSON no tiene NaN: los puntos donde f no es real y finita van como null
+    return {"funcion": str(analisis.f),
+            "x": np.where(np.isfinite(curva.x), curva.x, None).tolist(),
+            "y": np.where(curva.validos, curva.y, None).tolist(),
+            "tramos": curva.tramos.tolist()}
+
+
+ENDPOINTS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "parseo": _parseo,
+    "dominio": _dominio,
+    "recorrido": _recorrido,
+    "raices": _raices,
+    "evaluar": _evaluar,
+    "curva": _curva,
+}
+
+
+def ejecutar_tarea(endpoint: str, datos: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+    """Corre un endpoint dentro de un proceso del pool, cortado a los timeout segundos."""
+    return ejecutar_con_limite(ENDPOINTS[endpoint], timeout, datos)
+
+
+def _precargar_trabajador() -> None:
+    import analisis  # noqa: F401
+
+
+def es_aproximada(respuesta: Any) -> bool:
+    """True si la respuesta contiene algún resultado numérico de respaldo (marcado "aproximado")."""
+    if isinstance(respuesta, dict):
+        return respuesta.get("aproximado") is True or any(es_aproximada(v) for v in respuesta.values())
+    if isinstance(respuesta, list):
+        return any(es_aproximada(v) for v in respuesta)
+    return False
+
+
+# === Servicio (proceso principal) ===
+
+class ServicioAnalisis:
+    """
+    Reparte las solicitudes en un pool de procesos. Las respuestas exitosas y exactas quedan
+    en una caché LRU compartida por todas las conexiones (las aproximadas no: la próxima vez
+    se reintenta el cálculo simbólico). Una solicitud idéntica a otra que todavía se está
+    calculando con un tiempo límite igual o mayor espera ese mismo futuro en lugar de encolar
+    otro cálculo. Los trabajadores comparten además la caché en disco de cache.py.
+    """
+    def __init__(self, trabajadores: Optional[int] = None, timeout: float = SERVIDOR_TIMEOUT_S,
+                 max_respuestas: int = SERVIDOR_CACHE_RESPUESTAS):
+        self.trabajadores = trabajadores or os.cpu_count() or 1
+        self.timeout = timeout
+        self.cache = CacheLRU(max_respuestas)
+        # Clave -> (futuro, tiempo límite con que se envió)
+        self._en_vuelo: Dict[str, Tuple[Future, float]] = {}
+        # RLock: add_done_callback corre el callback en el acto si el futuro ya terminó
+        self._lock = threading.RLock()
+        self.estadisticas = {"solicitudes": 0, "aciertos_cache": 0, "combinadas": 0, "calculadas": 0}
+        self._pool = self._crear_pool()
+
+    def _crear_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.trabajadores, initializer=_precargar_trabajador)
+
+    @staticmethod
+    def clave(endpoint: str, datos: Dict[str, Any]) -> str:
+        """
+        Clave canónica de una solicitud. No incluye el tiempo límite: cambia si el cálculo
+        termina, no su resultado (por eso solo se combina con cálculos de límite mayor o igual).
+        """
+        return endpoint + ":" + json.dumps({k: v for k, v in datos.items() if k != "timeout"},
+                                           sort_keys=True, ensure_ascii=False)
+
+    def resolver(self, endpoint: str, datos: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Resultado de endpoint para datos. Lanza KeyError si el endpoint no existe, ValueError
+        si la entrada es inválida y TimeoutError si se excede el tiempo límite.
+        """
+        if endpoint not in ENDPOINTS:
+            raise KeyError(endpoint)
+        try:
+            timeout = min(float(datos.get("timeout", self.timeout)), self.timeout)
+        except (TypeError, ValueError):
+            raise ValueError("'timeout' debe ser numérico.")
+        clave = self.clave(endpoint, datos)
+        with self._lock:
+            self.estadisticas["solicitudes"] += 1
+            resultado = self.cache.obtener(clave, None)
+            if resultado is not None:
+                self.estadisticas["aciertos_cache"] += 1
+                return resultado
+            futuro, limite = self._en_vuelo.get(clave, (None, 0.0))
+            if futuro is None or limite < timeout:
+                # Un cálculo en curso con menos tiempo podría agotarse antes que el de esta solicitud
+                futuro = self._enviar(endpoint, datos, timeout)
+                self._en_vuelo[clave] = (futuro, timeout)
+                futuro.add_done_callback(lambda f, clave=clave: self._terminado(clave, f))
+            else:
+                self.estadisticas["combinadas"] += 1
+        return futuro.result(timeout=timeout + MARGEN_ESPERA_S)
+
+    def _enviar(self, endpoint: str, datos: Dict[str, Any], timeout: float) -> Future:
+        self.estadisticas["calculadas"] += 1
+        try:
+            return self._pool.submit(ejecutar_tarea, endpoint, datos, timeout)
+        except BrokenProcessPool:
+            # Un trabajador murió (p. ej. sin memoria): se rearma el pool y se reintenta una vez
+            self._pool = self._crear_pool()
+            return self._pool.submit(ejecutar_tarea, endpoint, datos, timeout)
+
+    def _terminado(self, clave: str, futuro: Future) -> None:
+        with self._lock:
+            # Si otro cálculo de límite mayor lo reemplazó, ese sigue en vuelo
+            if self._en_vuelo.get(clave, (None,))[0] is futuro:
+                del self._en_vuelo[clave]
+            if not futuro.cancelled() and futuro.exception() is None and not es_aproximada(futuro.result()):
+                self.cache.guardar(clave, futuro.result())
+
+    def estado(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.estadisticas, trabajadores=self.trabajadores, en_vuelo=len(self._en_vuelo),
+                        respuestas_en_cache=len(self.cache))
+
+    def cerrar(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ManejadorAnalisis(BaseHTTPRequestHandler):
+    """
+    POST /<endpoint> con un objeto JSON ({"funcion": "x^2 - 4", ...}) o GET con los mismos
+    campos en la query. GET /salud devuelve las estadísticas del servicio.
+    """
+    protocol_version = "HTTP/1.1"
+    # Cabeceras y cuerpo salen en escrituras separadas: sin esto Nagle y el ACK diferido suman ~40 ms
+    disable_nagle_algorithm = True
+    server_version = "AnalizadorFunciones/1.0"
+
+    def do_GET(self) -> None:
+        partes = urlsplit(self.path)
+        endpoint = partes.path.strip("/")
+        if endpoint == "salud":
+            self._responder(200, self.server.servicio.estado())
+            return
+        datos = {k: v if len(v) > 1 else v[0] for k, v in parse_qs(partes.query).items()}
+        self._atender(endpoint, datos)
+
+    def do_POST(self) -> None:
+        largo = int(self.headers.get("Content-Length") or 0)
+        try:
+            datos = json.loads(self.rfile.read(largo) or b"{}")
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            self._responder(400, {"error": f"JSON inválido: {e}"})
+            return
+        if not isinstance(datos, dict):
+            self._responder(400, {"error": "Se esperaba un objeto JSON."})
+            return
+        self._atender(urlsplit(self.path).path.strip("/"), datos)
+
+    def _atender(self, endpoint: str, datos: Dict[str, Any]) -> None:
+        # El 404 se decide antes de despachar: un KeyError del cálculo es un error interno (500)
+        if endpoint not in ENDPOINTS:
+            self._responder(404, {"error": f"Endpoint desconocido: /{endpoint}",
+                                  "endpoints": sorted(ENDPOINTS) + ["salud"]})
+            return
+        try:
+            self._responder(200, self.server.servicio.resolver(endpoint, datos))
+        except ValueError as e:
+            self._responder(400, {"error": str(e)})
+        except TimeoutError:
+            self._responder(504, {"error": "Tiempo agotado"})
+        except Exception as e:
+            self._responder(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def _responder(self, codigo: int, cuerpo: Dict[str, Any]) -> None:
+        datos = json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def log_message(self, formato: str, *args: Any) -> None:
+        if self.server.verboso:
+            super().log_message(formato, *args)
+
+
+def crear_servidor(host: str = SERVIDOR_HOST, puerto: int = SERVIDOR_PUERTO,
+                   servicio: Optional[ServicioAnalisis] = None, verboso: bool = False) -> ThreadingHTTPServer:
+    """Servidor HTTP con un hilo por conexión; puerto=0 elige uno libre (ver server_address)."""
+    servidor = ThreadingHTTPServer((host, puerto), ManejadorAnalisis)
+    servidor.daemon_threads = True
+    servidor.servicio = servicio or ServicioAnalisis()
+    servidor.verboso = verboso
+    return servidor
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Servicio local del analizador de funciones (JSON sobre HTTP).")
+    parser.add_argument("--host", default=SERVIDOR_HOST, help="Interfaz donde escuchar (por defecto, solo localhost).")
+    parser.add_argument("-p", "--puerto", type=int, default=SERVIDOR_PUERTO, help="Puerto TCP.")
+    parser.add_argument("-j", "--trabajadores", type=int, default=None, help="Procesos a usar (por defecto, todos los núcleos).")
+    parser.add_argument("-t", "--timeout", type=float, default=SERVIDOR_TIMEOUT_S,
+                        help="Tiempo máximo por solicitud, en segundos (una solicitud puede pedir menos).")
+    parser.add_argument("-v", "--verboso", action="store_true", help="Registrar cada solicitud en stderr.")
+    args = parser.parse_args(argv)
+    servicio = ServicioAnalisis(args.trabajadores, args.timeout)
+    servidor = crear_servidor(args.host, args.puerto, servicio, args.verboso)
+    host, puerto = servidor.server_address[:2]
+    print(f"Escuchando en http://{host}:{puerto} ({servicio.trabajadores} procesos); Ctrl+C para terminar.",
+          file=sys.stderr)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servicio.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
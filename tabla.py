@@ -0,0 +1,143 @@
+"""
+tabla.py
+Tabla de valores: evaluación masiva con kernel float y reevaluación con mpmath solo en los puntos delicados
+"""
+from typing import Any, Dict, List, Optional
+import numpy as np
+import sympy as sp
+import mpmath
+from core import x, evaluador_vectorizado
+from kernels import compilar_kernel
+from config import TABLA_PRECISION, TABLA_UMBRAL_CONDICION, TABLA_MAX_PRECISA, TABLA_MAX_PUNTOS
+
+
+def valores_x(desde: float, hasta: float, paso: Optional[float] = None, cantidad: Optional[int] = None) -> np.ndarray:
+    """Valores de x de desde a hasta (inclusive), con un paso fijo o una cantidad de puntos."""
+    if paso is not None:
+        if paso <= 0:
+            raise ValueError("El paso debe ser positivo.")
+        n = int(np.floor((hasta - desde) / paso + 1e-9)) + 1
+        if n > TABLA_MAX_PUNTOS:
+            raise ValueError(f"El rango genera {n} puntos; el máximo es {TABLA_MAX_PUNTOS}.")
+        return desde + paso * np.arange(max(n, 0))
+    n = cantidad or 11
+    if n > TABLA_MAX_PUNTOS:
+        raise ValueError(f"El máximo es {TABLA_MAX_PUNTOS} puntos.")
+    return np.linspace(desde, hasta, n)
+
+
+def parsear_lista_x(texto: str) -> np.ndarray:
+    """Valores de x separados por comas o espacios; cada uno puede ser una expresión (pi/2, sqrt(2), 1e-8)."""
+    valores = []
+    for parte in texto.replace(',', ' ').split():
+        try:
+            valores.append(float(parte))
+        except ValueError:
+            try:
+                valores.append(float(sp.N(sp.sympify(parte))))
+            except (sp.SympifyError, TypeError, ValueError):
+                raise ValueError(f"Valor de x inválido: {parte}")
+    return np.array(valores, dtype=float)
+
+
+def _amplificacion_sumas(f: Any) -> Any:
+    """
+    f con cada suma reemplazada por la suma de los valores absolutos de sus términos.
+    El cociente |esto| / |f| estima cuánto se amplifica el error por cancelación: en
+    (1 - cos(x))/x^2 cerca de 0 los términos valen ~1 pero la diferencia ~x^2.
+    """
+    return f.replace(lambda e: e.is_Add, lambda e: sp.Add(*[sp.Abs(a) for a in e.args]))
+
+
+def _kernel_tabla(f: Any) -> Any:
+    """Un solo kernel para f, f' y la suma de magnitudes (comparten subexpresiones con cse)."""
+    return compilar_kernel(sp.Tuple(f, sp.diff(f, x), _amplificacion_sumas(f)), x, "numpy")
+
+
+def condicionamiento(xs: np.ndarray, ys: np.ndarray, derivada: np.ndarray, magnitud: np.ndarray) -> np.ndarray:
+    """
+    Factor de amplificación del error relativo en cada punto: el máximo entre el número de
+    condición |x f'(x) / f(x)| y la cancelación en sumas |Σ|términos|| / |f(x)|.
+    """
+    with np.errstate(all='ignore'):
+        absy = np.abs(ys)
+        kappa = np.abs(xs * derivada) / absy
+        cancelacion = np.abs(magnitud) / absy
+        amplificacion = np.fmax(kappa, cancelacion)
+    amplificacion[(absy == 0) & (np.abs(magnitud) == 0)] = 1.0
+    return np.where(np.isnan(amplificacion), np.inf, amplificacion)
+
+
+def _evaluar_mpmath(f: Any, xs: np.ndarray, digitos: int) -> List[Any]:
+    """f en cada x con digitos de precisión; None donde no es real y finita."""
+    fm = compilar_kernel(f, x, "mpmath")
+    valores = []
+    with mpmath.workdps(digitos + 10):
+        for v in xs:
+            try:
+                y = fm(mpmath.mpf(float(v)))
+            except (ValueError, ZeroDivisionError, TypeError, OverflowError):
+                valores.append(None)
+                continue
+            if isinstance(y, mpmath.mpc):
+                if abs(y.imag) > mpmath.mpf(10) ** (-digitos) * max(1, abs(y.real)):
+                    valores.append(None)
+                    continue
+                y = y.real
+            valores.append(y if mpmath.isfinite(y) else None)
+    return valores
+
+
+def tabla_valores(f: Any, xs: Any, digitos: int = TABLA_PRECISION,
+                  umbral: float = TABLA_UMBRAL_CONDICION) -> Dict[str, Any]:
+    """
+    Evalúa f en todos los xs con un kernel float vectorizado y vuelve a evaluar con mpmath
+    (a digitos de precisión) solo los puntos donde el resultado float no es confiable:
+    no finitos (desbordes, 0/0) o con amplificación del error mayor que umbral.
+    Devuelve un diccionario con:
+      x, y: arreglos float (NaN donde f no es real y finita),
+      condicion: factor de amplificación estimado en cada punto,
+      precisa: máscara de puntos recalculados con mpmath,
+      texto_preciso: {índice: valor con digitos cifras} para esos puntos,
+      omitidos: puntos delicados que no se recalcularon por superar TABLA_MAX_PRECISA.
+    """
+    xs = np.atleast_1d(np.asarray(xs, dtype=float))
+    no_reales = np.zeros(xs.shape, dtype=bool)
+    with np.errstate(all='ignore'):
+        try:
+            kernel = _kernel_tabla(f)
+            filas = [np.broadcast_to(np.asarray(v), xs.shape) for v in kernel(xs)]
+            ys, derivada, magnitud = (np.asarray(fila, dtype=complex) for fila in filas)
+            reales = (np.abs(ys.imag) <= 1e-12 * np.maximum(1, np.abs(ys.real)))
+            no_reales = ~reales
+            ys = np.where(reales, ys.real, np.nan)
+            derivada, magnitud = derivada.real, magnitud.real
+            # Los NaN por salir del dominio real (sqrt o log de negativos) dan un complejo
+            # finito al evaluar con x complejo: esos no se recalculan con mpmath
+            nan = np.flatnonzero(np.isnan(ys))
+            if nan.size:
+                zs = np.broadcast_to(np.asarray(kernel(xs[nan].astype(complex))[0]), nan.shape)
+                no_reales[nan] |= np.isfinite(zs) & (np.abs(zs.imag) > 1e-12 * np.maximum(1, np.abs(zs.real)))
+        except Exception:
+            # Sin kernel NumPy para alguna función: se usa el evaluador con respaldo y solo
+            # se recalculan los puntos no finitos
+            ys = evaluador_vectorizado(f)(xs)
+            derivada, magnitud = np.zeros(xs.shape), np.abs(ys)
+    condicion = condicionamiento(xs, ys, derivada, magnitud)
+    condicion[no_reales] = np.inf
+    delicados = np.flatnonzero((~np.isfinite(ys) & ~no_reales) | (np.isfinite(ys) & (condicion > umbral)))
+    omitidos = max(delicados.size - TABLA_MAX_PRECISA, 0)
+    delicados = delicados[:TABLA_MAX_PRECISA]
+    precisa = np.zeros(xs.shape, dtype=bool)
+    texto_preciso: Dict[int, str] = {}
+    ys = ys.astype(float)
+    for i, y in zip(delicados, _evaluar_mpmath(f, xs[delicados], digitos)):
+        precisa[i] = True
+        if y is None:
+            ys[i] = np.nan
+        else:
+            ys[i] = float(y)
+            texto_preciso[int(i)] = mpmath.nstr(y, digitos)
+    ys[~np.isfinite(ys)] = np.nan
+    return {"x": xs, "y": ys, "condicion": condicion, "precisa": precisa,
+            "texto_preciso": texto_preciso, "omitidos": omitidos}
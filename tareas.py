@@ -0,0 +1,134 @@
+"""
+tareas.py
+Ejecución del análisis en un proceso trabajador, fuera del hilo principal de Tk
+"""
+from typing import Any, Iterator, List, Optional, Tuple
+import multiprocessing as mp
+import queue
+from perfil import analisis_perfilado
+from utils import hilos_abandonados
+
+
+def etapas_analisis(funcion_txt: str, valor_txt: str) -> Iterator[Tuple[str, Any]]:
+    """
+    Ejecuta el análisis completo y entrega (etapa, datos) a medida que termina cada etapa.
+    Un error de parseo se propaga como ValueError; el resto de las etapas maneja sus propios errores.
+    """
+    import sympy as sp
+    from analisis import AnalisisFuncion
+    analisis = AnalisisFuncion.desde_texto(funcion_txt)
+    yield 'funcion', analisis.f
+    yield 'dominio', analisis.dominio
+    yield 'recorrido', analisis.recorrido
+    yield 'intersecciones', analisis.intersecciones
+    if valor_txt:
+        try:
+            yield 'evaluacion', analisis.evaluar(sp.sympify(valor_txt))
+        except Exception as e:
+            yield 'error_evaluacion', str(e)
+
+
+def _bucle_trabajador(entrada: Any, salida: Any) -> None:
+    """Bucle del proceso trabajador: recibe trabajos y publica los resultados por etapa."""
+    # Carga SymPy y el análisis mientras la ventana espera el primer trabajo
+    import analisis  # noqa: F401
+    while True:
+        trabajo = entrada.get()
+        if trabajo is None:
+            break
+        id_trabajo, funcion_txt, valor_txt, cprofile = trabajo
+        with analisis_perfilado(funcion_txt, cprofile=cprofile, publicar=False) as registro:
+            try:
+                for etapa, datos in etapas_analisis(funcion_txt, valor_txt):
+                    salida.put((id_trabajo, etapa, datos))
+            except Exception as e:
+                salida.put((id_trabajo, 'error', str(e)))
+        salida.put((id_trabajo, 'perfil', registro.como_dict()))
+        # Sin SIGALRM (Windows) una etapa vencida sigue corriendo en un hilo: el proceso se
+        # reinicia para detenerla en vez de acumular cálculos de SymPy abandonados
+        reiniciar = hilos_abandonados() > 0
+        salida.put((id_trabajo, 'fin', reiniciar))
+        if reiniciar:
+            break
+
+
+class TrabajadorAnalisis:
+    """
+    Proceso trabajador persistente para el análisis simbólico.
+    Al cancelar se termina el proceso (así se detiene cualquier cálculo de SymPy descontrolado)
+    y se crea uno nuevo para el siguiente trabajo.
+    """
+    def __init__(self):
+        self._ctx = mp.get_context('spawn')
+        self._proceso: Optional[Any] = None
+        self._entrada: Optional[Any] = None
+        self._salida: Optional[Any] = None
+        self._ultimo_id = 0
+        self.trabajo_actual: Optional[int] = None
+
+    def iniciar(self) -> None:
+        """Arranca el proceso trabajador si no está vivo."""
+        if self._proceso is not None and self._proceso.is_alive():
+            return
+        self._entrada = self._ctx.Queue()
+        self._salida = self._ctx.Queue()
+        self._proceso = self._ctx.Process(target=_bucle_trabajador, args=(self._entrada, self._salida), daemon=True)
+        self._proceso.start()
+
+    def enviar(self, funcion_txt: str, valor_txt: str, cprofile: Optional[str] = None) -> int:
+        """Encola un análisis y devuelve su identificador. Con cprofile se guarda un volcado de cProfile en esa ruta."""
+        if self.trabajo_actual is not None:
+            self.cancelar()
+        self.iniciar()
+        self._ultimo_id += 1
+        self.trabajo_actual = self._ultimo_id
+        self._entrada.put((self._ultimo_id, funcion_txt, valor_txt, cprofile))
+        return self._ultimo_id
+
+    def cancelar(self) -> None:
+        """Aborta el trabajo en curso terminando el proceso trabajador."""
+        self.trabajo_actual = None
+        self._reiniciar()
+
+    def _reiniciar(self) -> None:
+        """
+        Termina el proceso trabajador y arranca otro. No se espera a que termine (se llama
+        desde el hilo de la interfaz): multiprocessing lo recoge al arrancar el siguiente.
+        """
+        if self._proceso is not None and self._proceso.is_alive():
+            self._proceso.terminate()
+        self._proceso = None
+        self.iniciar()
+
+    def recoger(self) -> List[Tuple[str, Any]]:
+        """Devuelve, sin bloquear, los resultados pendientes del trabajo actual."""
+        resultados: List[Tuple[str, Any]] = []
+        if self._salida is None or self.trabajo_actual is None:
+            return resultados
+        while True:
+            try:
+                id_trabajo, etapa, datos = self._salida.get_nowait()
+            except queue.Empty:
+                break
+            if id_trabajo != self.trabajo_actual:
+                continue
+            resultados.append((etapa, datos))
+            if etapa == 'fin':
+                self.trabajo_actual = None
+                if datos:
+                    # El trabajador dejó etapas vencidas corriendo (ver _bucle_trabajador)
+                    self._reiniciar()
+                break
+        return resultados
+
+    def cerrar(self) -> None:
+        """Detiene el proceso trabajador."""
+        if self._proceso is not None and self._proceso.is_alive():
+            try:
+                self._entrada.put(None)
+                self._proceso.join(timeout=1)
+            except Exception:
+                pass
+            if self._proceso.is_alive():
+                self._proceso.terminate()
+        self._proceso = None
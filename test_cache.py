@@ -0,0 +1,41 @@
+"""
+test_cache.py
+La caché en disco respeta su tamaño máximo sin recorrer el directorio en cada guardado
+Uso:
+    python -m pytest -q test_cache.py
+"""
+import os
+import cache
+from cache import CacheDisco
+
+
+def _tamano(directorio):
+    return sum(os.path.getsize(os.path.join(directorio, n)) for n in os.listdir(directorio))
+
+
+def test_desalojo_sin_recorrer_en_cada_guardado(tmp_path, monkeypatch):
+    disco = CacheDisco(str(tmp_path), max_bytes=100_000)
+    recorridos = [0]
+    listdir = os.listdir
+
+    def contar(ruta):
+        recorridos[0] += 1
+        return listdir(ruta)
+    monkeypatch.setattr(cache.os, "listdir", contar)
+    for i in range(2000):
+        disco.guardar(f"clave{i}", b"x" * 500)
+    monkeypatch.setattr(cache.os, "listdir", listdir)
+    assert recorridos[0] < 100
+    assert _tamano(tmp_path) <= 100_000
+    assert disco._total == _tamano(tmp_path)
+
+
+def test_reemplazo_y_limpieza_mantienen_el_total(tmp_path):
+    disco = CacheDisco(str(tmp_path), max_bytes=10 ** 6)
+    disco.guardar("a", b"x" * 1000)
+    disco.guardar("b", b"x" * 1000)
+    disco.guardar("a", b"x" * 10)
+    assert disco.obtener("a") == b"x" * 10
+    assert disco._total == _tamano(tmp_path)
+    disco.limpiar()
+    assert disco._total == 0 and _tamano(tmp_path) == 0
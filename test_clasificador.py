@@ -0,0 +1,44 @@
+"""
+test_clasificador.py
+Los caminos rápidos del clasificador deben coincidir con continuous_domain y function_range
+Uso:
+    python -m pytest -q test_clasificador.py
+"""
+import pytest
+import sympy as sp
+from sympy.calculus.util import continuous_domain, function_range
+from core import x
+from clasificador import dominio_rapido, recorrido_rapido
+
+POLINOMIOS = ["7", "x**2 - 4", "2*x**3 - x", "3 - (x - 1)**2", "x**4 - 2*x**2", "(x + 1)**6 - x**6"]
+RACIONALES = ["1/(x - 2)", "(x + 1)/(x - 1)", "x**3/(x**2 - 1)", "(x**2 - 4)/(x**2 + x - 6)",
+              # Denominadores sin raíces reales: el dominio son todos los reales
+              "1/(x**2 + 1)", "(x + 3)/(x**2 + x + 1)", "x/(x**4 + 2)"]
+COMPOSICIONES = ["sqrt(x - 1)", "log(x**2 - 4)", "asin(x/2)", "sqrt(1 - x**2) + log(x)", "1/sqrt(x**2 + 1)",
+                 "exp(1/x)", "log(1/(x**2 + 1))", "acos(1/x)", "sqrt(x**2 - 2*x - 3)"]
+
+
+def _mismo_conjunto(a, b):
+    return a == b or a.symmetric_difference(b) == sp.S.EmptySet
+
+
+@pytest.mark.parametrize("texto", POLINOMIOS + RACIONALES + COMPOSICIONES)
+def test_dominio_rapido_coincide_con_continuous_domain(texto):
+    f = sp.sympify(texto, locals={"x": x})
+    rapido = dominio_rapido(f, x)
+    assert rapido is not None
+    assert _mismo_conjunto(rapido, continuous_domain(f, x, sp.S.Reals))
+
+
+@pytest.mark.parametrize("texto", POLINOMIOS)
+def test_recorrido_rapido_coincide_con_function_range(texto):
+    f = sp.sympify(texto, locals={"x": x})
+    rapido = recorrido_rapido(f, x, dominio_rapido(f, x))
+    assert rapido is not None
+    assert _mismo_conjunto(rapido, function_range(f, x, sp.S.Reals))
+
+
+@pytest.mark.parametrize("texto", RACIONALES + COMPOSICIONES)
+def test_recorrido_rapido_no_aplica_fuera_de_polinomios(texto):
+    f = sp.sympify(texto, locals={"x": x})
+    assert recorrido_rapido(f, x, continuous_domain(f, x, sp.S.Reals)) is None
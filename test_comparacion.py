@@ -0,0 +1,42 @@
+"""
+test_comparacion.py
+Referencias a funciones anteriores en el modo comparación, también tras un coeficiente
+Uso:
+    python -m pytest -q test_comparacion.py
+"""
+import sympy as sp
+from core import x
+from comparacion import parsear_funciones
+
+
+def _ultima(*lineas):
+    return parsear_funciones(list(lineas))[-1]
+
+
+def test_coeficiente_y_nombre_con_x():
+    nombre, f = _ultima("x^2", "2f(x)")
+    assert nombre == "2f(x)"
+    assert sp.simplify(f - 2 * x**2) == 0
+
+
+def test_coeficiente_y_derivada_con_x():
+    nombre, f = _ultima("x^2", "2f'(x)")
+    assert nombre == "2f'(x)"
+    assert sp.simplify(f - 4 * x) == 0
+
+
+def test_coeficiente_y_suma_de_funciones():
+    nombre, f = _ultima("x^2", "sin(x)", "2f + g(x)")
+    assert nombre == "2f + g(x)"
+    assert sp.simplify(f - (2 * x**2 + sp.sin(x))) == 0
+
+
+def test_coeficiente_sin_parentesis_no_crea_funcion_nueva():
+    nombres = [n for n, _ in parsear_funciones(["x^2", "2f"])]
+    assert nombres == ["f", "2f"]
+
+
+def test_nombre_dentro_de_otra_funcion_no_cuenta():
+    # la g de log no es la función g: la línea es una función nueva
+    nombres = [n for n, _ in parsear_funciones(["x^2", "sin(x)", "log(x)"])]
+    assert nombres == ["f", "g", "h"]
@@ -0,0 +1,23 @@
+"""
+test_curva.py
+La exportación por bloques a .npz produce la misma curva que muestrearla completa en memoria
+Uso:
+    python -m pytest -q test_curva.py
+"""
+import numpy as np
+import sympy as sp
+from core import x
+from curva import Curva, exportar_muestreo, muestrear_curva
+
+
+def test_exportar_npz_por_bloques(tmp_path):
+    dominio = sp.Union(sp.Interval.open(-sp.oo, 2), sp.Interval.open(2, sp.oo))
+    ruta = str(tmp_path / "curva.npz")
+    total = exportar_muestreo(1 / (x - 2), dominio, ruta, npoints=5000, tamano=700)
+    esperada = muestrear_curva(1 / (x - 2), dominio, 5000)
+    curva = Curva.cargar(ruta)
+    assert total == len(esperada) == len(curva)
+    assert np.array_equal(curva.x, esperada.x, equal_nan=True)
+    assert np.array_equal(curva.y, esperada.y, equal_nan=True)
+    assert np.array_equal(curva.validos, esperada.validos)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["curva.npz"]
@@ -0,0 +1,58 @@
+"""
+test_muestreo.py
+El muestreo adaptativo respeta su presupuesto de evaluaciones y corta la curva en los polos
+Uso:
+    python -m pytest -q test_muestreo.py
+"""
+import numpy as np
+import pytest
+import sympy as sp
+import core
+from core import x
+
+PRESUPUESTO = 1500
+POLOS = {
+    "1/(x-2)": [2.0],
+    "(x+1)/(x-1)": [1.0],
+    "1/x**2": [0.0],
+    "tan(x)": [k * np.pi / 2 for k in (-5, -3, -1, 1, 3, 5)],
+    "tan(x)**2": [k * np.pi / 2 for k in (-5, -3, -1, 1, 3, 5)],
+    "1/sin(x)": [k * np.pi for k in (-2, -1, 0, 1, 2)],
+}
+
+
+def _muestrear_contando(monkeypatch, texto):
+    contador = [0]
+    original = core.evaluador_vectorizado
+
+    def contado(f, *args, **kwargs):
+        evaluar = original(f, *args, **kwargs)
+
+        def evaluar_contando(xs):
+            contador[0] += np.size(xs)
+            return evaluar(xs)
+        return evaluar_contando
+    monkeypatch.setattr(core, "evaluador_vectorizado", contado)
+    f = sp.sympify(texto, locals={"x": x})
+    xs, ys = core.generar_muestra_adaptativa(f, core.calcular_dominio(f), PRESUPUESTO, 8)
+    return xs, ys, contador[0]
+
+
+@pytest.mark.parametrize("texto", list(POLOS) + ["sin(1/x)", "floor(x)", "sin(x)", "exp(-100*x**2)", "atan(1000*x)"])
+def test_no_supera_el_presupuesto(monkeypatch, texto):
+    _, _, evaluaciones = _muestrear_contando(monkeypatch, texto)
+    assert evaluaciones <= PRESUPUESTO
+
+
+@pytest.mark.parametrize("texto", list(POLOS))
+def test_no_une_la_curva_a_traves_de_un_polo(monkeypatch, texto):
+    xs, ys, _ = _muestrear_contando(monkeypatch, texto)
+    for polo in POLOS[texto]:
+        i = np.searchsorted(xs, polo)
+        assert not (np.isfinite(ys[i - 1]) and np.isfinite(ys[i]) and xs[i] != polo), polo
+
+
+@pytest.mark.parametrize("texto", ["sin(x)", "exp(-100*x**2)", "atan(1000*x)", "Abs(x)"])
+def test_sin_cortes_en_funciones_continuas(monkeypatch, texto):
+    _, ys, _ = _muestrear_contando(monkeypatch, texto)
+    assert not np.isnan(ys).any()
@@ -0,0 +1,24 @@
+"""
+test_numerico.py
+Los resultados que dependen de un respaldo numérico quedan marcados como aproximados
+Uso:
+    python -m pytest -q test_numerico.py
+"""
+import sympy as sp
+from core import x
+from cache import es_exacto
+from numerico import ResultadoAproximado, recorrido_con_limite
+
+
+def test_recorrido_sobre_dominio_aproximado_es_aproximado():
+    dominio = ResultadoAproximado(sp.Interval(0, 3), "muestreo")
+    recorrido = recorrido_con_limite(x**2 - 4, dominio)
+    assert isinstance(recorrido, ResultadoAproximado)
+    assert recorrido.valor == sp.Interval(-4, 5)
+    assert not es_exacto(recorrido)
+
+
+def test_recorrido_sobre_dominio_exacto_es_exacto():
+    recorrido = recorrido_con_limite(x**2 - 4, sp.Interval(0, 3))
+    assert recorrido == sp.Interval(-4, 5)
+    assert es_exacto(recorrido)
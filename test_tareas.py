@@ -0,0 +1,48 @@
+"""
+test_tareas.py
+El proceso trabajador pide reiniciarse cuando una etapa vencida sigue corriendo en un hilo
+Uso:
+    python -m pytest -q test_tareas.py
+"""
+import queue
+import threading
+import time
+import tareas
+from utils import ejecutar_con_limite, hilos_abandonados
+
+
+def _correr_bucle(etapas, monkeypatch):
+    """Corre _bucle_trabajador fuera del hilo principal (sin SIGALRM, como en Windows)."""
+    monkeypatch.setattr(tareas, "etapas_analisis", etapas)
+    entrada, salida = queue.Queue(), queue.Queue()
+    hilo = threading.Thread(target=tareas._bucle_trabajador, args=(entrada, salida), daemon=True)
+    hilo.start()
+    entrada.put((1, "x", "", None))
+    while True:
+        id_trabajo, etapa, datos = salida.get(timeout=30)
+        if etapa == 'fin':
+            return hilo, entrada, datos
+
+
+def test_sin_etapas_vencidas_el_trabajador_sigue(monkeypatch):
+    def etapas(funcion_txt, valor_txt):
+        yield 'dominio', ejecutar_con_limite(time.sleep, 1, 0.01)
+    hilo, entrada, reiniciar = _correr_bucle(etapas, monkeypatch)
+    assert reiniciar is False
+    assert hilo.is_alive()
+    entrada.put(None)
+    hilo.join(5)
+
+
+def test_etapa_vencida_reinicia_el_trabajador(monkeypatch):
+    def etapas(funcion_txt, valor_txt):
+        try:
+            ejecutar_con_limite(time.sleep, 0.05, 0.5)
+        except TimeoutError:
+            yield 'dominio', "respaldo numérico"
+    hilo, _, reiniciar = _correr_bucle(etapas, monkeypatch)
+    assert reiniciar is True
+    hilo.join(5)
+    assert not hilo.is_alive()
+    time.sleep(0.6)
+    assert hilos_abandonados() == 0
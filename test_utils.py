@@ -0,0 +1,42 @@
+"""
+test_utils.py
+Plazos anidados de ejecutar_con_limite: el externo debe seguir valiendo al salir del interno
+Uso:
+    python -m pytest -q test_utils.py
+"""
+import time
+import pytest
+from utils import ejecutar_con_limite
+
+
+def _interno_y_luego_espera(limite_interno, espera):
+    ejecutar_con_limite(time.sleep, limite_interno, 0.05)
+    time.sleep(espera)
+    return "terminó"
+
+
+def test_plazo_externo_mas_corto_sigue_vigente_tras_el_interno():
+    inicio = time.monotonic()
+    with pytest.raises(TimeoutError):
+        ejecutar_con_limite(_interno_y_luego_espera, 0.3, 5, 3)
+    assert time.monotonic() - inicio < 1
+
+
+def test_plazo_externo_mas_largo_sigue_vigente_tras_el_interno():
+    inicio = time.monotonic()
+    with pytest.raises(TimeoutError):
+        ejecutar_con_limite(_interno_y_luego_espera, 0.5, 0.2, 3)
+    assert time.monotonic() - inicio < 1.5
+
+
+def test_plazo_interno_vencido_no_corta_el_externo():
+    def interno_lento():
+        with pytest.raises(TimeoutError):
+            ejecutar_con_limite(time.sleep, 0.1, 2)
+        return "siguió"
+    assert ejecutar_con_limite(interno_lento, 2) == "siguió"
+
+
+def test_sin_alarmas_pendientes_al_terminar_a_tiempo():
+    assert ejecutar_con_limite(_interno_y_luego_espera, 0.4, 0.2, 0.05) == "terminó"
+    time.sleep(0.5)
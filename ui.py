@@ -2,15 +2,23 @@
 ui.py
 Interfaz gráfica principal del Analizador de Funciones
 """
-from typing import Any
+from typing import Any, Callable, Optional, Tuple
+import importlib
+import math
+import threading
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from tkinter import messagebox, scrolledtext
-import sympy as sp
+from tkinter import messagebox, scrolledtext, filedialog
 import traceback
-from core import parsear_funcion, calcular_dominio, calcular_recorrido, intersecciones, evaluar_paso_a_paso
-from plot import graficar_funcion
-from config import TITULO_GRAFICA
+from tareas import TrabajadorAnalisis
+from perfil import RegistroPerfil, analisis_perfilado, historial, publicar_registro
+from config import TITULO_GRAFICA, INTERVALO_SONDEO_MS, FIGURE_SIZE, MODULOS_PRECARGA, COMPARACION_RANGO
+from config import TABLA_PRECISION, TABLA_FILAS_VISIBLES, MODO_VIVO, ESPERA_VISTA_PREVIA_MS, ESPERA_ANALISIS_MS
+from config import NPOINTS
+from utils import formatear_numero
+
+# SymPy, Matplotlib y los módulos que dependen de ellos se importan en un hilo aparte
+# (ver AnalizadorApp._precargar) para que la ventana aparezca de inmediato.
 
 
 class AnalizadorApp:
@@ -30,7 +38,15 @@ class AnalizadorApp:
         # Pestaña principal
         self.tab_principal = ttk.Frame(self.notebook)
         self.notebook.add(self.tab_principal, text="Analizador")
-        # Pestaña de instrucciones
+        # Pestaña de la gráfica (lienzo persistente)
+        self.tab_grafica = ttk.Frame(self.notebook)
+        self.notebook.add(self.tab_grafica, text="Gráfica")
+        self.tab_comparar = ttk.Frame(self.notebook)
+        self.notebook.add(self.tab_comparar, text="Comparar")
+        self.tab_tabla = ttk.Frame(self.notebook)
+        self.notebook.add(self.tab_tabla, text="Tabla de valores")
+        self.tab_rendimiento = ttk.Frame(self.notebook)
+        self.notebook.add(self.tab_rendimiento, text="Rendimiento")
         self.tab_instrucciones = ttk.Frame(self.notebook)
         self.notebook.add(self.tab_instrucciones, text="Instrucciones de uso")
         # Configuración de placeholders
@@ -46,6 +62,31 @@ class AnalizadorApp:
         self._crear_pie(self.tab_principal)
         # Crear instrucciones en la segunda pestaña
         self._crear_instrucciones(self.tab_instrucciones)
+        self._crear_rendimiento(self.tab_rendimiento)
+        self._crear_comparar(self.tab_comparar)
+        self._crear_tabla(self.tab_tabla)
+        self.lienzo: Optional[Any] = None
+        self.lienzo_comparacion: Optional[Any] = None
+        self.aviso_grafica = ttk.Label(self.tab_grafica, text="Cargando Matplotlib...")
+        self.aviso_grafica.pack(pady=40)
+        # Importaciones pesadas en segundo plano; "Analizar" se habilita al terminar
+        self._error_precarga: Optional[str] = None
+        self._hilo_precarga = threading.Thread(target=self._precargar, daemon=True)
+        self._hilo_precarga.start()
+        self.root.after(INTERVALO_SONDEO_MS, self._esperar_precarga)
+        # El análisis corre en un proceso aparte para no congelar la ventana
+        self._resultado: dict = {}
+        self._id_sondeo: Optional[str] = None
+        # Modo en vivo: última entrada vista y esperas programadas (debounce)
+        self._entrada_viva: Tuple[str, str] = ("", "")
+        self._id_vista_previa: Optional[str] = None
+        self._id_analisis_vivo: Optional[str] = None
+        # A lo sumo una vista previa en segundo plano; si la entrada cambia mientras corre, se repite al terminar
+        self._vista_previa_en_curso = False
+        self._vista_previa_pendiente = False
+        self.trabajador = TrabajadorAnalisis()
+        self.trabajador.iniciar()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_cerrar)
 
 
     def _crear_titulo(self, parent: Any) -> None:
@@ -56,6 +97,13 @@ class AnalizadorApp:
         frame.pack(pady=5)
         self.entry_funcion = self._entrada(frame, "Función f(x):", 0, self.placeholder_funcion, 45, placeholder=True)
         self.entry_valor = self._entrada(frame, "Valor de x (opcional):", 1, "", 20)
+        self.var_vivo = ttk.BooleanVar(value=MODO_VIVO)
+        ttk.Checkbutton(frame, text="Análisis en vivo", variable=self.var_vivo,
+                        bootstyle="round-toggle").grid(row=1, column=2, padx=6)
+        self.label_vivo = ttk.Label(parent, text="", foreground=self.placeholder_color)
+        self.label_vivo.pack()
+        for entry in (self.entry_funcion, self.entry_valor):
+            entry.bind("<KeyRelease>", self._al_teclear, add='+')
 
     def _entrada(self, parent: Any, texto: str, fila: int, valor_defecto: str = "", ancho: int = 30, placeholder: bool = False) -> Any:
         ttk.Label(parent, text=texto).grid(row=fila, column=0, sticky='w', padx=6, pady=6)
@@ -73,13 +121,17 @@ class AnalizadorApp:
     def _crear_botones(self, parent: Any) -> None:
         frame = ttk.Frame(parent)
         frame.pack(pady=10)
-        self._boton(frame, "Analizar", self.on_analizar, 0, PRIMARY)
-        self._boton(frame, "Limpiar", self.on_limpiar, 1, WARNING)
-        self._boton(frame, "Ayuda / Ejemplos", self.show_ayuda, 2, INFO)
-
-    def _boton(self, parent: Any, texto: str, accion: Any, columna: int, estilo: Any) -> None:
-        btn = ttk.Button(parent, text=texto, command=accion, width=18, bootstyle=estilo)
+        self.btn_analizar = self._boton(frame, "Cargando...", self.on_analizar, 0, PRIMARY)
+        self.btn_analizar.configure(state='disabled')
+        self.btn_cancelar = self._boton(frame, "Cancelar", self.on_cancelar, 1, DANGER)
+        self.btn_cancelar.configure(state='disabled')
+        self._boton(frame, "Limpiar", self.on_limpiar, 2, WARNING)
+        self._boton(frame, "Ayuda / Ejemplos", self.show_ayuda, 3, INFO)
+
+    def _boton(self, parent: Any, texto: str, accion: Any, columna: int, estilo: Any) -> Any:
+        btn = ttk.Button(parent, text=texto, command=accion, width=16, bootstyle=estilo)
         btn.grid(row=0, column=columna, padx=6)
+        return btn
 
     def _crear_resultados(self, parent: Any) -> None:
         ttk.Label(parent, text="Resultados detallados:", font=("Segoe UI", 11, "bold")).pack(pady=(8, 4))
@@ -92,6 +144,291 @@ class AnalizadorApp:
         )
         ttk.Label(parent, text=pie_texto, wraplength=760, justify='left').pack(pady=(10, 0))
 
+    def _precargar(self) -> None:
+        try:
+            for nombre in MODULOS_PRECARGA:
+                importlib.import_module(nombre)
+        except Exception as e:
+            self._error_precarga = f"{type(e).__name__}: {e}"
+
+    def _esperar_precarga(self) -> None:
+        if self._hilo_precarga.is_alive():
+            self.root.after(INTERVALO_SONDEO_MS, self._esperar_precarga)
+            return
+        if self._error_precarga:
+            self.btn_analizar.configure(text="No disponible")
+            messagebox.showerror("Error al iniciar", f"No se pudieron cargar las dependencias:\n{self._error_precarga}")
+            return
+        self.aviso_grafica.destroy()
+        self._crear_grafica(self.tab_grafica)
+        self._crear_grafica_comparacion(self.frame_grafica_comparacion)
+        self.btn_analizar.configure(text="Analizar", state='normal')
+        self.btn_comparar.configure(state='normal')
+        self.btn_tabla.configure(state='normal')
+
+    def _crear_grafica(self, parent: Any) -> None:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        from plot import LienzoGrafica
+        figura = Figure(figsize=FIGURE_SIZE)
+        canvas = FigureCanvasTkAgg(figura, master=parent)
+        barra = NavigationToolbar2Tk(canvas, parent, pack_toolbar=False)
+        barra.update()
+        barra.pack(side='bottom', fill='x')
+        canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.lienzo = LienzoGrafica(figura)
+
+    def _crear_comparar(self, parent: Any) -> None:
+        frame = ttk.Frame(parent)
+        frame.pack(fill='x', padx=10, pady=(10, 4))
+        ttk.Label(frame, text="Una función por línea (ej: x^2, sin(x), f-g, f', h = 1/(x-1)):").grid(row=0, column=0, columnspan=4, sticky='w')
+        self.text_comparar = scrolledtext.ScrolledText(frame, height=4, width=60, font=("Consolas", 11))
+        self.text_comparar.grid(row=1, column=0, rowspan=2, padx=(0, 8), pady=4)
+        self.text_comparar.insert('1.0', "x^2\nsin(x)\nf-g\nf'")
+        self.entry_comp_a = ttk.Entry(frame, width=7, font=("Consolas", 11))
+        self.entry_comp_b = ttk.Entry(frame, width=7, font=("Consolas", 11))
+        ttk.Label(frame, text="x desde").grid(row=1, column=1, sticky='e')
+        self.entry_comp_a.grid(row=1, column=2, padx=4)
+        ttk.Label(frame, text="hasta").grid(row=2, column=1, sticky='e')
+        self.entry_comp_b.grid(row=2, column=2, padx=4)
+        self.entry_comp_a.insert(0, f"{COMPARACION_RANGO[0]:g}")
+        self.entry_comp_b.insert(0, f"{COMPARACION_RANGO[1]:g}")
+        self.btn_comparar = ttk.Button(frame, text="Comparar", command=self.on_comparar, width=12, bootstyle=PRIMARY)
+        self.btn_comparar.grid(row=1, column=3, rowspan=2, padx=8)
+        self.btn_comparar.configure(state='disabled')
+        self.text_cruces = scrolledtext.ScrolledText(parent, height=5, width=94, font=("Consolas", 10))
+        self.text_cruces.pack(side='bottom', padx=10, pady=(4, 10))
+        self.frame_grafica_comparacion = ttk.Frame(parent)
+        self.frame_grafica_comparacion.pack(fill='both', expand=True, padx=10)
+
+    def _crear_grafica_comparacion(self, parent: Any) -> None:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+        from plot import LienzoComparacion
+        figura = Figure(figsize=(FIGURE_SIZE[0], FIGURE_SIZE[1] * 0.6))
+        canvas = FigureCanvasTkAgg(figura, master=parent)
+        barra = NavigationToolbar2Tk(canvas, parent, pack_toolbar=False)
+        barra.update()
+        barra.pack(side='bottom', fill='x')
+        canvas.get_tk_widget().pack(fill='both', expand=True)
+        self.lienzo_comparacion = LienzoComparacion(figura)
+
+    def _en_segundo_plano(self, calcular: Callable[[], Any], al_terminar: Callable[[Any, Optional[Exception]], None]) -> None:
+        """
+        Corre calcular() en un hilo aparte y, sondeándolo con after como al analizador,
+        llama a al_terminar(resultado, error) en el hilo de la interfaz.
+        """
+        salida: dict = {}
+
+        def objetivo() -> None:
+            try:
+                salida['resultado'] = calcular()
+            except Exception as e:
+                salida['error'] = e
+        hilo = threading.Thread(target=objetivo, daemon=True)
+        hilo.start()
+
+        def sondear() -> None:
+            if hilo.is_alive():
+                self.root.after(INTERVALO_SONDEO_MS, sondear)
+                return
+            al_terminar(salida.get('resultado'), salida.get('error'))
+        self.root.after(INTERVALO_SONDEO_MS, sondear)
+
+    @staticmethod
+    def _calcular_comparacion(texto: str, a: float, b: float) -> Tuple[Any, list]:
+        """Parseo, kernel apilado y cruces entre pares (corre fuera del hilo de la interfaz)."""
+        from comparacion import ComparacionFunciones
+        comparacion = ComparacionFunciones.desde_texto(texto)
+        comparacion.kernel
+        return comparacion, comparacion.intersecciones(a, b)
+
+    def on_comparar(self):
+        import sympy as sp
+        self.text_cruces.delete('1.0', 'end')
+        try:
+            a = float(sp.N(sp.sympify(self.entry_comp_a.get())))
+            b = float(sp.N(sp.sympify(self.entry_comp_b.get())))
+            if not a < b:
+                raise ValueError("el extremo izquierdo debe ser menor que el derecho")
+        except Exception as e:
+            messagebox.showwarning("Rango inválido", f"Revisa el rango de x: {e}")
+            return
+        texto = self.text_comparar.get('1.0', 'end')
+        self.btn_comparar.configure(state='disabled')
+        self.text_cruces.insert('end', "⏳  Comparando...\n")
+        self._en_segundo_plano(lambda: self._calcular_comparacion(texto, a, b),
+                               lambda resultado, error: self._mostrar_comparacion(resultado, error, a, b))
+
+    def _mostrar_comparacion(self, resultado: Any, error: Optional[Exception], a: float, b: float) -> None:
+        self.btn_comparar.configure(state='normal')
+        self.text_cruces.delete('1.0', 'end')
+        if isinstance(error, ValueError):
+            messagebox.showerror("Error de parseo", str(error))
+            return
+        try:
+            if error is not None:
+                raise error
+            comparacion, cruces = resultado
+            self.lienzo_comparacion.actualizar(comparacion, a, b, cruces)
+        except Exception as e:
+            self.text_cruces.insert('end', f"Error al comparar: {e}\n")
+            self.text_cruces.insert('end', traceback.format_exc() + "\n")
+            return
+        self.text_cruces.insert('end', f"Intersecciones en [{formatear_numero(a)}, {formatear_numero(b)}]:\n")
+        for cruce in cruces:
+            nombre_i, nombre_j = cruce["par"]
+            if cruce["identicas"]:
+                detalle = "coinciden en todo el rango"
+            elif cruce["puntos"] is None:
+                detalle = "tiempo agotado"
+            elif not cruce["puntos"]:
+                detalle = "ninguna"
+            else:
+                detalle = ", ".join(f"({formatear_numero(px)}, {formatear_numero(py)})" for px, py in cruce["puntos"])
+            self.text_cruces.insert('end', f"  {nombre_i} ∩ {nombre_j}: {detalle}\n")
+
+    def _crear_tabla(self, parent: Any) -> None:
+        frame = ttk.Frame(parent)
+        frame.pack(fill='x', padx=10, pady=(10, 4))
+        self.entry_tabla_funcion = self._entrada(frame, "Función f(x):", 0, "", 40)
+        self.entry_tabla_lista = self._entrada(frame, "Lista de x (opcional):", 1, "", 40)
+        rango = ttk.Frame(frame)
+        rango.grid(row=2, column=0, columnspan=2, sticky='w', padx=6, pady=6)
+        self.entry_tabla_desde = ttk.Entry(rango, width=8, font=("Consolas", 11))
+        self.entry_tabla_hasta = ttk.Entry(rango, width=8, font=("Consolas", 11))
+        self.entry_tabla_paso = ttk.Entry(rango, width=8, font=("Consolas", 11))
+        self.spin_tabla_digitos = ttk.Spinbox(rango, from_=15, to=100, width=5)
+        for columna, (texto, widget, valor) in enumerate((("x desde", self.entry_tabla_desde, "-5"),
+                                                          ("hasta", self.entry_tabla_hasta, "5"),
+                                                          ("paso", self.entry_tabla_paso, "0.5"),
+                                                          ("dígitos (mpmath)", self.spin_tabla_digitos, str(TABLA_PRECISION)))):
+            ttk.Label(rango, text=texto).grid(row=0, column=2 * columna, padx=(0 if columna == 0 else 10, 4))
+            widget.grid(row=0, column=2 * columna + 1)
+            widget.insert(0, valor)
+        self.btn_tabla = ttk.Button(frame, text="Generar tabla", command=self.on_tabla, width=16, bootstyle=PRIMARY)
+        self.btn_tabla.grid(row=0, column=2, rowspan=2, padx=10)
+        self.btn_tabla.configure(state='disabled')
+        self.label_tabla = ttk.Label(parent, text="")
+        self.label_tabla.pack(padx=10, anchor='w')
+        self.arbol_tabla = ttk.Treeview(parent, columns=("x", "y", "condicion", "metodo"), show='headings', height=18)
+        for col, titulo, ancho in (("x", "x", 170), ("y", "f(x)", 330), ("condicion", "Condicionamiento", 130), ("metodo", "Método", 100)):
+            self.arbol_tabla.heading(col, text=titulo)
+            self.arbol_tabla.column(col, width=ancho, anchor='e' if col != "metodo" else 'center')
+        self.arbol_tabla.pack(padx=10, pady=4, fill='both', expand=True)
+
+    @staticmethod
+    def _calcular_tabla(funcion_txt: str, xs: Any, digitos: int) -> Tuple[Any, float]:
+        """Parseo y tabla con mpmath (corre fuera del hilo de la interfaz); devuelve la tabla y los ms."""
+        import time
+        from cache import parsear_funcion_cache
+        from tabla import tabla_valores
+        f = parsear_funcion_cache(funcion_txt)
+        inicio = time.perf_counter()
+        tabla = tabla_valores(f, xs, digitos)
+        return tabla, (time.perf_counter() - inicio) * 1000
+
+    def on_tabla(self):
+        from tabla import valores_x, parsear_lista_x
+        import sympy as sp
+        funcion_txt = self.entry_tabla_funcion.get().strip()
+        if not funcion_txt and not self.placeholder_activo:
+            funcion_txt = self.entry_funcion.get().strip()
+            self.entry_tabla_funcion.insert(0, funcion_txt)
+        try:
+            if self.entry_tabla_lista.get().strip():
+                xs = parsear_lista_x(self.entry_tabla_lista.get())
+            else:
+                a, b, paso = (float(sp.N(sp.sympify(e.get()))) for e in
+                              (self.entry_tabla_desde, self.entry_tabla_hasta, self.entry_tabla_paso))
+                xs = valores_x(a, b, paso=paso)
+            digitos = int(self.spin_tabla_digitos.get())
+        except (ValueError, TypeError, sp.SympifyError) as e:
+            messagebox.showwarning("Valores de x inválidos", str(e))
+            return
+        self.btn_tabla.configure(state='disabled')
+        self.label_tabla.configure(text="⏳  Calculando la tabla...")
+        self._en_segundo_plano(lambda: self._calcular_tabla(funcion_txt, xs, digitos),
+                               lambda resultado, error: self._mostrar_tabla(resultado, error, xs, digitos))
+
+    def _mostrar_tabla(self, resultado: Any, error: Optional[Exception], xs: Any, digitos: int) -> None:
+        import numpy as np
+        self.btn_tabla.configure(state='normal')
+        self.label_tabla.configure(text="")
+        if isinstance(error, ValueError):
+            messagebox.showerror("Error de parseo", str(error))
+            return
+        if error is not None:
+            messagebox.showerror("Error al calcular la tabla", f"{type(error).__name__}: {error}")
+            return
+        tabla, tiempo_ms = resultado
+        self.arbol_tabla.delete(*self.arbol_tabla.get_children())
+        for i in range(min(xs.size, TABLA_FILAS_VISIBLES)):
+            y = tabla["texto_preciso"].get(i)
+            if y is None:
+                y = "no definida" if np.isnan(tabla["y"][i]) else repr(float(tabla["y"][i]))
+            condicion = tabla["condicion"][i]
+            self.arbol_tabla.insert('', 'end', values=(repr(float(xs[i])), y,
+                                                       "—" if not np.isfinite(condicion) else f"{condicion:.3g}",
+                                                       "mpmath" if tabla["precisa"][i] else "float"))
+        resumen = (f"{xs.size} puntos en {tiempo_ms:.0f} ms; {int(tabla['precisa'].sum())} recalculados con mpmath "
+                   f"a {digitos} dígitos")
+        if tabla["omitidos"]:
+            resumen += f" ({tabla['omitidos']} puntos delicados sin recalcular)"
+        if xs.size > TABLA_FILAS_VISIBLES:
+            resumen += f". Se muestran las primeras {TABLA_FILAS_VISIBLES} filas"
+        self.label_tabla.configure(text=resumen + ".")
+
+    def _crear_rendimiento(self, parent: Any) -> None:
+        ttk.Label(parent, text="Últimos análisis", font=("Segoe UI", 11, "bold")).pack(pady=(10, 4))
+        self.tabla_analisis = ttk.Treeview(parent, columns=("fecha", "funcion", "total"), show='headings', height=8)
+        for col, titulo, ancho in (("fecha", "Fecha", 150), ("funcion", "Función", 440), ("total", "Total (ms)", 110)):
+            self.tabla_analisis.heading(col, text=titulo)
+            self.tabla_analisis.column(col, width=ancho, anchor='w' if col == "funcion" else 'center')
+        self.tabla_analisis.pack(padx=10, fill='x')
+        self._registros_perfil: list = []
+        self.tabla_analisis.bind("<<TreeviewSelect>>", lambda e: self._mostrar_detalle_perfil())
+        ttk.Label(parent, text="Desglose por etapa", font=("Segoe UI", 11, "bold")).pack(pady=(10, 4))
+        self.tabla_etapas = ttk.Treeview(parent, columns=("etapa", "tiempo", "porcentaje", "llamadas", "aciertos"), show='headings', height=10)
+        for col, titulo, ancho in (("etapa", "Etapa", 200), ("tiempo", "Tiempo (ms)", 120), ("porcentaje", "% del total", 110),
+                                   ("llamadas", "Llamadas", 100), ("aciertos", "Aciertos caché SymPy", 170)):
+            self.tabla_etapas.heading(col, text=titulo)
+            self.tabla_etapas.column(col, width=ancho, anchor='w' if col == "etapa" else 'center')
+        self.tabla_etapas.pack(padx=10, fill='x')
+        frame = ttk.Frame(parent)
+        frame.pack(pady=10)
+        self.var_cprofile = ttk.BooleanVar(value=False)
+        ttk.Checkbutton(frame, text="Guardar cProfile del próximo análisis", variable=self.var_cprofile,
+                        bootstyle="round-toggle").grid(row=0, column=0, padx=6)
+        ttk.Button(frame, text="Limpiar historial", command=self.on_limpiar_perfil, width=16,
+                   bootstyle=SECONDARY).grid(row=0, column=1, padx=6)
+
+    def _actualizar_rendimiento(self) -> None:
+        self.tabla_analisis.delete(*self.tabla_analisis.get_children())
+        self._registros_perfil = list(reversed(historial.ultimos()))
+        for i, registro in enumerate(self._registros_perfil):
+            self.tabla_analisis.insert('', 'end', iid=str(i),
+                                       values=(registro.fecha, registro.etiqueta, f"{registro.total_s * 1000:.1f}"))
+        if self._registros_perfil:
+            self.tabla_analisis.selection_set('0')
+        else:
+            self.tabla_etapas.delete(*self.tabla_etapas.get_children())
+
+    def _mostrar_detalle_perfil(self) -> None:
+        seleccion = self.tabla_analisis.selection()
+        self.tabla_etapas.delete(*self.tabla_etapas.get_children())
+        if not seleccion:
+            return
+        registro = self._registros_perfil[int(seleccion[0])]
+        for nombre, datos in sorted(registro.etapas.items(), key=lambda e: -e[1]["tiempo_s"]):
+            porcentaje = 100 * datos["tiempo_s"] / registro.total_s if registro.total_s else 0
+            self.tabla_etapas.insert('', 'end', values=(nombre, f"{datos['tiempo_s'] * 1000:.1f}", f"{porcentaje:.0f} %",
+                                                        datos["llamadas"], datos["aciertos_cache"]))
+
+    def on_limpiar_perfil(self):
+        historial.limpiar()
+        self._actualizar_rendimiento()
+
     def _crear_instrucciones(self, parent: Any) -> None:
         instrucciones = (
             """
@@ -110,6 +447,9 @@ class AnalizadorApp:
                 • Evaluación simbólica
                 • Gráfica profesional
 
+               Con "Análisis en vivo" activado, la gráfica se actualiza mientras escribes y
+               el análisis completo empieza solo cuando dejas de escribir.
+
             4️⃣  Usa "Limpiar" para borrar los campos y resultados.
 
             5️⃣  Haz clic en "Ayuda / Ejemplos" para ver ejemplos de funciones válidas.
@@ -160,6 +500,10 @@ class AnalizadorApp:
     # ============================
 
     def on_limpiar(self):
+        self.on_cancelar()
+        self._cancelar_esperas_vivo()
+        self._entrada_viva = ("", "")
+        self.label_vivo.configure(text="")
         self.entry_funcion.delete(0, 'end')
         self.entry_funcion.insert(0, self.placeholder_funcion)
         self.entry_funcion.configure(foreground=self.placeholder_color)
@@ -167,6 +511,8 @@ class AnalizadorApp:
 
         self.entry_valor.delete(0, 'end')
         self.text_result.delete('1.0', 'end')
+        if self.lienzo is not None:
+            self.lienzo.limpiar()
 
     def show_ayuda(self):
         ejemplos = (
@@ -190,53 +536,241 @@ class AnalizadorApp:
             messagebox.showwarning("Función no ingresada", "No se ha insertado ninguna función.\nPor favor escríbela antes de analizar.")
             return
 
-
+        cprofile = None
+        if self.var_cprofile.get():
+            cprofile = filedialog.asksaveasfilename(title="Guardar volcado de cProfile", defaultextension=".prof",
+                                                    filetypes=[("cProfile", "*.prof"), ("Todos", "*.*")])
+            self.var_cprofile.set(False)
+        self._cancelar_esperas_vivo()
+        self._entrada_viva = (funcion_txt, valor_txt)
+        self._iniciar_analisis(funcion_txt, valor_txt, cprofile or None)
+
+    def _iniciar_analisis(self, funcion_txt: str, valor_txt: str, cprofile: Optional[str] = None, vivo: bool = False) -> None:
+        """Envía el análisis al proceso trabajador (cancelando el anterior) y empieza a sondearlo."""
+        self.text_result.delete('1.0', 'end')
+        self._resultado = {'funcion_txt': funcion_txt, 'valor_txt': valor_txt, 'vivo': vivo}
+        self.trabajador.enviar(funcion_txt, valor_txt, cprofile)
+        self.btn_cancelar.configure(state='normal')
+        self.text_result.insert('end', "⏳  Analizando...\n")
+        if self._id_sondeo is not None:
+            self.root.after_cancel(self._id_sondeo)
+        self._id_sondeo = self.root.after(INTERVALO_SONDEO_MS, self._sondear_trabajador)
+
+    def on_cancelar(self):
+        if self.trabajador.trabajo_actual is None:
+            return
+        self.trabajador.cancelar()
+        self.btn_cancelar.configure(state='disabled')
+        self._quitar_aviso_progreso()
+        self.text_result.insert('end', "⛔  Análisis cancelado.\n")
+
+    def on_cerrar(self):
+        self.trabajador.cerrar()
+        self.root.destroy()
+
+    def _sondear_trabajador(self):
+        self._id_sondeo = None
+        if self.trabajador.trabajo_actual is None:
+            return
+        # Mientras se escribe otra función, lo que llega del análisis anterior no se muestra
+        if self._resultado.get('funcion_txt') != self._entrada_viva[0]:
+            self._resultado['obsoleto'] = True
+        obsoleto = self._resultado.get('obsoleto', False)
+        for etapa, datos in self.trabajador.recoger():
+            if not obsoleto:
+                self._mostrar_etapa(etapa, datos)
+        if obsoleto and self.trabajador.trabajo_actual is None:
+            self.btn_cancelar.configure(state='disabled')
+        if self.trabajador.trabajo_actual is not None:
+            self._id_sondeo = self.root.after(INTERVALO_SONDEO_MS, self._sondear_trabajador)
+
+    # === Modo en vivo ===
+
+    def _al_teclear(self, event: Any) -> None:
+        """
+        Cada tecla reprograma las esperas: la vista previa numérica sale tras una pausa
+        breve y el análisis simbólico solo cuando la entrada queda estable. Si solo cambió
+        el valor de x, se mueve el punto evaluado sin repetir el análisis.
+        """
+        if not self.var_vivo.get() or self.lienzo is None or self.placeholder_activo:
+            return
+        entrada = (self.entry_funcion.get().strip(), self.entry_valor.get().strip())
+        if entrada == self._entrada_viva:
+            return
+        funcion_cambio = entrada[0] != self._entrada_viva[0]
+        self._entrada_viva = entrada
+        if not funcion_cambio:
+            self._mover_punto_vivo(entrada[1])
+            return
+        # El análisis en curso, si lo hay, se cancela recién al enviar el de la entrada nueva
+        self._cancelar_esperas_vivo()
+        if not entrada[0]:
+            self.label_vivo.configure(text="")
+            return
+        self._id_vista_previa = self.root.after(ESPERA_VISTA_PREVIA_MS, self._vista_previa)
+        self._id_analisis_vivo = self.root.after(ESPERA_ANALISIS_MS, self._analisis_vivo)
+
+    def _cancelar_esperas_vivo(self) -> None:
+        for id_espera in (self._id_vista_previa, self._id_analisis_vivo):
+            if id_espera is not None:
+                self.root.after_cancel(id_espera)
+        self._id_vista_previa = self._id_analisis_vivo = None
+
+    @staticmethod
+    def _preparar_vista_previa(funcion_txt: str) -> Any:
+        """Parseo, dominio rápido, kernel y muestras de la vista previa (lo que puede demorar)."""
+        from analisis import AnalisisFuncion
+        analisis = AnalisisFuncion.preliminar(funcion_txt)
+        analisis.muestras(NPOINTS)
+        return analisis
+
+    def _vista_previa(self) -> None:
+        """
+        Etapas baratas (parseo, kernel numérico y curva) en un hilo aparte con _en_segundo_plano,
+        para que ninguna entrada congele la ventana. Si al terminar la entrada ya cambió, el
+        resultado se descarta y se prepara la vista previa de la entrada nueva.
+        """
+        self._id_vista_previa = None
+        if self._vista_previa_en_curso:
+            self._vista_previa_pendiente = True
+            return
+        funcion_txt = self._entrada_viva[0]
+        self._vista_previa_en_curso = True
+        self._vista_previa_pendiente = False
+        self._en_segundo_plano(lambda: self._preparar_vista_previa(funcion_txt),
+                               lambda analisis, error: self._mostrar_vista_previa(funcion_txt, analisis, error))
+
+    def _mostrar_vista_previa(self, funcion_txt: str, analisis: Any, error: Optional[Exception]) -> None:
+        self._vista_previa_en_curso = False
+        if funcion_txt != self._entrada_viva[0]:
+            if self._vista_previa_pendiente and self._entrada_viva[0]:
+                self._vista_previa()
+            return
+        if self._id_analisis_vivo is None:
+            # El análisis simbólico ya empezó y dibuja la curva al terminar
+            return
+        if isinstance(error, ValueError):
+            # Entrada a medio escribir: no vale la pena lanzar el análisis simbólico
+            self.root.after_cancel(self._id_analisis_vivo)
+            self._id_analisis_vivo = None
+            self.label_vivo.configure(text=str(error).splitlines()[0])
+            return
+        if error is not None:
+            self.label_vivo.configure(text=f"Vista previa no disponible: {error}")
+            return
         try:
-            f = parsear_funcion(funcion_txt)
+            self.lienzo.vista_previa(analisis, self._entrada_viva[1])
+        except Exception as e:
+            self.label_vivo.configure(text=f"Vista previa no disponible: {e}")
+            return
+        self.label_vivo.configure(text="Vista previa numérica; el análisis simbólico empieza al dejar de escribir.")
+
+    def _analisis_vivo(self) -> None:
+        """La entrada quedó estable: etapas simbólicas en el proceso trabajador."""
+        self._id_analisis_vivo = None
+        self.label_vivo.configure(text="Analizando simbólicamente...")
+        self._iniciar_analisis(*self._entrada_viva, vivo=True)
+
+    def _mover_punto_vivo(self, valor_txt: str) -> None:
+        """Solo cambió x: se reubica el punto evaluado con el kernel del análisis actual."""
+        analisis = self.lienzo.analisis
+        if analisis is None:
+            return
+        self.lienzo.mover_punto(valor_txt)
+        try:
+            x_val, y_val = analisis.punto_evaluado(valor_txt)
+        except Exception:
+            self.label_vivo.configure(text="")
+            return
+        y_txt = formatear_numero(y_val) if math.isfinite(y_val) else "no definida"
+        self.label_vivo.configure(text=f"f({formatear_numero(x_val)}) ≈ {y_txt}")
+
+    def _quitar_aviso_progreso(self):
+        inicio = self.text_result.search("⏳  Analizando...", '1.0', 'end')
+        if inicio:
+            self.text_result.delete(inicio, f"{inicio} lineend +1c")
+
+    def _mostrar_etapa(self, etapa: str, datos: Any) -> None:
+        """Escribe en text_result el resultado de una etapa apenas llega del trabajador."""
+        self._resultado[etapa] = datos
+        if etapa == 'perfil':
+            return
+        self._quitar_aviso_progreso()
+        if etapa == 'funcion':
+            import sympy as sp
+            f = datos
             self.text_result.insert('end', f"🔎  Función simbólica:\n{sp.pretty(f)}\n\n")
-
             # Dominio
             self.text_result.insert('end', "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n")
             self.text_result.insert('end', "📐  Dominio\n")
             self.text_result.insert('end', "Se utiliza continuous_domain de SymPy para encontrar el conjunto de valores reales donde la función es continua.\n")
             self.text_result.insert('end', f"Expresión analizada: {sp.pretty(f)}\n")
-            dominio = calcular_dominio(f)
+        elif etapa == 'dominio':
+            dominio = datos
             self.text_result.insert('end', f"Dominio calculado: {dominio}\n\n")
-
             # Recorrido
             self.text_result.insert('end', "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n")
             self.text_result.insert('end', "📊  Recorrido\n")
             self.text_result.insert('end', "Se utiliza function_range de SymPy para determinar el conjunto de valores posibles de la función en el dominio calculado.\n")
             self.text_result.insert('end', f"Dominio usado: {dominio}\n")
-            recorrido = calcular_recorrido(f, dominio)
-            self.text_result.insert('end', f"Recorrido calculado: {recorrido}\n\n")
-
+        elif etapa == 'recorrido':
+            self.text_result.insert('end', f"Recorrido calculado: {datos}\n\n")
             # Intersecciones
             self.text_result.insert('end', "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n")
             self.text_result.insert('end', "📍  Intersecciones\n")
             self.text_result.insert('end', "Se resuelve f(x)=0 para encontrar raíces (eje X) y se evalúa f(0) para la intersección con el eje Y.\n")
-            raices, y0 = intersecciones(f)
+        elif etapa == 'intersecciones':
+            raices, y0 = datos
             self.text_result.insert('end', f"Raíces encontradas (f(x)=0): {raices}\n")
             self.text_result.insert('end', f"Intersección con eje Y (f(0)): {y0}\n\n")
-        except Exception as e:
-            messagebox.showerror("Error de parseo", str(e))
+        elif etapa == 'evaluacion':
+            self.text_result.insert('end', "----- Evaluación paso a paso -----\n")
+            for i, (clave, valor) in enumerate(datos.items(), 1):
+                self.text_result.insert('end', f"{i}) {clave.replace('_', ' ').capitalize()}: {valor}\n")
+            self.text_result.insert('end', "\n")
+        elif etapa == 'error_evaluacion':
+            self.text_result.insert('end', f"Error al evaluar x={self._resultado['valor_txt']}: {datos}\n\n")
+        elif etapa == 'error':
+            self.btn_cancelar.configure(state='disabled')
+            if self._resultado.get('vivo'):
+                self.label_vivo.configure(text=str(datos).splitlines()[0])
+            else:
+                messagebox.showerror("Error de parseo", str(datos))
+        elif etapa == 'fin':
+            self.btn_cancelar.configure(state='disabled')
+            with analisis_perfilado("graficado", publicar=False) as registro_grafica:
+                if 'error' not in self._resultado:
+                    self._graficar_resultado()
+            self._registrar_perfil(registro_grafica)
+            if self._resultado.get('vivo') and 'error' not in self._resultado:
+                self.label_vivo.configure(text="Análisis completo.")
             return
+        if etapa != 'error':
+            self.text_result.insert('end', "⏳  Analizando...\n")
+        self.text_result.see('end')
 
-        eval_info = None
-        if valor_txt:
-            try:
-                valor_sym = sp.sympify(valor_txt)
-                pasos = evaluar_paso_a_paso(f, valor_sym)
-                eval_info = pasos
-                self.text_result.insert('end', "----- Evaluación paso a paso -----\n")
-                for i, (clave, valor) in enumerate(pasos.items(), 1):
-                    self.text_result.insert('end', f"{i}) {clave.replace('_', ' ').capitalize()}: {valor}\n")
-                self.text_result.insert('end', "\n")
-            except Exception as e:
-                self.text_result.insert('end', f"Error al evaluar x={valor_txt}: {e}\n\n")
-
+    def _registrar_perfil(self, registro_grafica: RegistroPerfil) -> None:
+        """Une las mediciones del trabajador con las del graficado y las publica en el historial."""
+        if 'perfil' not in self._resultado:
+            return
+        registro = RegistroPerfil.desde_dict(self._resultado['perfil'])
+        registro.combinar(registro_grafica)
+        publicar_registro(registro)
+        self._actualizar_rendimiento()
+
+    def _graficar_resultado(self):
+        from analisis import AnalisisFuncion
+        r = self._resultado
+        valor_txt, eval_info = r['valor_txt'], r.get('evaluacion')
+        if r.get('vivo') and self._entrada_viva[1] != valor_txt:
+            # x cambió mientras corría el análisis: el punto se ubica con el kernel
+            valor_txt, eval_info = self._entrada_viva[1], None
         try:
-            graficar_funcion(f, dominio, raices, y0, valor_txt, eval_info)
+            analisis = AnalisisFuncion(r['funcion'], dominio=r['dominio'], recorrido=r['recorrido'],
+                                       intersecciones=r['intersecciones'])
+            self.lienzo.actualizar(analisis, valor_txt, eval_info)
+            if not r.get('vivo'):
+                self.notebook.select(self.tab_grafica)
         except Exception as e:
             self.text_result.insert('end', f"Error al graficar: {e}\n")
             self.text_result.insert('end', traceback.format_exc() + "\n")
@@ -2,7 +2,10 @@
 utils.py
 Funciones auxiliares para validaciones y formateos
 """
-from typing import Any
+from typing import Any, Callable, List, Optional
+import signal
+import threading
+import time
 
 def es_numero(valor: Any) -> bool:
     """Verifica si un valor puede convertirse a float."""
@@ -18,3 +21,66 @@ def formatear_numero(valor: Any, decimales: int = 4) -> str:
         return f"{float(valor):.{decimales}f}"
     except Exception:
         return str(valor)
+
+class TiempoAgotado(BaseException):
+    """
+    Señal interna de ejecutar_con_limite. Hereda de BaseException para que los
+    `except Exception` dentro de SymPy no la absorban.
+    """
+
+# Hilos de ejecutar_con_limite que vencieron sin SIGALRM y siguen corriendo
+_hilos_abandonados: List[threading.Thread] = []
+
+def hilos_abandonados() -> int:
+    """Cantidad de cálculos abandonados por ejecutar_con_limite que todavía no terminaron."""
+    _hilos_abandonados[:] = [h for h in _hilos_abandonados if h.is_alive()]
+    return len(_hilos_abandonados)
+
+def _alarma(signum: int, frame: Any) -> None:
+    raise TiempoAgotado()
+
+def ejecutar_con_limite(funcion: Callable[..., Any], segundos: Optional[float], *args: Any) -> Any:
+    """
+    Ejecuta funcion(*args) con un tiempo máximo y lanza TimeoutError si se excede.
+    En el hilo principal de sistemas con SIGALRM el cálculo se interrumpe de verdad;
+    en otro caso corre en un hilo aparte que se abandona al vencer el plazo (ver
+    hilos_abandonados: el proceso trabajador de tareas.py se reinicia para detenerlos).
+    """
+    if not segundos or segundos <= 0:
+        return funcion(*args)
+    if hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread():
+        # Si ya hay un plazo externo activo, se respeta el que venza primero y al salir se restaura
+        anterior = signal.signal(signal.SIGALRM, _alarma)
+        externo, _ = signal.setitimer(signal.ITIMER_REAL, 0)
+        manda_externo = bool(externo) and externo <= segundos
+        inicio = time.monotonic()
+        vencio_externo = False
+        signal.setitimer(signal.ITIMER_REAL, externo if manda_externo else segundos)
+        try:
+            return funcion(*args)
+        except TiempoAgotado:
+            if manda_externo:
+                vencio_externo = True
+                raise
+            raise TimeoutError(f"Se excedió el límite de {segundos} s")
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, anterior)
+            # El plazo externo sigue corriendo (salvo que acabe de vencer y se esté propagando)
+            if externo and not vencio_externo:
+                signal.setitimer(signal.ITIMER_REAL, max(externo - (time.monotonic() - inicio), 1e-3))
+    resultado: dict = {}
+    def objetivo() -> None:
+        try:
+            resultado['valor'] = funcion(*args)
+        except BaseException as e:
+            resultado['error'] = e
+    hilo = threading.Thread(target=objetivo, daemon=True)
+    hilo.start()
+    hilo.join(segundos)
+    if hilo.is_alive():
+        _hilos_abandonados.append(hilo)
+        raise TimeoutError(f"Se excedió el límite de {segundos} s")
+    if 'error' in resultado:
+        raise resultado['error']
+    return resultado['valor']
@@ -0,0 +1,93 @@
+"""
+vista.py
+Remuestreo según la vista: teselas cacheadas por nivel de zoom y diezmado min/max por píxel
+"""
+from typing import Any, Callable, List, Tuple
+import math
+import numpy as np
+from cache import CacheLRU
+from core import intervalos_reales
+from config import PUNTOS_POR_TESELA, TESELAS_POR_VISTA, TESELAS_MAX
+
+
+def cortes_dominio(dominio: Any, a: float, b: float) -> List[float]:
+    """
+    Extremos de los intervalos del dominio dentro de (a, b): ahí la curva no debe unirse.
+    Incluye los puntos excluidos de un Complement (p. ej. los polos de tan(x)).
+    """
+    tramos = intervalos_reales(dominio, a, b) or []
+    return sorted({extremo for tramo in tramos for extremo in tramo if a < extremo < b})
+
+
+def decimar_min_max(xs: np.ndarray, ys: np.ndarray, x0: float, x1: float, ancho_px: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduce la curva a lo sumo 4 vértices por columna de píxeles (primero, mínimo, máximo y
+    último), así la línea dibujada es idéntica pero su tamaño solo depende del ancho en píxeles.
+    Los tramos inválidos (NaN) se conservan como un único punto para mantener los cortes.
+    """
+    if xs.size <= 4 * ancho_px or x1 <= x0:
+        return xs, ys
+    columna = np.clip(((xs - x0) / (x1 - x0) * ancho_px).astype(np.int64), -1, ancho_px)
+    valido = np.isfinite(ys)
+    inicio = np.r_[True, (columna[1:] != columna[:-1]) | (valido[1:] != valido[:-1])]
+    grupo = np.cumsum(inicio) - 1
+    inicios = np.flatnonzero(inicio)
+    fines = np.r_[inicios[1:] - 1, xs.size - 1]
+    orden = np.lexsort((np.where(valido, ys, 0.0), grupo))
+    grupo_valido = valido[inicios]
+    indices = np.concatenate([
+        inicios,
+        fines[grupo_valido],
+        orden[inicios][grupo_valido],
+        orden[fines][grupo_valido],
+    ])
+    indices = np.unique(indices)
+    return xs[indices], ys[indices]
+
+
+class CacheTeselas:
+    """
+    Evalúa f por teselas de ancho fijo para cada nivel de zoom (potencias de 2) y las guarda
+    en un LRU: al volver a una zona ya vista (o desplazarse dentro del mismo nivel) no se
+    evalúa nada de nuevo. Cada tesela lleva NaN en los cortes del dominio que caen en ella.
+    """
+    def __init__(self, kernel: Callable[[np.ndarray], np.ndarray], dominio: Any = None,
+                 puntos_por_tesela: int = PUNTOS_POR_TESELA, max_teselas: int = TESELAS_MAX):
+        self.kernel = kernel
+        self.dominio = dominio
+        self.puntos_por_tesela = puntos_por_tesela
+        self._cache = CacheLRU(max_teselas)
+
+    def _tesela(self, nivel: int, indice: int, cortes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        clave = (nivel, indice)
+        tesela = self._cache.obtener(clave, None)
+        if tesela is None:
+            ancho = 2.0 ** nivel
+            inicio, fin = indice * ancho, (indice + 1) * ancho
+            xs = np.linspace(inicio, fin, self.puntos_por_tesela + 1)[:-1]
+            ys = self.kernel(xs)
+            cortes = cortes[(cortes >= inicio) & (cortes < fin)]
+            if cortes.size:
+                posiciones = np.searchsorted(xs, cortes)
+                xs, ys = np.insert(xs, posiciones, cortes), np.insert(ys, posiciones, np.nan)
+            tesela = (xs, ys)
+            self._cache.guardar(clave, tesela)
+        return tesela
+
+    def visible(self, x0: float, x1: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Muestras de [x0, x1] armadas con las teselas del nivel adecuado al ancho de la vista."""
+        if not (math.isfinite(x0) and math.isfinite(x1)) or x1 <= x0:
+            return np.array([]), np.array([])
+        nivel = math.floor(math.log2((x1 - x0) / TESELAS_POR_VISTA))
+        ancho = 2.0 ** nivel
+        primera, ultima = math.floor(x0 / ancho), math.floor(x1 / ancho)
+        faltantes = [k for k in range(primera, ultima + 1) if self._cache.obtener((nivel, k), None) is None]
+        cortes = np.array([])
+        if faltantes and self.dominio is not None:
+            # Una sola consulta al dominio para todas las teselas nuevas (intersecar un ImageSet es lo caro)
+            cortes = np.array(cortes_dominio(self.dominio, np.nextafter(faltantes[0] * ancho, -np.inf),
+                                              (faltantes[-1] + 1) * ancho))
+        partes = [self._tesela(nivel, k, cortes) for k in range(primera, ultima + 1)]
+        xs = np.concatenate([p[0] for p in partes])
+        ys = np.concatenate([p[1] for p in partes])
+        return xs, ys